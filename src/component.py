@@ -2,23 +2,79 @@
 Template Component main class.
 
 """
+import csv
+import json
 import logging
 import os
-from dataclasses import asdict
-from typing import List
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, List, Tuple
 
 from keboola.component.base import ComponentBase, sync_action
+from keboola.component.dao import TableDefinition
 from keboola.component.exceptions import UserException
 
 # configuration variables
 import configuration
+from db_writer.arrow_input import ArrowInput
+from db_writer.change_index import (ChangeIndex, ChangedRows, TableFingerprint, build_change_index,
+                                    filter_changed_rows)
+from db_writer.exceptions import WriterUserException
+from db_writer.metadata_cache import TableMetadataCache
+from db_writer.rejected_rows import RejectedRow
+from db_writer.run_metrics import RunMetrics
 from db_writer.sql_loader import SQLLoaderException
-from db_writer.writer import OracleWriter, OracleCredentials, WriterUserException, OracleConnection
+
+if TYPE_CHECKING:
+    # the writer imports the database driver, it is imported only by the actions that connect
+    from db_writer.writer import OracleWriter, OracleCredentials
 
 INSTA_CLIENT_PATH = os.environ.get('ORACLE_INSTANT_CLI_PATH', '/usr/local/instantclient_21_8')
 
 SQLLDR_PATH = os.environ.get('SQLLOADER_PATH', '/usr/local/instantclient_21_8/sqlldr')
 
+REJECTED_ROWS_TABLE = 'rejected_rows.csv'
+
+LOAD_STATUS_TABLE = 'table_load_status.csv'
+
+METADATA_CACHE_STATE_KEY = 'table_metadata'
+
+RUN_METRICS_FILE = 'run_metrics.json'
+
+RUN_METRICS_TABLE = 'run_metrics.csv'
+
+CHANGE_INDEX_TAG = 'oracle_writer_change_index'
+
+TABLE_FAILURE_POLICIES = ('fail_fast', 'continue')
+
+
+@dataclass
+class TableLoad:
+    input_table: TableDefinition
+    schema: str
+    table_name: str
+    columns: List[str]
+    # mapped names of the input columns that are not loaded
+    skip_columns: List[str] = field(default_factory=list)
+    # mapped names of the primary key columns of the input
+    primary_key: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TableLoadStatus:
+    source: str
+    schema: str
+    table_name: str
+    # success, failed or skipped
+    status: str = 'skipped'
+    duration_seconds: float = 0
+    error: str = ''
+    rejected_rows: List[RejectedRow] = field(default_factory=list)
+
 
 class Component(ComponentBase):
     """
@@ -34,54 +90,276 @@ class Component(ComponentBase):
     def __init__(self):
         super().__init__()
         self._configuration: configuration.Configuration
-        self._oracle_writer: OracleWriter
+        self._oracle_writer: 'OracleWriter'
+        self._state: dict = {}
+        self._metadata_cache = TableMetadataCache()
+        self._metrics = RunMetrics()
 
     def run(self):
         """
         Main execution code
         """
+        # CPU time of the interpreter start and the imports, nothing runs in other threads before this point
+        self._metrics.record('startup', time.process_time())
         self._init_loggers()
         self._init_configuration()
         self._validate_host_names()
-        self._init_writer_client()
+        table_loads = self._get_table_loads()
+        self._state = self.get_state_file() or {}
+        self._metadata_cache = TableMetadataCache(self._state.get(METADATA_CACHE_STATE_KEY))
+        started = time.monotonic()
+        run_status = 'failed'
+        try:
+            self._init_writer_client()
+
+            if self._configuration.pre_run_scripts and self._configuration.pre_run_scripts.script:
+                logging.info(f"Pre script detected, running: {self._configuration.pre_run_scripts.script}")
+                with self._metrics.phase('pre_script'):
+                    self._oracle_writer.execute_script(self._configuration.pre_run_scripts.script,
+                                                       self._configuration.pre_run_scripts.continue_on_failure)
+
+            if self._configuration.tables:
+                statuses = self._load_tables(table_loads)
+                rejected_rows = [(status.table_name, status.rejected_rows) for status in statuses]
+            else:
+                self._load_table(self._oracle_writer, table_loads[0])
+                statuses = []
+                rejected_rows = [(table_loads[0].table_name, self._oracle_writer.rejected_rows)]
+
+            if self._configuration.loading_options.max_rejected_rows:
+                self._write_rejected_rows(rejected_rows)
+
+            self._state[METADATA_CACHE_STATE_KEY] = self._metadata_cache.to_dict()
+            self.write_state_file(self._state)
+
+            if statuses:
+                self._write_load_status(statuses)
+                failed = [status for status in statuses if status.status == 'failed']
+                if failed:
+                    raise UserException(f"Loading of {len(failed)} out of {len(statuses)} tables failed: "
+                                        + "; ".join(f"{status.table_name}: {status.error}" for status in failed))
+
+            if self._configuration.post_run_scripts and self._configuration.post_run_scripts.script:
+                logging.info(f"Post script detected, running: {self._configuration.post_run_scripts.script}")
+                with self._metrics.phase('post_script'):
+                    self._oracle_writer.execute_script(self._configuration.post_run_scripts.script,
+                                                       self._configuration.post_run_scripts.continue_on_failure)
+            run_status = 'success'
+        finally:
+            # written for the failed runs too, they are the ones to investigate, never instead of their error
+            try:
+                self._write_run_metrics(run_status, round(time.monotonic() - started, 3))
+            except Exception as e:
+                logging.warning(f"Failed to write the run metrics: {e}")
+
+        logging.info("Process finished.")
 
-        if not self.get_input_tables_definitions():
+    def _get_table_loads(self) -> List[TableLoad]:
+        input_tables = self.get_input_tables_definitions()
+        if not input_tables:
             raise UserException("No input table specified. Please provide one input table in the input mapping!")
-        input_table = self.get_input_tables_definitions()[0]
+
+        if not self._configuration.tables:
+            if not self._configuration.table_name:
+                raise UserException("Destination table name is not specified.")
+            input_table = input_tables[0]
+            return [self._create_table_load(input_table, self._configuration.schema, self._configuration.table_name,
+                                            self._configuration.columns, self._configuration.skip_columns)]
+
+        tables_by_source = {}
+        for input_table in input_tables:
+            tables_by_source[input_table.name] = input_table
+            if input_table.id:
+                tables_by_source[input_table.id] = input_table
+        missing = [mapping.source for mapping in self._configuration.tables if mapping.source not in tables_by_source]
+        if missing:
+            raise UserException(f"Some tables are not present in the input mapping: {missing}")
+
+        table_loads = []
+        for mapping in self._configuration.tables:
+            input_table = tables_by_source[mapping.source]
+            table_loads.append(self._create_table_load(input_table, mapping.schema or self._configuration.schema,
+                                                       mapping.table_name, mapping.columns, mapping.skip_columns))
+        return table_loads
+
+    def _create_table_load(self, input_table: TableDefinition, schema: str, table_name: str,
+                           column_mapping: List[configuration.ColumnMapping], skip_columns: List[str]) -> TableLoad:
+        source_columns = list(input_table.columns)
+        # the columns of the manifest are shared by all mappings of the source table
+        columns = self._map_columns(list(source_columns), column_mapping)
+        unknown = [column for column in skip_columns if column not in source_columns]
+        if unknown:
+            raise UserException(f"Some skipped columns do not exist in the source table {input_table.name}: "
+                                f"{unknown}")
+        # the skipped columns are identified by the mapped names, like the loaded ones
+        skipped = [columns[source_columns.index(column)] for column in skip_columns]
+        loaded = [column for column, source in zip(columns, source_columns) if source not in skip_columns]
+        clashing = [column for column in skipped if column in loaded]
+        if clashing:
+            raise UserException(f"The skipped columns {clashing} of the source table {input_table.name} are mapped "
+                                f"to the same destination columns as loaded columns.")
+        if not loaded:
+            raise UserException(f"All columns of the source table {input_table.name} are skipped.")
+        skipped_key = [column for column in skip_columns if column in (input_table.primary_key or [])]
+        if skipped_key:
+            raise UserException(f"The primary key columns {skipped_key} of the source table {input_table.name} "
+                                f"cannot be skipped.")
+        primary_key = [columns[source_columns.index(column)] if column in source_columns else column
+                       for column in input_table.primary_key or []]
+        return TableLoad(input_table, schema, table_name, columns, skipped, primary_key)
+
+    def _load_table(self, oracle_writer: 'OracleWriter', table_load: TableLoad):
         loading_options = self._configuration.loading_options
         load_type = loading_options.load_type
 
-        columns = self._map_columns(input_table.columns)
-
-        if self._configuration.pre_run_scripts and self._configuration.pre_run_scripts.script:
-            logging.info(f"Pre script detected, running: {self._configuration.pre_run_scripts.script}")
-            self._oracle_writer.execute_script(self._configuration.pre_run_scripts.script,
-                                               self._configuration.pre_run_scripts.continue_on_failure)
-
         if load_type == 'full_load':
             pre_procedure = loading_options.full_load_procedure
             pre_procedure_params = loading_options.full_load_procedure_parameters_list
-            self._oracle_writer.upload_full(input_table.full_path,
-                                            schema=self._configuration.schema,
-                                            table_name=self._configuration.table_name,
-                                            columns=columns,
-                                            pre_procedure=pre_procedure,
-                                            pre_procedure_parameters=pre_procedure_params)
+            oracle_writer.upload_full(table_load.input_table.full_path,
+                                      schema=table_load.schema,
+                                      table_name=table_load.table_name,
+                                      columns=table_load.columns,
+                                      pre_procedure=pre_procedure,
+                                      pre_procedure_parameters=pre_procedure_params,
+                                      full_load_mode=loading_options.full_load_mode,
+                                      truncate_storage=loading_options.truncate_storage,
+                                      skip_columns=table_load.skip_columns)
         elif load_type == 'incremental':
-            self._oracle_writer.upload_incremental(input_table.full_path,
-                                                   schema=self._configuration.schema,
-                                                   table_name=self._configuration.table_name,
-                                                   columns=columns,
-                                                   primary_key=input_table.primary_key,
-                                                   method=loading_options.incremental_load_mode
-                                                   )
-
-        if self._configuration.post_run_scripts and self._configuration.post_run_scripts.script:
-            logging.info(f"Post script detected, running: {self._configuration.post_run_scripts.script}")
-            self._oracle_writer.execute_script(self._configuration.post_run_scripts.script,
-                                               self._configuration.post_run_scripts.continue_on_failure)
+            primary_key = table_load.primary_key
+            change_detection = loading_options.client_change_detection and primary_key
+            if change_detection and ArrowInput.is_columnar(table_load.input_table.full_path):
+                logging.warning(f"Client change detection reads only CSV inputs, all rows of the columnar input "
+                                f"{table_load.table_name} are loaded.")
+                change_detection = False
+            if not change_detection:
+                self._upload_incremental(oracle_writer, table_load, table_load.input_table.full_path)
+                return
+
+            work_folder = tempfile.mkdtemp(prefix='change_detection_')
+            try:
+                with self._metrics.phase('change_filter', table_load.table_name) as metric:
+                    fingerprint = TableFingerprint(*oracle_writer.get_table_fingerprint(table_load.schema,
+                                                                                        table_load.table_name))
+                    changed_rows = self._filter_changed_rows(table_load, work_folder, fingerprint)
+                    metric.rows = changed_rows.rows_changed
+                if changed_rows.rows_changed:
+                    self._upload_incremental(oracle_writer, table_load, changed_rows.data_path)
+                    fingerprint = TableFingerprint(*oracle_writer.get_table_fingerprint(table_load.schema,
+                                                                                        table_load.table_name))
+                else:
+                    logging.info(f"No new or changed rows for the table {table_load.table_name}, nothing to load.")
+                # kept only after a successful load, a failed run is compared with the same previous index again
+                index_path = os.path.join(work_folder, 'change_index.bin')
+                build_change_index(changed_rows, [row.values for row in oracle_writer.rejected_rows], fingerprint,
+                                   index_path)
+                self._write_change_index(table_load, index_path)
+            finally:
+                shutil.rmtree(work_folder, ignore_errors=True)
+
+    def _upload_incremental(self, oracle_writer: 'OracleWriter', table_load: TableLoad, data_path: str):
+        loading_options = self._configuration.loading_options
+        oracle_writer.upload_incremental(data_path,
+                                         schema=table_load.schema,
+                                         table_name=table_load.table_name,
+                                         columns=table_load.columns,
+                                         primary_key=table_load.primary_key,
+                                         method=loading_options.incremental_load_mode,
+                                         staging_table=loading_options.staging_table,
+                                         skip_columns=table_load.skip_columns
+                                         )
+
+    def _change_index_name(self, table_load: TableLoad) -> str:
+        config_id = self.environment_variables.config_id or 'local'
+        return f'change_index_{config_id}_{table_load.schema}_{table_load.table_name}.bin'
+
+    def _filter_changed_rows(self, table_load: TableLoad, work_folder: str,
+                             fingerprint: TableFingerprint) -> ChangedRows:
+        """
+        Args:
+            fingerprint: Current state of the target table, the previous index is used only when it matches
+        """
+        name = self._change_index_name(table_load)
+        previous = [file for file in self.get_input_files_definitions(tags=[CHANGE_INDEX_TAG], only_latest_files=True)
+                    if file.name == name]
+        previous_path = previous[0].full_path if previous else None
+        if previous_path:
+            try:
+                with ChangeIndex(previous_path) as index:
+                    previous_fingerprint = index.fingerprint
+            except ValueError as e:
+                logging.warning(f"{e} All input rows are loaded.")
+                previous_path = None
+            else:
+                if previous_fingerprint != fingerprint:
+                    logging.warning(f"The table {table_load.table_name} changed since the previous run outside of "
+                                    f"this configuration ({previous_fingerprint.rows} rows and last DDL at "
+                                    f"{previous_fingerprint.last_ddl_time} then, {fingerprint.rows} rows and last DDL "
+                                    f"at {fingerprint.last_ddl_time} now), the change index {name} is not used and "
+                                    f"all input rows are loaded.")
+                    previous_path = None
+        else:
+            logging.info(f"No change index {name} of a previous run found in the input files, "
+                         f"all input rows are loaded.")
+        try:
+            # the columns and the primary key use the mapped names
+            return filter_changed_rows(table_load.input_table.full_path, table_load.columns,
+                                       table_load.primary_key, previous_path, work_folder)
+        except ValueError as e:
+            raise UserException(f"Change detection of the table {table_load.table_name} failed: {e}") from e
+
+    def _write_change_index(self, table_load: TableLoad, index_path: str):
+        index_file = self.create_out_file_definition(self._change_index_name(table_load), tags=[CHANGE_INDEX_TAG])
+        os.makedirs(os.path.dirname(index_file.full_path), exist_ok=True)
+        shutil.move(index_path, index_file.full_path)
+        self.write_manifest(index_file)
+
+    def _load_tables(self, table_loads: List[TableLoad]) -> List[TableLoadStatus]:
+        """
+        Loads the tables concurrently, each table in its own writer session.
 
-        logging.info("Process finished.")
+        Returns: Status of each table in the order of the table loads
+
+        """
+        failure_policy = self._configuration.table_failure_policy
+        if failure_policy not in TABLE_FAILURE_POLICIES:
+            raise UserException(f"Unsupported table failure policy: {failure_policy}, "
+                                f"use one of {list(TABLE_FAILURE_POLICIES)}.")
+        sessions = max(1, min(self._configuration.max_concurrent_tables, len(table_loads)))
+        logging.info(f"Loading {len(table_loads)} tables, up to {sessions} concurrently.")
+        failed = threading.Event()
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix='table-loader') as executor:
+            futures = [executor.submit(self._load_table_with_status, index, table_load, failed)
+                       for index, table_load in enumerate(table_loads)]
+            return [future.result() for future in futures]
+
+    def _load_table_with_status(self, index: int, table_load: TableLoad, failed: threading.Event) -> TableLoadStatus:
+        status = TableLoadStatus(table_load.input_table.name, table_load.schema, table_load.table_name)
+        if failed.is_set() and self._configuration.table_failure_policy == 'fail_fast':
+            logging.warning(f"Skipping table {table_load.table_name}, loading of another table failed.")
+            return status
+
+        started = time.monotonic()
+        # separate folder keeps the SQL*Loader control, log and bad files of the tables apart
+        oracle_writer = self._create_writer(os.path.join(self.files_out_path, f'{index}_{table_load.table_name}'),
+                                            log_name=f'table_{index}')
+        try:
+            logging.info(f"Loading table {table_load.input_table.name} into {table_load.table_name}.")
+            oracle_writer.connect(ext_session_id=self.environment_variables.run_id)
+            self._load_table(oracle_writer, table_load)
+            status.status = 'success'
+        except Exception as e:
+            failed.set()
+            status.status = 'failed'
+            status.error = str(e.args[0]) if e.args else repr(e)
+            logging.exception(f"Loading of table {table_load.table_name} failed: {status.error}")
+        finally:
+            status.rejected_rows = oracle_writer.rejected_rows
+            status.duration_seconds = round(time.monotonic() - started, 3)
+            oracle_writer.close_connection()
+
+        logging.info(f"Table {table_load.table_name} finished with status {status.status} "
+                     f"in {status.duration_seconds} s.")
+        return status
 
     def _validate_host_names(self):
         approved_hostnames = self.configuration.image_parameters.get("approved_hostnames")
@@ -96,7 +374,7 @@ class Component(ComponentBase):
     def _init_loggers(self):
         class DebugFilter(logging.Filter):
             def filter(self, rec):
-                return not (rec.levelno == logging.DEBUG and rec.name == 'db_writer.writer')
+                return not (rec.levelno == logging.DEBUG and rec.name.startswith('db_writer.writer'))
 
         if self.configuration.parameters.get('debug', False):
             # let db_writer handle the debug logging in debug mode
@@ -108,36 +386,117 @@ class Component(ComponentBase):
         self._configuration: configuration.Configuration = configuration.Configuration.load_from_dict(
             self.configuration.parameters)
 
-    def _get_oracle_credentials(self) -> OracleCredentials:
+    def _get_oracle_credentials(self, sql_loader_needed: bool | None = None) -> 'OracleCredentials':
+        """
+        Args:
+            sql_loader_needed: The action loads data using SQL*Loader, None to decide by the loading options
+
+        """
+        from db_writer.writer import OracleCredentials
         db_json = self.configuration.parameters.get('db', {})
         self._validate_parameters(db_json, configuration.DbOptions.get_dataclass_required_parameters(), 'Credentials')
         # build credentials
         db_config = configuration.DbOptions.load_from_dict(db_json)
 
+        loading_options = self.configuration.parameters.get('loading_options', {})
+        if sql_loader_needed is None:
+            # the full loads and the default incremental load mode use SQL*Loader
+            sql_loader_needed = (loading_options.get('load_type') != 'incremental'
+                                 or loading_options.get('incremental_load_mode', 'sqlldr') == 'sqlldr')
+        connection_mode = db_config.connection_mode
+        if connection_mode not in ('auto', 'thick', 'thin'):
+            raise UserException(f"Unsupported connection mode: {connection_mode}")
+        # the direct path load API of python-oracledb is available only in the Thin mode
+        thick_mode = connection_mode == 'thick' or (connection_mode == 'auto' and sql_loader_needed)
+
         return OracleCredentials(username=db_config.user,
                                  password=db_config.pswd_password,
                                  insta_client_path=INSTA_CLIENT_PATH,
-                                 host=db_config.host, port=db_config.port, service_name=db_config.database)
+                                 host=db_config.host, port=db_config.port, service_name=db_config.database,
+                                 thick_mode=thick_mode)
 
     def _init_writer_client(self):
-        credentials = self._get_oracle_credentials()
-        sql_loader_path = SQLLDR_PATH
-        self._oracle_writer = OracleWriter(credentials,
-                                           default_format=self._configuration.default_format_options,
-                                           log_folder=self.files_out_path,
-                                           sql_loader_path=sql_loader_path,
-                                           sql_loader_options=self._configuration.sql_loader_options,
-                                           verbose_logging=self._configuration.debug)
+        self._oracle_writer = self._create_writer(self.files_out_path)
         self._oracle_writer.connect(ext_session_id=self.environment_variables.run_id)
 
-    def _map_columns(self, columns: List[str]) -> List[str]:
-        if not self._configuration.columns:
+    def _create_writer(self, log_folder: str, log_name: str = '') -> 'OracleWriter':
+        from db_writer.writer import OracleWriter
+        credentials = self._get_oracle_credentials()
+        sql_loader_path = SQLLDR_PATH
+        return OracleWriter(credentials,
+                            default_format=self._configuration.default_format_options,
+                            log_folder=log_folder,
+                            sql_loader_path=sql_loader_path,
+                            sql_loader_options=self._configuration.sql_loader_options,
+                            query_load_options=self._configuration.query_load_options,
+                            merge_options=self._configuration.merge_options,
+                            preflight_options=self._configuration.preflight_options,
+                            max_rejected_rows=self._configuration.loading_options.max_rejected_rows,
+                            staging_id=self.environment_variables.config_id or '',
+                            verbose_logging=self._configuration.debug,
+                            log_name=log_name,
+                            metadata_cache=self._metadata_cache,
+                            resumable=self._configuration.loading_options.resumable,
+                            metrics=self._metrics)
+
+    def _write_rejected_rows(self, rejected_rows: List[Tuple[str, List[RejectedRow]]]):
+        total = sum(len(rows) for _, rows in rejected_rows)
+        if total:
+            logging.warning(f"{total} rows were rejected by the database, "
+                            f"they are stored in the output table {REJECTED_ROWS_TABLE}.")
+        table = self.create_out_table_definition(REJECTED_ROWS_TABLE,
+                                                 columns=['table_name', 'row_number', 'error_message', 'row_data'])
+        with open(table.full_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            for table_name, rows in rejected_rows:
+                for row in rows:
+                    writer.writerow([table_name, row.row_number, row.error,
+                                     json.dumps(row.values, ensure_ascii=False)])
+        self.write_manifest(table)
+
+    def _write_load_status(self, statuses: List[TableLoadStatus]):
+        table = self.create_out_table_definition(LOAD_STATUS_TABLE,
+                                                 columns=['source', 'schema', 'table_name', 'status',
+                                                          'duration_seconds', 'rejected_rows', 'error'])
+        with open(table.full_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            for status in statuses:
+                writer.writerow([status.source, status.schema, status.table_name, status.status,
+                                 status.duration_seconds, len(status.rejected_rows), status.error])
+        self.write_manifest(table)
+
+    def _write_run_metrics(self, status: str, duration_seconds: float):
+        report = {'run_id': self.environment_variables.run_id, 'config_id': self.environment_variables.config_id,
+                  'status': status, 'duration_seconds': duration_seconds, **self._metrics.to_dict()}
+        os.makedirs(self.files_out_path, exist_ok=True)
+        with open(os.path.join(self.files_out_path, RUN_METRICS_FILE), 'w') as out:
+            json.dump(report, out, indent=2)
+        logging.info(f"Run finished with status {status} in {duration_seconds} s, time per phase: "
+                     f"{report['totals']}")
+
+        if not self._configuration.metrics_output_table:
+            return
+        columns = ['run_id', 'config_id', 'table_name', 'phase', 'started_at', 'duration_seconds', 'rows', 'bytes',
+                   'status']
+        # appended, the table keeps the history of the runs
+        table = self.create_out_table_definition(RUN_METRICS_TABLE, columns=columns, incremental=True)
+        with open(table.full_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            for metric in self._metrics.phases:
+                writer.writerow([report['run_id'], report['config_id'], metric.table_name, metric.phase,
+                                 metric.started_at, metric.duration_seconds, metric.rows, metric.bytes,
+                                 metric.status])
+        self.write_manifest(table)
+
+    def _map_columns(self, columns: List[str], column_mapping: List[configuration.ColumnMapping]) -> List[str]:
+        if not column_mapping:
             return columns
 
         invalid_mapping: List[str] = list()
-        for mapping in self._configuration.columns:
+        for mapping in column_mapping:
             if mapping.source_name not in columns:
                 invalid_mapping.append(mapping.source_name)
+                continue
 
             idx = columns.index(mapping.source_name)
             columns[idx] = mapping.destination_name
@@ -156,10 +515,15 @@ class Component(ComponentBase):
 
     @sync_action('testConnection')
     def test_connection(self):
-        credentials = self._get_oracle_credentials()
+        startup_seconds = time.process_time()
+        started = time.perf_counter()
+        from db_writer.writer import OracleConnection
+        credentials = self._get_oracle_credentials(sql_loader_needed=False)
         connection = OracleConnection(**asdict(credentials),
                                       logger=__name__)
         connection.test_connection()
+        logging.info(f"Connection tested in {time.perf_counter() - started:.3f} s in the "
+                     f"{'Thick' if credentials.thick_mode else 'Thin'} mode, startup took {startup_seconds:.3f} s.")
 
 
 """
@@ -4,7 +4,6 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 
 import dataconf
-from keboola.utils.helpers import comma_separated_values_to_list
 
 
 class ConfigurationBase:
@@ -52,6 +51,9 @@ class DbOptions(ConfigurationBase):
     database: str
     user: str
     pswd_password: str
+    # auto: the Thin mode unless a SQL*Loader load is needed, thick: always load the Instant Client, thin: never
+    # thick keeps the configurations created before the Thin mode was supported unchanged
+    connection_mode: str = 'thick'
 
     @property
     def host(self) -> str:
@@ -72,14 +74,22 @@ class Script(ConfigurationBase):
 class LoadingOptions(ConfigurationBase):
     load_type: str
     full_load_mode: Optional[str] = 'truncate_as_delete'
-    incremental_load_mode: Optional[str] = 'sql_loader'
+    truncate_storage: str = 'drop'
+    incremental_load_mode: Optional[str] = 'sqlldr'
     full_load_procedure: Optional[str] = None
     full_load_procedure_parameters: Optional[str] = None
     mode: Optional[str] = None
+    max_rejected_rows: int = 0
+    staging_table: str = 'temporary'
+    resumable: bool = False
+    # upsert only the rows that are new or changed since the previous successful run
+    client_change_detection: bool = False
 
     @property
     def full_load_procedure_parameters_list(self):
         if self.full_load_procedure_parameters:
+            # keboola.utils imports dateparser, which would slow down the start of every action
+            from keboola.utils.helpers import comma_separated_values_to_list
             return comma_separated_values_to_list(self.full_load_procedure_parameters)
         else:
             return None
@@ -90,6 +100,46 @@ class SQLLoaderOptions(ConfigurationBase):
     rows: int = 5000
     bindsize: int = 8000000
     readsize: int = 8000001
+    # derive rows, bindsize and readsize (columnarrayrows and streamsize for direct path) from the table metadata
+    auto_tune: bool = False
+    parallel_workers: int = 1
+    direct: bool = False
+    multithreading: Optional[bool] = None
+    columnarrayrows: Optional[int] = None
+    streamsize: Optional[int] = None
+    date_cache: Optional[int] = None
+    skip_index_maintenance: bool = False
+    index_rebuild_parallel_degree: int = 4
+
+
+@dataclass
+class QueryLoadOptions(ConfigurationBase):
+    batch_size: int = 5000
+    sessions: int = 1
+    commit_policy: str = 'end'
+    checkpoint_batches: int = 10
+
+
+@dataclass
+class MergeOptions(ConfigurationBase):
+    # upsert MERGE split by ORA_HASH of the primary key, 1 merges the whole staging table at once
+    buckets: int = 1
+    sessions: int = 4
+    parallel_dml: bool = False
+    parallel_degree: Optional[int] = None
+    # stop or continue merging the remaining buckets after a bucket fails
+    failure_policy: str = 'stop'
+    # none, columns or hash - skip the update of matched rows equal to the target
+    change_detection: str = 'none'
+
+
+@dataclass
+class PreflightOptions(ConfigurationBase):
+    # validate the input against the destination table before any data is written
+    enabled: bool = False
+    # rows with violations to stop at, on top of the allowed rejected rows
+    max_violations: int = 10
+    workers: int = 4
 
 
 @dataclass
@@ -104,23 +154,49 @@ class ColumnMapping(ConfigurationBase):
     destination_name: str
 
 
+@dataclass
+class TableMapping(ConfigurationBase):
+    # input table file name or storage table id
+    source: str
+    table_name: str
+    schema: Optional[str] = None
+    columns: List[ColumnMapping] = field(default_factory=list)
+    # source columns of the input that are not loaded
+    skip_columns: List[str] = field(default_factory=list)
+
+
 @dataclass
 class Configuration(ConfigurationBase):
     # Connection options
     db: DbOptions
     schema: str
-    table_name: str
     loading_options: LoadingOptions
     default_format_options: DefaultFormatOptions
+    # required unless the tables are mapped in tables
+    table_name: Optional[str] = None
+    tables: List[TableMapping] = field(default_factory=list)
+    max_concurrent_tables: int = 1
+    table_failure_policy: str = 'fail_fast'
     sql_loader_options: Optional[SQLLoaderOptions] = None
+    query_load_options: Optional[QueryLoadOptions] = None
+    merge_options: Optional[MergeOptions] = None
+    preflight_options: Optional[PreflightOptions] = None
     post_run_script: bool = False
     post_run_scripts: Optional[Script] = None
     pre_run_script: bool = False
     pre_run_scripts: Optional[Script] = None
     custom_column_mapping: bool = False
     columns: List[ColumnMapping] = field(default_factory=list)
+    skip_columns: List[str] = field(default_factory=list)
+    metrics_output_table: bool = False
     debug: bool = False
 
     def __post_init__(self):
         if not self.sql_loader_options:
             self.sql_loader_options = SQLLoaderOptions()
+        if not self.query_load_options:
+            self.query_load_options = QueryLoadOptions()
+        if not self.merge_options:
+            self.merge_options = MergeOptions()
+        if not self.preflight_options:
+            self.preflight_options = PreflightOptions()
@@ -0,0 +1,117 @@
+import os
+from typing import TYPE_CHECKING, Iterator, List
+
+if TYPE_CHECKING:
+    import pyarrow
+
+PARQUET_EXTENSIONS = ('.parquet', '.parq')
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc', '.arrows')
+PARQUET_MAGIC = b'PAR1'
+# the Arrow IPC file format, the stream format has no magic and is recognized only by its extension
+ARROW_MAGIC = b'ARROW1'
+
+
+class ArrowInputError(Exception):
+    pass
+
+
+def _import_pyarrow():
+    """
+    pyarrow is an optional dependency, required only for the columnar inputs.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ArrowInputError("Parquet and Arrow inputs require the pyarrow package, which is not installed.") from e
+    return pyarrow
+
+
+class ArrowInput:
+    """
+    Columnar input: a Parquet file or an Arrow IPC file or stream. The data is read in record batches, the values
+    keep their native types and are bound to the database without the conversion from text.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def detect_format(path: str) -> str:
+        """
+        Returns: parquet, arrow or an empty string for other (CSV) inputs, by the extension or the magic bytes
+        """
+        if os.path.isdir(path):
+            return ''
+        extension = os.path.splitext(path)[1].lower()
+        if extension in PARQUET_EXTENSIONS:
+            return 'parquet'
+        if extension in ARROW_EXTENSIONS:
+            return 'arrow'
+        try:
+            with open(path, 'rb') as data_file:
+                start = data_file.read(len(ARROW_MAGIC))
+        except OSError:
+            return ''
+        if start.startswith(PARQUET_MAGIC):
+            return 'parquet'
+        if start == ARROW_MAGIC:
+            return 'arrow'
+        return ''
+
+    @classmethod
+    def is_columnar(cls, path: str) -> bool:
+        return bool(cls.detect_format(path))
+
+    @property
+    def format(self) -> str:
+        return self.detect_format(self.path)
+
+    def column_names(self) -> List[str]:
+        pa = _import_pyarrow()
+        if self.format == 'parquet':
+            return pa.parquet.ParquetFile(self.path).schema_arrow.names
+        return self._open_ipc(pa).schema.names
+
+    def _open_ipc(self, pa):
+        try:
+            return pa.ipc.open_file(self.path)
+        except pa.ArrowInvalid:
+            return pa.ipc.open_stream(self.path)
+
+    def iter_tables(self, batch_size: int, skip_rows: int = 0) -> Iterator['pyarrow.Table']:
+        """
+        Reads the input in tables of batch_size rows, the last one may be smaller, in the column order of the file.
+
+        Args:
+            skip_rows: Number of rows to skip, e.g. rows loaded by a previous run
+
+        """
+        pa = _import_pyarrow()
+        if self.format == 'parquet':
+            batches = pa.parquet.ParquetFile(self.path).iter_batches(batch_size=batch_size)
+        else:
+            reader = self._open_ipc(pa)
+            if isinstance(reader, pa.ipc.RecordBatchFileReader):
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            else:
+                batches = iter(reader)
+
+        # the file batches are not aligned with batch_size, e.g. after the skipped rows or in IPC files
+        pending, pending_rows = [], 0
+        for batch in batches:
+            if skip_rows >= batch.num_rows:
+                skip_rows -= batch.num_rows
+                continue
+            batch = batch.slice(skip_rows)
+            skip_rows = 0
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            while pending_rows >= batch_size:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, batch_size)
+                rest = table.slice(batch_size)
+                pending, pending_rows = rest.to_batches(), rest.num_rows
+        if pending_rows:
+            yield pa.Table.from_batches(pending)
@@ -0,0 +1,136 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Literal, Optional
+
+import oracledb
+
+BucketFailurePolicy = Literal['stop', 'continue']
+FAILURE_POLICIES = ('stop', 'continue')
+
+
+@dataclass
+class BucketResult:
+    bucket: int
+    # committed, failed or skipped
+    status: str = 'skipped'
+    rows: int = 0
+    error: Optional[BaseException] = None
+
+
+class BucketedMergeException(Exception):
+    def __init__(self, *args, results: List[BucketResult]):
+        super().__init__(*args)
+        self.results = results
+
+    @property
+    def committed_buckets(self) -> List[int]:
+        return [r.bucket for r in self.results if r.status == 'committed']
+
+    @property
+    def failed_buckets(self) -> List[int]:
+        return [r.bucket for r in self.results if r.status == 'failed']
+
+
+class BucketedMerge:
+    """
+    Runs the MERGE of a staging table split into buckets by ORA_HASH of the primary key. Each bucket is merged
+    in its own pooled session and committed on its own, which keeps the undo of a single transaction small.
+
+    On a failure the failed bucket is rolled back, the buckets committed before stay in the target table.
+    Failure policies:
+        stop: buckets not started yet are skipped, the running ones finish.
+        continue: all remaining buckets are merged.
+    Either way the failure is raised at the end. The caller then clears the staging table, the MERGE is
+    idempotent, staging the same data again and rerunning the upsert completes the skipped and failed buckets.
+    """
+
+    def __init__(self, pool: oracledb.ConnectionPool, merge_query: str, buckets: int, sessions: int,
+                 parallel_dml: bool = False, failure_policy: BucketFailurePolicy = 'stop',
+                 logger: logging.Logger = None):
+        """
+
+        Args:
+            pool: Pool with at least sessions connections
+            merge_query: MERGE statement restricted to the bucket given in the :bucket bind variable
+            buckets: Number of buckets
+            sessions: Number of buckets merged concurrently
+            parallel_dml: Enable parallel DML in the sessions
+            failure_policy: stop or continue
+
+        """
+        self.pool = pool
+        self.merge_query = merge_query
+        self.buckets = buckets
+        self.sessions = sessions
+        self.parallel_dml = parallel_dml
+        self.failure_policy = failure_policy
+        self.failed = threading.Event()
+        self._logger = logger or logging.getLogger(__name__)
+
+    @staticmethod
+    def bucket_expression(key_columns: List[str], buckets: int) -> str:
+        """
+        Args:
+            key_columns: Escaped and qualified primary key columns
+
+        Returns: Expression of the bucket number, 0 to buckets - 1
+        """
+        key = " || CHR(1) || ".join(key_columns)
+        return f"ORA_HASH({key}, {buckets - 1})"
+
+    def merge(self) -> int:
+        """
+        Returns: Number of merged rows
+
+        Raises: BucketedMergeException when any bucket failed
+        """
+        results = [BucketResult(bucket) for bucket in range(self.buckets)]
+        with ThreadPoolExecutor(max_workers=self.sessions, thread_name_prefix='bucketed-merge') as executor:
+            list(executor.map(self._merge_bucket, results))
+
+        failed = [r for r in results if r.status == 'failed']
+        if failed:
+            committed = [r.bucket for r in results if r.status == 'committed']
+            skipped = [r.bucket for r in results if r.status == 'skipped']
+            raise BucketedMergeException(f"MERGE of buckets {[r.bucket for r in failed]} failed: {failed[0].error}. "
+                                         f"Committed buckets: {committed}, skipped buckets: {skipped}.",
+                                         results=results) from failed[0].error
+
+        rows = sum(r.rows for r in results)
+        self._logger.info(f"Merged {rows} rows in {self.buckets} buckets using {self.sessions} sessions.")
+        return rows
+
+    def _merge_bucket(self, result: BucketResult):
+        if self.failed.is_set() and self.failure_policy == 'stop':
+            return
+        connection, cursor = None, None
+        try:
+            connection = self.pool.acquire()
+            cursor = connection.cursor()
+            if self.parallel_dml:
+                cursor.execute("ALTER SESSION ENABLE PARALLEL DML")
+            cursor.execute(self.merge_query, bucket=result.bucket)
+            result.rows = cursor.rowcount
+            connection.commit()
+            result.status = 'committed'
+            self._logger.debug(f"Bucket {result.bucket} merged and committed, {result.rows} rows.")
+        except BaseException as e:
+            result.status = 'failed'
+            result.error = e
+            self.failed.set()
+            self._logger.warning(f"MERGE of bucket {result.bucket} failed: {e}")
+            if connection is not None:
+                self._rollback(connection, result.bucket)
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                self.pool.release(connection)
+
+    def _rollback(self, connection: oracledb.Connection, bucket: int):
+        try:
+            connection.rollback()
+        except oracledb.Error as e:
+            self._logger.warning(f"Rollback of bucket {bucket} failed: {e}")
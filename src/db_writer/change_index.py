@@ -0,0 +1,286 @@
+import csv
+import hashlib
+import heapq
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from db_writer.csv_input import CSVInput
+
+INDEX_MAGIC = b'KBCCHIX2'
+# magic, the number of records and the fingerprint of the target table (row count, LAST_DDL_TIME), keeps the records
+# 8 byte aligned
+INDEX_HEADER = struct.Struct('<8sQQ32s')
+# primary key hash, row hash
+INDEX_RECORD = struct.Struct('<QQ')
+# number of records sorted in memory before they are written to a run file, about 50 MB of Python ints
+RUN_SIZE = 500000
+READ_RECORDS = 8192
+FIELD_SEPARATOR = '\x1f'
+
+
+def hash_values(values: List[str]) -> int:
+    """
+    Returns: 64-bit hash of the values
+    """
+    digest = hashlib.blake2b(FIELD_SEPARATOR.join(values).encode('utf-8'), digest_size=8)
+    return int.from_bytes(digest.digest(), 'little')
+
+
+@dataclass(frozen=True)
+class TableFingerprint:
+    """
+    State of the target table the index describes. A full load, a TRUNCATE or rows deleted or inserted by another
+    process change it, the index is not valid for the table anymore.
+    """
+    rows: int
+    last_ddl_time: str
+
+
+class ChangeIndex:
+    """
+    Primary key hashes and row hashes of the rows loaded by a previous run, a file of records sorted by the key
+    hash. The file is memory mapped and searched in place, the index never has to fit into memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+
+        Args:
+            path: Index file, None for an empty index (the first run)
+
+        Raises: ValueError for a file that is not an index, e.g. of an older version
+
+        """
+        self._file = None
+        self._map = None
+        self._records = memoryview(b'').cast('Q')
+        # None for the empty index
+        self.fingerprint: Optional[TableFingerprint] = None
+        if path:
+            if os.path.getsize(path) < INDEX_HEADER.size:
+                raise ValueError(f"The file {path} is not a valid change index.")
+            self._file = open(path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, rows, last_ddl_time = INDEX_HEADER.unpack_from(self._map)
+            if magic != INDEX_MAGIC or len(self._map) != INDEX_HEADER.size + count * INDEX_RECORD.size:
+                self.close()
+                raise ValueError(f"The file {path} is not a valid change index.")
+            self.fingerprint = TableFingerprint(rows, last_ddl_time.rstrip(b'\0').decode('ascii'))
+            self._records = memoryview(self._map)[INDEX_HEADER.size:].cast('Q')
+
+    def __len__(self) -> int:
+        return len(self._records) // 2
+
+    def __enter__(self) -> 'ChangeIndex':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._records.release()
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map, self._file = None, None
+
+    def lookup(self, key_hash: int) -> Optional[int]:
+        """
+        Returns: Row hash stored for the key hash, None for an unknown key
+        """
+        records = self._records
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if records[2 * middle] < key_hash:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and records[2 * low] == key_hash:
+            return records[2 * low + 1]
+        return None
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        records = self._records
+        for position in range(0, len(records), 2):
+            yield records[position], records[position + 1]
+
+
+class ChangeIndexBuilder:
+    """
+    Builds the next index from the previous one and the records of the current input using an external merge sort:
+    the records are sorted in runs of bounded size written to disk and the runs are merged with the previous index.
+    """
+
+    def __init__(self, folder: str, run_size: int = RUN_SIZE):
+        self._folder = folder
+        self._run_size = run_size
+        self._buffer: List[int] = []
+        self._runs: List[str] = []
+
+    def add(self, key_hash: int, row_hash: int):
+        self._buffer.append(key_hash << 64 | row_hash)
+        if len(self._buffer) >= self._run_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        self._buffer.sort()
+        path = os.path.join(self._folder, f'run_{len(self._runs)}.bin')
+        with open(path, 'wb') as run_file:
+            for start in range(0, len(self._buffer), READ_RECORDS):
+                run_file.write(b''.join(INDEX_RECORD.pack(record >> 64, record & 0xFFFFFFFFFFFFFFFF)
+                                        for record in self._buffer[start:start + READ_RECORDS]))
+        self._runs.append(path)
+        self._buffer = []
+
+    @staticmethod
+    def _read_run(path: str, excluded_keys: Set[int]) -> Iterator[Tuple[int, int]]:
+        with open(path, 'rb') as run_file:
+            while block := run_file.read(INDEX_RECORD.size * READ_RECORDS):
+                for record in INDEX_RECORD.iter_unpack(block):
+                    if record[0] not in excluded_keys:
+                        yield record
+
+    def discard(self):
+        """
+        Drops the records added so far, the built index keeps the previous records.
+        """
+        self._buffer = []
+        self._runs = []
+
+    def build(self, output_path: str, previous: ChangeIndex, fingerprint: TableFingerprint,
+              excluded_keys: Optional[Set[int]] = None) -> int:
+        """
+        Writes the index, the rows of the current input replace the previous records of the same key.
+
+        Args:
+            fingerprint: State of the target table after the load
+            excluded_keys: Key hashes of the current records to leave out, e.g. of the rejected rows, the previous
+                records of these keys are kept
+
+        Returns: Number of records in the index
+        """
+        self._flush()
+        excluded_keys = excluded_keys or set()
+        # heapq.merge is stable, the current runs come after the previous index
+        merged = heapq.merge(iter(previous), *(self._read_run(path, excluded_keys) for path in self._runs),
+                             key=lambda r: r[0])
+        count = 0
+        header_fingerprint = (fingerprint.rows, fingerprint.last_ddl_time.encode('ascii'))
+        with open(output_path, 'wb') as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, 0, *header_fingerprint))
+            pending = None
+            for record in merged:
+                if pending is not None and pending[0] != record[0]:
+                    index_file.write(INDEX_RECORD.pack(*pending))
+                    count += 1
+                pending = record
+            if pending is not None:
+                index_file.write(INDEX_RECORD.pack(*pending))
+                count += 1
+            index_file.seek(0)
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, count, *header_fingerprint))
+        return count
+
+
+@dataclass
+class ChangedRows:
+    # CSV file with the header and the new or changed rows only
+    data_path: str
+    rows_total: int
+    rows_changed: int
+    # index of the previous run, None on the first run
+    previous_index_path: Optional[str]
+    # positions of the primary key columns in the rows
+    key_positions: List[int]
+    # records of the changed rows, they get into the index by build_change_index once they are loaded
+    builder: ChangeIndexBuilder
+    run_folder: str
+
+
+def filter_changed_rows(data_path: str, columns: List[str], primary_key: List[str],
+                        previous_index_path: Optional[str], output_folder: str) -> ChangedRows:
+    """
+    Compares the input with the index of the previous run in one streaming pass and writes the rows with a new
+    primary key or changed values into a new CSV file. The records of the changed rows are collected for the next
+    index, which is built by build_change_index after the load.
+
+    Args:
+        data_path: Input CSV, compressed and sliced inputs are streamed
+        columns: Columns of the input, the filtered CSV gets them as its header
+        primary_key: Primary key columns
+        previous_index_path: Index file of the previous successful run, None on the first run
+        output_folder: Folder of the filtered CSV and the collected records
+
+    """
+    missing = [column for column in primary_key if column not in columns]
+    if missing:
+        raise ValueError(f"Primary key columns {missing} are not present in the input columns {columns}.")
+    key_positions = [columns.index(column) for column in primary_key]
+    data_input = CSVInput(data_path)
+    filtered_path = os.path.join(output_folder, 'changed_rows.csv')
+    run_folder = tempfile.mkdtemp(prefix='change_index_', dir=output_folder)
+    builder = ChangeIndexBuilder(run_folder)
+    rows_total, rows_changed = 0, 0
+    try:
+        with ChangeIndex(previous_index_path) as previous, data_input.open_text() as csv_file, \
+                open(filtered_path, 'w', newline='', encoding='utf-8') as filtered_file:
+            reader = csv.reader(csv_file)
+            writer = csv.writer(filtered_file, lineterminator='\n')
+            if data_input.has_header:
+                next(reader, None)
+            writer.writerow(columns)
+            for row in reader:
+                rows_total += 1
+                key_hash = hash_values([row[position] for position in key_positions])
+                row_hash = hash_values(row)
+                if previous.lookup(key_hash) != row_hash:
+                    writer.writerow(row)
+                    rows_changed += 1
+                    # the unchanged rows are in the previous index already
+                    builder.add(key_hash, row_hash)
+    except BaseException:
+        shutil.rmtree(run_folder, ignore_errors=True)
+        raise
+
+    logging.info(f"Change detection: {rows_changed} of {rows_total} input rows are new or changed.")
+    return ChangedRows(filtered_path, rows_total, rows_changed, previous_index_path, key_positions, builder,
+                       run_folder)
+
+
+def build_change_index(changed_rows: ChangedRows, rejected_rows: Iterable[List[str]], fingerprint: TableFingerprint,
+                       output_path: str) -> int:
+    """
+    Builds the index of the current state after the changed rows were loaded. Rejected rows are left out, their
+    keys keep the previous records, so the rows are sent again by the next run.
+
+    Args:
+        rejected_rows: Values of the rows refused by the load, in the column order of the filtered CSV
+        fingerprint: State of the target table after the load
+
+    Returns: Number of records in the index
+    """
+    excluded_keys = set()
+    key_positions = changed_rows.key_positions
+    try:
+        for values in rejected_rows:
+            if len(values) <= max(key_positions):
+                logging.warning("A rejected row has fewer values than the input columns, none of the changed rows "
+                                "are marked as loaded in the change index.")
+                changed_rows.builder.discard()
+                break
+            excluded_keys.add(hash_values([values[position] for position in key_positions]))
+        with ChangeIndex(changed_rows.previous_index_path) as previous:
+            records = changed_rows.builder.build(output_path, previous, fingerprint, excluded_keys)
+    finally:
+        shutil.rmtree(changed_rows.run_folder, ignore_errors=True)
+    logging.info(f"The change index holds {records} keys.")
+    return records
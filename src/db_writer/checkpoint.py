@@ -0,0 +1,153 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from db_common.db_connection import DbConnection
+from db_writer.csv_input import CSVInput
+
+FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+
+
+def file_fingerprint(path: str, sample_size: int = FINGERPRINT_SAMPLE_SIZE) -> str:
+    """
+    Cheap identity of a file: its size and a hash of its first and last sample_size bytes.
+    Reading the whole multi GB file for a checksum would cost as much as loading it.
+    A sliced input (directory) is identified by the names and fingerprints of its slices.
+    """
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for part in CSVInput(path).parts:
+            digest.update(f'{part.name}={file_fingerprint(str(part), sample_size)};'.encode())
+        return f'slices:{digest.hexdigest()}'
+
+    size = os.path.getsize(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        digest.update(file.read(sample_size))
+        if size > sample_size:
+            file.seek(max(sample_size, size - sample_size))
+            digest.update(file.read(sample_size))
+    return f'{size}:{digest.hexdigest()}'
+
+
+@dataclass
+class LoadCheckpoint:
+    """
+    Progress of a single load. The offset is the number of data rows committed by the previous runs.
+
+    The offset is not verified when a previous run was killed while an external process (sqlldr) was committing
+    rows, those rows are not counted in the offset.
+
+    The changes are written in the current transaction of the connection, the caller commits them together with
+    the loaded rows.
+    """
+    store: 'CheckpointStore'
+    key: str
+    fingerprint: str
+    offset: int = 0
+    verified: bool = True
+
+    def save(self, rows_committed: int):
+        """
+        Args:
+            rows_committed: Data rows committed by the current run, counted from the offset
+
+        """
+        self.store.save(self.key, self.fingerprint, self.offset + rows_committed)
+
+    def start_external(self):
+        """
+        Marks the offset unverified before a process that commits on its own starts loading after it. Saving
+        the rows it committed verifies the offset again.
+        """
+        self.store.save(self.key, self.fingerprint, self.offset, verified=False)
+
+    def restart(self):
+        """
+        Discards the progress of the previous runs, the load starts from the first row.
+        """
+        self.offset = 0
+        self.verified = True
+
+    def complete(self):
+        self.store.clear(self.key)
+
+
+class CheckpointStore:
+    """
+    Checkpoints of the loads keyed by the destination table, kept in the KBC_LOAD_CHECKPOINTS table of the current
+    schema. The component state is not saved for failed jobs, the table survives the failure.
+
+    A checkpoint is valid only for the same input file, which is recognized by its fingerprint.
+    """
+
+    TABLE_NAME = 'KBC_LOAD_CHECKPOINTS'
+
+    def __init__(self, connection: DbConnection):
+        self._connection = connection
+
+    def _query(self, query: str, bind_parameters: Optional[dict] = None) -> list:
+        return list(self._connection.perform_query(query, bind_parameters))
+
+    def start(self, key: str, data_path: str) -> LoadCheckpoint:
+        """
+        Creates the checkpoint table when missing, the DDL commits the open transaction.
+
+        Returns: LoadCheckpoint with the offset to continue from, 0 when the file was not loaded before
+
+        """
+        self._create_table()
+        fingerprint = file_fingerprint(data_path)
+        entry = self._query(f"SELECT FINGERPRINT, ROWS_COMMITTED, VERIFIED FROM {self.TABLE_NAME} "
+                            f"WHERE TABLE_KEY = :key", {"key": key})
+        if not entry or entry[0][0] != fingerprint:
+            return LoadCheckpoint(self, key, fingerprint)
+        return LoadCheckpoint(self, key, fingerprint, int(entry[0][1]), verified=bool(entry[0][2]))
+
+    def save(self, key: str, fingerprint: str, rows: int, verified: bool = True):
+        self._query(f"""MERGE INTO {self.TABLE_NAME} t
+                        USING (SELECT :key TABLE_KEY FROM DUAL) s ON (t.TABLE_KEY = s.TABLE_KEY)
+                        WHEN MATCHED THEN UPDATE SET FINGERPRINT = :fingerprint, ROWS_COMMITTED = :rows,
+                                                     VERIFIED = :verified, UPDATED_AT = SYSTIMESTAMP
+                        WHEN NOT MATCHED THEN INSERT (TABLE_KEY, FINGERPRINT, ROWS_COMMITTED, VERIFIED, UPDATED_AT)
+                                              VALUES (:key, :fingerprint, :rows, :verified, SYSTIMESTAMP)""",
+                    {"key": key, "fingerprint": fingerprint, "rows": rows, "verified": int(verified)})
+
+    def clear(self, key: str):
+        self._query(f"DELETE FROM {self.TABLE_NAME} WHERE TABLE_KEY = :key", {"key": key})
+
+    def _create_table(self):
+        exists = self._query("""SELECT 1 FROM ALL_TABLES
+                                WHERE OWNER = SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') AND TABLE_NAME = :table_name""",
+                             {"table_name": self.TABLE_NAME})
+        if exists:
+            self._add_verified_column()
+            return
+        try:
+            self._query(f"""CREATE TABLE {self.TABLE_NAME} (TABLE_KEY VARCHAR2(512) PRIMARY KEY,
+                                                            FINGERPRINT VARCHAR2(128) NOT NULL,
+                                                            ROWS_COMMITTED NUMBER NOT NULL,
+                                                            VERIFIED NUMBER(1) DEFAULT 1 NOT NULL,
+                                                            UPDATED_AT TIMESTAMP NOT NULL)""")
+        except Exception as e:
+            # ORA-00955: name is already used by an existing object, created by a concurrent load
+            if 'ORA-00955' not in str(e):
+                raise
+
+    def _add_verified_column(self):
+        """
+        The tables created by the previous versions miss the VERIFIED column, their checkpoints are all verified.
+        """
+        exists = self._query("""SELECT 1 FROM ALL_TAB_COLUMNS
+                                WHERE OWNER = SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') AND TABLE_NAME = :table_name
+                                      AND COLUMN_NAME = 'VERIFIED'""",
+                             {"table_name": self.TABLE_NAME})
+        if exists:
+            return
+        try:
+            self._query(f"ALTER TABLE {self.TABLE_NAME} ADD (VERIFIED NUMBER(1) DEFAULT 1 NOT NULL)")
+        except Exception as e:
+            # ORA-01430: column being added already exists in table, added by a concurrent load
+            if 'ORA-01430' not in str(e):
+                raise
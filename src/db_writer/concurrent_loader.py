@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+from typing import Callable, Iterable, List, Literal, Optional, Tuple
+
+import oracledb
+
+CommitPolicy = Literal['end', 'batch']
+COMMIT_POLICIES = ('end', 'batch')
+
+# inserts a batch using the cursor, arguments: cursor, batch rows, row number of the first row in the batch,
+# returns the number of inserted rows, the rejected rows are not counted
+BatchInserter = Callable[[oracledb.Cursor, List[list], int], int]
+
+
+class PartialCommitException(Exception):
+    def __init__(self, *args, rows_committed: int):
+        super().__init__(*args)
+        # rows of the sessions committed before the failed commit
+        self.rows_committed = rows_committed
+
+
+class _Worker(threading.Thread):
+
+    def __init__(self, loader: 'ConcurrentQueryLoader', index: int):
+        super().__init__(name=f'query-loader-{index}', daemon=True)
+        self._loader = loader
+        self.connection: Optional[oracledb.Connection] = None
+        self.rows_inserted = 0
+        self.error: Optional[BaseException] = None
+
+    def run(self):
+        loader = self._loader
+        cursor = None
+        try:
+            self.connection = loader.pool.acquire()
+            cursor = self.connection.cursor()
+            cursor.setinputsizes(*loader.input_sizes)
+        except BaseException as e:
+            loader.fail(e)
+            self.error = e
+
+        while True:
+            item = loader.batches.get()
+            if item is None:
+                break
+            if loader.failed.is_set():
+                # keep draining the queue so the reader never blocks
+                continue
+            first_row_number, batch = item
+            try:
+                inserted = loader.insert_batch(cursor, batch, first_row_number)
+                if loader.commit_policy == 'batch':
+                    self.connection.commit()
+                self.rows_inserted += inserted
+            except BaseException as e:
+                self.error = e
+                loader.fail(e)
+
+        if cursor is not None:
+            cursor.close()
+
+
+class ConcurrentQueryLoader:
+    """
+    Inserts batches of CSV rows concurrently using multiple sessions from an oracledb connection pool.
+
+    The calling thread reads the batches into a bounded queue, each worker session takes batches from the queue
+    and inserts them using the insert_batch callable.
+
+    Commit policies:
+        end: workers never commit on their own. When all batches are inserted successfully the sessions are
+            committed one after another, on any failure all sessions are rolled back. The commits are not atomic,
+            when a commit fails, the sessions committed before keep their rows and the rest are rolled back.
+        batch: each worker commits after every batch. Rows committed before a failure stay in the table.
+    """
+
+    def __init__(self, pool: oracledb.ConnectionPool, insert_batch: BatchInserter, input_sizes: list,
+                 sessions: int, commit_policy: CommitPolicy = 'end', logger: logging.Logger = None):
+        self.pool = pool
+        self.insert_batch = insert_batch
+        self.input_sizes = input_sizes
+        self.commit_policy = commit_policy
+        self.batches: queue.Queue = queue.Queue(maxsize=sessions * 2)
+        self.failed = threading.Event()
+        self._sessions = sessions
+        self._logger = logger or logging.getLogger(__name__)
+
+    def fail(self, error: BaseException):
+        self._logger.warning(f"Concurrent insert failed in {threading.current_thread().name}: {error}")
+        self.failed.set()
+
+    def load(self, batches: Iterable[Tuple[int, List[list]]]) -> int:
+        """
+        Inserts all batches.
+
+        Args:
+            batches: Iterable of (row number of the first row, batch rows) tuples
+
+        Returns: Number of inserted rows
+
+        Raises: the first error raised by the reader or any of the workers, PartialCommitException when a commit
+            fails after other sessions were committed
+
+        """
+        workers = [_Worker(self, i) for i in range(self._sessions)]
+        for worker in workers:
+            worker.start()
+
+        read_error = None
+        try:
+            for batch in batches:
+                if self.failed.is_set():
+                    break
+                self.batches.put(batch)
+        except BaseException as e:
+            read_error = e
+            self.fail(e)
+        finally:
+            for _ in workers:
+                self.batches.put(None)
+            for worker in workers:
+                worker.join()
+
+        errors = [read_error] if read_error else []
+        errors.extend(worker.error for worker in workers if worker.error)
+        try:
+            self._finish_transactions(workers, commit=not errors)
+        finally:
+            for worker in workers:
+                if worker.connection is not None:
+                    self.pool.release(worker.connection)
+
+        if errors:
+            raise errors[0]
+
+        rows_inserted = sum(worker.rows_inserted for worker in workers)
+        self._logger.info(f"Inserted {rows_inserted} rows using {self._sessions} concurrent sessions.")
+        return rows_inserted
+
+    def _finish_transactions(self, workers: List[_Worker], commit: bool):
+        workers = [worker for worker in workers if worker.connection is not None]
+        if not commit:
+            self._rollback(workers)
+            return
+        for position, worker in enumerate(workers):
+            self._logger.debug(f"Executing Commit in {worker.name}")
+            try:
+                worker.connection.commit()
+            except oracledb.Error as e:
+                self._rollback(workers[position:])
+                rows_committed = sum(w.rows_inserted for w in workers[:position])
+                raise PartialCommitException(f"The commit of {worker.name} failed after {position} of {len(workers)} "
+                                             f"sessions were committed, {rows_committed} inserted rows remain in the "
+                                             f"table, the rest was rolled back. {e}",
+                                             rows_committed=rows_committed) from e
+
+    def _rollback(self, workers: List[_Worker]):
+        for worker in workers:
+            try:
+                worker.connection.rollback()
+            except oracledb.Error as e:
+                self._logger.warning(f"Rollback in {worker.name} failed: {e}")
@@ -0,0 +1,188 @@
+import gzip
+import io
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, TextIO
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class _ChunkStream(io.RawIOBase):
+    """
+    Read only stream over an iterator of byte chunks.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._buffer:
+            self._buffer = next(self._chunks, b'')
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class CSVInput:
+    """
+    Input data of a load: a plain CSV file, a gzip compressed CSV file or a sliced table, i.e. a directory of
+    (compressed) part files.
+
+    Compressed and sliced inputs are streamed, they are never unpacked to disk. The stream contains the parts one
+    after another and at most one header at its start.
+    """
+
+    def __init__(self, path: str, header: bool = True, slice_header: bool = False):
+        """
+
+        Args:
+            path: CSV file, gzip file (.gz) or directory with the slices
+            header: The file starts with a header, applies to single files
+            slice_header: Each slice starts with a header, only the first one is kept. Keboola slices have no header.
+
+        """
+        self.path = path
+        self._sliced = os.path.isdir(path)
+        self._header = slice_header if self._sliced else header
+
+    @property
+    def has_header(self) -> bool:
+        """
+        The stream starts with a header line.
+        """
+        return self._header
+
+    @property
+    def is_plain_file(self) -> bool:
+        """
+        Uncompressed single file, can be read directly from the disk.
+        """
+        return not self._sliced and not self.path.endswith('.gz')
+
+    @property
+    def parts(self) -> List[Path]:
+        if not self._sliced:
+            return [Path(self.path)]
+        return sorted(p for p in Path(self.path).iterdir()
+                      if p.is_file() and not p.name.startswith('.') and p.suffix != '.manifest')
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes on the disk, i.e. compressed for the compressed inputs.
+        """
+        return sum(part.stat().st_size for part in self.parts)
+
+    @staticmethod
+    def _open_part(part: Path) -> BinaryIO:
+        if part.suffix == '.gz':
+            return gzip.open(part, 'rb')
+        return open(part, 'rb')
+
+    def iter_chunks(self, chunk_size: int = COPY_BUFFER_SIZE) -> Iterator[bytes]:
+        for index, part in enumerate(self.parts):
+            with self._open_part(part) as source:
+                if self._sliced and self._header and index > 0:
+                    source.readline()
+                last = b'\n'
+                while chunk := source.read(chunk_size):
+                    last = chunk[-1:]
+                    yield chunk
+                if last != b'\n':
+                    # the next part must start on a new line
+                    yield b'\n'
+
+    def open_binary(self) -> BinaryIO:
+        if self.is_plain_file:
+            return open(self.path, 'rb')
+        return io.BufferedReader(_ChunkStream(self.iter_chunks()), buffer_size=COPY_BUFFER_SIZE)
+
+    def open_text(self, encoding: str = 'utf-8') -> TextIO:
+        if self.is_plain_file:
+            return open(self.path, 'r', encoding=encoding, newline='')
+        return io.TextIOWrapper(self.open_binary(), encoding=encoding, newline='')
+
+    @contextmanager
+    def file_path(self) -> Iterator[str]:
+        """
+        Path of a file with the whole stream for readers that need a path, e.g. sqlldr data=.
+        Plain files are returned as they are, other inputs are streamed through a named pipe.
+
+        Raises: the error of the stream (e.g. a corrupted gzip file) after the reader is finished
+        """
+        if self.is_plain_file:
+            yield self.path
+            return
+
+        with named_pipe(self.iter_chunks(), f'the input {self.path}') as fifo_path:
+            yield fifo_path
+
+
+@contextmanager
+def named_pipe(chunks: Iterable[bytes], description: str) -> Iterator[str]:
+    """
+    Path of a named pipe fed with the chunks by a background thread, nothing is written to disk.
+
+    Args:
+        chunks: Content of the pipe, iterated in the feeding thread
+        description: Name of the content in the error messages
+
+    Raises: the error of the chunks after the reader is finished
+    """
+    folder = tempfile.mkdtemp(prefix='csv_input_')
+    fifo_path = os.path.join(folder, 'data.csv')
+    os.mkfifo(fifo_path)
+    stop = threading.Event()
+    errors = []
+
+    def feed():
+        try:
+            with open(fifo_path, 'wb') as pipe:
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    pipe.write(chunk)
+        except BrokenPipeError:
+            # the reader stopped reading, it reports its own failure
+            pass
+        except BaseException as e:
+            errors.append(e)
+
+    feeder = threading.Thread(target=feed, name='csv-input-fifo', daemon=True)
+    feeder.start()
+    try:
+        yield fifo_path
+    finally:
+        _stop_feeder(feeder, stop, fifo_path)
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if errors:
+        logging.error(f"Streaming of {description} failed, the reader got incomplete data.")
+        raise errors[0]
+
+
+def _stop_feeder(feeder: threading.Thread, stop: threading.Event, fifo_path: str):
+    if not feeder.is_alive():
+        return
+    # the reader never opened the pipe or ended early, unblock the feeder and drain what it still writes
+    stop.set()
+    fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        while feeder.is_alive():
+            try:
+                os.read(fd, COPY_BUFFER_SIZE)
+            except BlockingIOError:
+                feeder.join(0.01)
+    finally:
+        os.close(fd)
+    feeder.join()
@@ -0,0 +1,132 @@
+import os
+from typing import Iterator, List, Tuple
+
+READ_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+class CSVSplitter:
+    """
+    Splits CSV file into byte ranges that start and end on record boundaries.
+
+    Quoted fields may contain embedded newlines (SQL*Loader `CSV WITH EMBEDDED`), so a newline is only
+    considered a record terminator when the number of quote characters before it is even. Escaped quotes
+    are doubled ("") so they never change the parity.
+    """
+
+    def __init__(self, quotechar: str = '"', read_block_size: int = READ_BLOCK_SIZE):
+        self._quote = quotechar.encode('utf-8')
+        self._block_size = read_block_size
+
+    def find_chunk_ranges(self, data_path: str, parts: int, skip_header: bool = True) -> List[Tuple[int, int]]:
+        """
+        Finds byte ranges splitting the file into approximately equally sized chunks.
+
+        Args:
+            data_path: Path of the CSV file
+            parts: Requested number of chunks, fewer are returned for small files
+            skip_header: Exclude the first record (header) from the ranges
+
+        Returns: List of (start, end) byte offsets, end exclusive
+
+        """
+        file_size = os.path.getsize(data_path)
+        data_start = self._find_boundaries(data_path, [0])[0] if skip_header else 0
+        if data_start >= file_size:
+            return []
+
+        step = (file_size - data_start) / max(parts, 1)
+        targets = [int(data_start + step * i) for i in range(1, parts)]
+        boundaries = [b for b in self._find_boundaries(data_path, targets) if data_start < b < file_size]
+
+        edges = [data_start] + sorted(set(boundaries)) + [file_size]
+        return [(start, end) for start, end in zip(edges, edges[1:]) if end > start]
+
+    def _find_boundaries(self, data_path: str, targets: List[int]) -> List[int]:
+        """
+        Returns the first record boundary (offset after the record terminator) at or after each target offset.
+        Targets without any boundary behind them map to the end of the file.
+        """
+        pending = sorted(targets)
+        result = []
+        parity = 0
+        block_start = 0
+        with open(data_path, 'rb') as inp:
+            while pending:
+                block = inp.read(self._block_size)
+                if not block:
+                    break
+                block_end = block_start + len(block)
+                pos = 0
+                while pending and pending[0] < block_end:
+                    search_from = max(pending[0] - block_start, pos)
+                    # advance the parity up to the search position
+                    parity ^= block.count(self._quote, pos, search_from) & 1
+                    pos = search_from
+                    boundary = self._next_boundary_in_block(block, pos, parity)
+                    if boundary is None:
+                        break
+                    parity ^= block.count(self._quote, pos, boundary) & 1
+                    pos = boundary
+                    result.append(block_start + boundary)
+                    pending.pop(0)
+                    while pending and pending[0] < block_start + boundary:
+                        result.append(block_start + boundary)
+                        pending.pop(0)
+
+                parity ^= block.count(self._quote, pos) & 1
+                block_start = block_end
+
+        result.extend([block_start] * len(pending))
+        return result
+
+    def _next_boundary_in_block(self, block: bytes, pos: int, parity: int):
+        newline = block.find(b'\n', pos)
+        while newline != -1:
+            parity ^= block.count(self._quote, pos, newline) & 1
+            if parity == 0:
+                return newline + 1
+            pos = newline
+            newline = block.find(b'\n', newline + 1)
+        return None
+
+    def count_records(self, data_path: str, start: int, end: int) -> int:
+        """
+        Counts the records of a byte range returned by find_chunk_ranges(), newlines within quoted fields are
+        not counted.
+        """
+        records = 0
+        parity = 0
+        for block in self.iter_range(data_path, start, end):
+            if parity == 0 and self._quote not in block:
+                records += block.count(b'\n')
+                continue
+            pos = 0
+            newline = block.find(b'\n')
+            while newline != -1:
+                parity ^= block.count(self._quote, pos, newline) & 1
+                if parity == 0:
+                    records += 1
+                pos = newline
+                newline = block.find(b'\n', newline + 1)
+            parity ^= block.count(self._quote, pos) & 1
+        return records
+
+    def iter_range(self, data_path: str, start: int, end: int) -> Iterator[bytes]:
+        """
+        Reads a byte range of the source file in blocks, e.g. to stream a chunk through a named pipe.
+
+        Args:
+            data_path: Path of the CSV file
+            start: Start offset of a range returned by find_chunk_ranges()
+            end: End offset of the range, exclusive
+
+        """
+        with open(data_path, 'rb') as inp:
+            inp.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                data = inp.read(min(self._block_size, remaining))
+                if not data:
+                    break
+                yield data
+                remaining -= len(data)
@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import oracledb
+
+
+class WriterUserException(Exception):
+    """
+    Error caused by the configuration or the data, reported to the user. Kept apart from the writer so that
+    catching it does not import the database driver.
+    """
+
+    def __init__(self, *args, db_error: Optional['oracledb.DatabaseError'] = None):
+        self.db_error = db_error
+        super().__init__(*args)
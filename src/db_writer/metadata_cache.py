@@ -0,0 +1,62 @@
+import copy
+import threading
+from typing import Dict, Optional
+
+from db_writer.table_schema import ColumnSchema, TableSchema
+
+# ColumnSchema attributes filled by OracleMetadataProvider
+CACHED_COLUMN_ATTRIBUTES = ('name', 'source_type', 'source_type_signature', 'nullable', 'length', 'precision',
+                            'scale')
+# entries of older formats are not used, e.g. format 1 stored the NULLABLE flag as Y or N
+CACHE_FORMAT = 2
+
+
+class TableMetadataCache:
+    """
+    Thread safe cache of the destination table metadata, serializable into the component state.
+
+    Each entry is stored with the LAST_DDL_TIME of the table and is valid only while the table keeps it.
+    Only the tables looked up in the current run are serialized, entries of dropped tables do not pile up.
+    The cache is shared by the threads and writers of a run, it hands out copies of the cached TableSchema.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, dict]] = None):
+        """
+
+        Args:
+            entries: Entries from the to_dict() output of a previous run
+
+        """
+        self._entries: Dict[str, dict] = dict(entries or {})
+        self._tables: Dict[str, TableSchema] = {}
+        self._used = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(owner: str, table_name: str) -> str:
+        return f'{owner}.{table_name}'
+
+    def get(self, owner: str, table_name: str, last_ddl_time: str) -> Optional[TableSchema]:
+        key = self.key(owner, table_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry.get('last_ddl_time') != last_ddl_time or entry.get('format', 1) != CACHE_FORMAT:
+                return None
+            self._used.add(key)
+            if key not in self._tables:
+                self._tables[key] = TableSchema(table_name,
+                                                [ColumnSchema(**column) for column in entry.get('columns', [])])
+            return copy.deepcopy(self._tables[key])
+
+    def put(self, owner: str, table_name: str, last_ddl_time: str, table_schema: TableSchema):
+        key = self.key(owner, table_name)
+        columns = [{attribute: getattr(column, attribute) for attribute in CACHED_COLUMN_ATTRIBUTES}
+                   for column in table_schema.columns]
+        with self._lock:
+            self._entries[key] = {'last_ddl_time': last_ddl_time, 'format': CACHE_FORMAT, 'columns': columns}
+            self._tables[key] = copy.deepcopy(table_schema)
+            self._used.add(key)
+
+    def to_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {key: entry for key, entry in self._entries.items() if key in self._used}
@@ -0,0 +1,263 @@
+import csv
+import itertools
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Context, Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from configuration import DefaultFormatOptions
+from db_writer.csv_input import CSVInput
+from db_writer.csv_splitter import CSVSplitter
+from db_writer.metadata_cache import CACHED_COLUMN_ATTRIBUTES
+from db_writer.rejected_rows import RejectedRow
+from db_writer.row_converter import RowConverter
+from db_writer.table_schema import ColumnSchema
+
+# bytes of the input validated by one task of the process pool, small enough for the running tasks to end soon
+# after the violations are found
+CHUNK_SIZE = 32 * 1024 * 1024
+# rows validated between the checks whether to stop
+STOP_CHECK_ROWS = 1000
+# large enough for any NUMBER value, the default context would round the values to 28 digits
+DECIMAL_CONTEXT = Context(prec=200)
+
+# set in the pool processes by _init_worker, index of the first chunk known to reach the violation limit, the later
+# chunks are not needed
+_stop_after_chunk = None
+
+
+@dataclass
+class PreflightResult:
+    rows_checked: int = 0
+    # rows with at least one violation, in the order of the input
+    violations: List[RejectedRow] = field(default_factory=list)
+    # the pass stopped at the violation limit, the rest of the input was not checked
+    stopped: bool = False
+
+
+class RowValidator:
+    """
+    Checks the CSV rows against the destination columns the way Oracle would reject them: empty values of NOT NULL
+    columns, strings longer than the column, numbers exceeding the precision, numbers and dates that cannot be
+    parsed using the default formats.
+
+    The checks never reject a value Oracle accepts. The length is checked in characters, which is the lower bound
+    of the byte length in any database character set. Date formats that cannot be parsed client side are not
+    checked, like in the query load.
+    """
+
+    def __init__(self, columns: List[Optional[ColumnSchema]], default_format: DefaultFormatOptions):
+        """
+
+        Args:
+            columns: Destination columns in the order of the CSV columns, None for the columns that are not loaded
+
+        """
+        self._column_count = len(columns)
+        self._projection = None
+        if None in columns:
+            self._projection = [idx for idx, col in enumerate(columns) if col is not None]
+            columns = [col for col in columns if col is not None]
+        self._columns = columns
+        self._converter = RowConverter(columns, default_format)
+        self._not_null = [idx for idx, col in enumerate(columns) if not col.nullable]
+        self._lengths = [(idx, int(col.length)) for idx, col in enumerate(columns)
+                         if 'CHAR' in (col.source_type or '').upper() and col.length]
+        self._precisions = [(idx, col.precision, col.scale or 0) for idx, col in enumerate(columns)
+                            if (col.source_type or '').upper() == 'NUMBER' and col.precision]
+
+    def validate(self, rows: List[list], first_row_number: int) -> List[RejectedRow]:
+        """
+        Returns: Rows with at least one violation, the error lists all violations of the row
+        """
+        violations = []
+        column_count = self._column_count
+        errors = {position: [f"Row has {len(row)} values, {column_count} columns are expected."]
+                  for position, row in enumerate(rows) if len(row) != column_count}
+        complete_rows = [row for row in rows if len(row) == column_count] if errors else rows
+        if self._projection is not None:
+            complete_rows = [[row[idx] for idx in self._projection] for row in complete_rows]
+        converted, positions, failures = self._converter.convert_rows_lenient(complete_rows)
+        if errors:
+            # positions of the complete rows in the source rows
+            source_positions = [position for position, row in enumerate(rows) if len(row) == column_count]
+            positions = [source_positions[position] for position in positions]
+            failures = [(source_positions[position], error) for position, error in failures]
+        errors.update({position: [error] for position, error in failures})
+        for position, row in zip(positions, converted):
+            row_errors = self._find_errors(row)
+            if row_errors:
+                errors[position] = row_errors
+        for position in sorted(errors):
+            violations.append(RejectedRow(first_row_number + position, rows[position], '; '.join(errors[position])))
+        return violations
+
+    def _find_errors(self, row: list) -> List[str]:
+        columns = self._columns
+        errors = []
+        for idx in self._not_null:
+            if row[idx] is None or row[idx] == '':
+                errors.append(f"Column {columns[idx].name} is NOT NULL, the value is empty.")
+        for idx, length in self._lengths:
+            if len(row[idx]) > length:
+                errors.append(f"Value of column {columns[idx].name} has {len(row[idx])} characters, "
+                              f"the column allows at most {length}.")
+        for idx, precision, scale in self._precisions:
+            if row[idx] is not None and not self._fits_precision(row[idx], precision, scale):
+                errors.append(f"Value '{row[idx]}' of column {columns[idx].name} exceeds the precision "
+                              f"of NUMBER({precision},{scale}).")
+        return errors
+
+    @staticmethod
+    def _fits_precision(value, precision: int, scale: int) -> bool:
+        try:
+            # Oracle rounds the value to the scale first, e.g. 999.5 does not fit NUMBER(3)
+            rounded = Decimal(value).quantize(Decimal(1).scaleb(-scale), rounding=ROUND_HALF_UP,
+                                              context=DECIMAL_CONTEXT)
+        except InvalidOperation:
+            return False
+        return not rounded or rounded.adjusted() + 1 <= precision - scale
+
+
+def _column_attributes(columns: List[Optional[ColumnSchema]]) -> List[Optional[dict]]:
+    # the type converters of ColumnSchema cannot be pickled, the pool processes get the plain attributes
+    return [{attribute: getattr(column, attribute) for attribute in CACHED_COLUMN_ATTRIBUTES}
+            if column is not None else None for column in columns]
+
+
+def _init_worker(stop_after_chunk):
+    global _stop_after_chunk
+    _stop_after_chunk = stop_after_chunk
+
+
+def _read_range(data_path: str, start: int, end: int) -> Iterator[str]:
+    """
+    Lines of the byte range, the range starts and ends on record boundaries.
+    """
+    with open(data_path, 'rb') as data_file:
+        data_file.seek(start)
+        position = start
+        while position < end:
+            line = data_file.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode('utf-8')
+
+
+def _validate_rows(validator: RowValidator, rows: Iterable[list], max_violations: int,
+                   cancelled: Callable[[], bool] = lambda: False) -> PreflightResult:
+    """
+    Rows are numbered from 1 within the rows given.
+    """
+    result = PreflightResult()
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, STOP_CHECK_ROWS)):
+        result.violations.extend(validator.validate(batch, result.rows_checked + 1))
+        result.rows_checked += len(batch)
+        if len(result.violations) >= max_violations or cancelled():
+            result.stopped = True
+            break
+    del result.violations[max_violations:]
+    return result
+
+
+def _stop_after(chunk_index: int):
+    with _stop_after_chunk.get_lock():
+        _stop_after_chunk.value = min(_stop_after_chunk.value, chunk_index)
+
+
+def _validate_range(column_attributes: List[Optional[dict]], default_format: DefaultFormatOptions, data_path: str,
+                    chunk_index: int, byte_range: Tuple[int, int], max_violations: int) -> PreflightResult:
+    if _stop_after_chunk.value < chunk_index:
+        return PreflightResult(stopped=True)
+    validator = RowValidator([ColumnSchema(**attributes) if attributes is not None else None
+                              for attributes in column_attributes], default_format)
+    result = _validate_rows(validator, csv.reader(_read_range(data_path, *byte_range), delimiter=','),
+                            max_violations, cancelled=lambda: _stop_after_chunk.value < chunk_index)
+    if len(result.violations) >= max_violations:
+        _stop_after(chunk_index)
+    return result
+
+
+class PreflightValidator:
+    """
+    Validates the whole input before any data is written, so a load bound to fail is stopped within seconds
+    instead of failing in the database hours later. The input is streamed. Uncompressed single files are split
+    into chunks on record boundaries, which are validated by a pool of processes.
+
+    The pass stops at the first max_violations rows with violations. Chunks are evaluated in the order of the
+    input, the reported violations are always the first ones of the input and their row numbers are exact.
+    """
+
+    def __init__(self, columns: List[Optional[ColumnSchema]], default_format: DefaultFormatOptions,
+                 max_violations: int = 10,
+                 workers: int = 4, chunk_size: int = CHUNK_SIZE, logger: Optional[logging.Logger] = None):
+        """
+
+        Args:
+            columns: Destination columns in the order of the CSV columns, None for the columns that are not loaded
+            max_violations: Number of rows with violations to stop at
+            workers: Number of processes, 1 validates in the current process
+
+        """
+        self._columns = columns
+        self._default_format = default_format
+        self._max_violations = max(max_violations, 1)
+        self._workers = max(workers, 1)
+        self._chunk_size = chunk_size
+        self._logger = logger or logging.getLogger(__name__)
+
+    def validate(self, data_path: str) -> PreflightResult:
+        data_input = CSVInput(data_path)
+        if self._workers > 1 and data_input.is_plain_file and data_input.size > self._chunk_size:
+            result = self._validate_chunks(data_path, data_input.has_header)
+        else:
+            result = self._validate_stream(data_input)
+        self._logger.info(f"Pre-flight validation checked {result.rows_checked} rows"
+                          f"{' before it stopped' if result.stopped else ''}, "
+                          f"{len(result.violations)} rows violate the destination table definition.")
+        return result
+
+    def _validate_stream(self, data_input: CSVInput) -> PreflightResult:
+        validator = RowValidator(self._columns, self._default_format)
+        with data_input.open_text() as csv_file:
+            if data_input.has_header:
+                csv_file.readline()
+            return _validate_rows(validator, csv.reader(csv_file, delimiter=','), self._max_violations)
+
+    def _validate_chunks(self, data_path: str, skip_header: bool) -> PreflightResult:
+        parts = max(self._workers, math.ceil(os.path.getsize(data_path) / self._chunk_size))
+        ranges = CSVSplitter().find_chunk_ranges(data_path, parts, skip_header=skip_header)
+        column_attributes = _column_attributes(self._columns)
+        # the tables are loaded from threads, a forked worker could inherit a lock held by another thread
+        context = multiprocessing.get_context('spawn')
+        # the chunks before the first one reaching the limit are always validated completely, they may hold
+        # earlier violations and their row counts number the rows of the next chunks
+        stop_after_chunk = context.Value('q', len(ranges))
+        result = PreflightResult()
+        executor = ProcessPoolExecutor(max_workers=self._workers, mp_context=context,
+                                       initializer=_init_worker, initargs=(stop_after_chunk,))
+        try:
+            futures = [executor.submit(_validate_range, column_attributes, self._default_format, data_path,
+                                       chunk_index, byte_range, self._max_violations)
+                       for chunk_index, byte_range in enumerate(ranges)]
+            for chunk_index, future in enumerate(futures):
+                chunk = future.result()
+                for violation in chunk.violations:
+                    violation.row_number += result.rows_checked
+                result.violations.extend(chunk.violations)
+                result.rows_checked += chunk.rows_checked
+                if len(result.violations) >= self._max_violations:
+                    result.stopped = chunk_index < len(futures) - 1 or chunk.stopped
+                    with stop_after_chunk.get_lock():
+                        stop_after_chunk.value = min(stop_after_chunk.value, chunk_index)
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        del result.violations[self._max_violations:]
+        return result
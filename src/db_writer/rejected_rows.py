@@ -0,0 +1,73 @@
+import csv
+import re
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+class RejectedRowsLimitExceeded(Exception):
+    pass
+
+
+@dataclass
+class RejectedRow:
+    """
+    Input row refused by the database.
+    """
+    row_number: Optional[int]
+    values: List[str]
+    error: str
+
+
+class RejectedRowsCollector:
+    """
+    Thread safe collection of rejected rows with an error budget.
+    """
+
+    def __init__(self, max_rejected_rows: int = 0):
+        self.max_rejected_rows = max_rejected_rows
+        self.rows: List[RejectedRow] = []
+        self._lock = threading.Lock()
+
+    def add(self, rows: List[RejectedRow]):
+        """
+        Raises: RejectedRowsLimitExceeded when the total number of rejected rows exceeds the budget
+
+        """
+        with self._lock:
+            self.rows.extend(rows)
+            total = len(self.rows)
+        if total > self.max_rejected_rows:
+            raise RejectedRowsLimitExceeded(f"{total} rows were rejected by the database, which exceeds the "
+                                            f"allowed maximum of {self.max_rejected_rows} rejected rows. "
+                                            f"First error: {self.rows[0].error}")
+
+
+def parse_sqlldr_rejected_rows(log_text: str, bad_file_path: str, skipped_records: int = 0,
+                               field_delimiter: str = ',') -> List[RejectedRow]:
+    """
+    Pairs the records written to the SQL*Loader bad file with the rejection messages from the log.
+    Both are written in the order of the rejections.
+
+    Args:
+        log_text: Content of the SQL*Loader log
+        bad_file_path: Path of the SQL*Loader bad file
+        skipped_records: Number of skipped records (header), subtracted from the record numbers
+        field_delimiter:
+
+    Returns: List of RejectedRow
+
+    """
+    errors = [(int(match.group(1)) - skipped_records, f'{match.group(2).strip()} {match.group(3).strip()}'.strip())
+              for match in re.finditer(r'^Record (\d+): Rejected - ([^\n]*)\n([^\n]*)', log_text, re.MULTILINE)]
+    try:
+        with open(bad_file_path, 'r', newline='') as bad_file:
+            records = list(csv.reader(bad_file, delimiter=field_delimiter))
+    except FileNotFoundError:
+        records = []
+
+    rejected = []
+    for index, (row_number, error) in enumerate(errors):
+        values = records[index] if index < len(records) else []
+        rejected.append(RejectedRow(row_number=row_number, values=values, error=error))
+    return rejected
@@ -0,0 +1,272 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, List, Optional, Tuple
+
+import oracledb
+
+from configuration import DefaultFormatOptions
+from db_writer.table_schema import ColumnSchema
+
+# Oracle datetime format elements supported by strptime, longest first. FF alone accepts up to 9 digits, more than
+# strptime parses, such masks are left to Oracle.
+ORACLE_FORMAT_ELEMENTS = [('YYYY', '%Y'), ('RRRR', '%Y'), ('HH24', '%H'), ('FF1', '%f'), ('FF2', '%f'),
+                          ('FF3', '%f'), ('FF4', '%f'), ('FF5', '%f'), ('FF6', '%f'),
+                          ('MM', '%m'), ('DD', '%d'), ('MI', '%M'), ('SS', '%S')]
+ORACLE_FORMAT_SEPARATORS = ' -/:.,;T'
+
+# formats parsed by the faster datetime.fromisoformat, which accepts more than the format, e.g. a time part or an
+# offset, the values must match the pattern exactly
+_ISO_DATE = r'\d{4}-\d{2}-\d{2}'
+_ISO_TIME = r'\d{2}:\d{2}:\d{2}'
+ISO_FORMATS = {
+    '%Y-%m-%d': re.compile(_ISO_DATE),
+    '%Y-%m-%d %H:%M:%S': re.compile(f'{_ISO_DATE} {_ISO_TIME}'),
+    '%Y-%m-%d %H:%M:%S.%f': re.compile(rf'{_ISO_DATE} {_ISO_TIME}\.\d{{1,6}}'),
+    '%Y-%m-%dT%H:%M:%S': re.compile(f'{_ISO_DATE}T{_ISO_TIME}'),
+    '%Y-%m-%dT%H:%M:%S.%f': re.compile(rf'{_ISO_DATE}T{_ISO_TIME}\.\d{{1,6}}')
+}
+
+INTEGER_MAX_PRECISION = 18
+
+Converter = Callable[[str], Any]
+
+
+class ValueConversionError(Exception):
+    pass
+
+
+@dataclass
+class RowProjection:
+    """
+    Loaded values of the source rows, e.g. the input columns not skipped.
+    """
+    # positions of the loaded values in the source rows
+    positions: List[int]
+    # number of values in the source rows
+    width: int
+
+
+def oracle_to_python_format(oracle_format: str) -> Optional[str]:
+    """
+    Translates Oracle datetime format mask into strptime format.
+
+    Args:
+        oracle_format: e.g. YYYY-MM-DD HH24:MI:SS.FF6
+
+    Returns: strptime format or None if the mask contains elements that strptime cannot parse
+
+    """
+    result = ''
+    remaining = oracle_format.upper()
+    while remaining:
+        if remaining[0] == '"':
+            literal_end = remaining.find('"', 1)
+            if literal_end == -1:
+                return None
+            result += remaining[1:literal_end].replace('%', '%%')
+            remaining = remaining[literal_end + 1:]
+            continue
+        if remaining[0] in ORACLE_FORMAT_SEPARATORS:
+            result += remaining[0]
+            remaining = remaining[1:]
+            continue
+        element = next((e for e in ORACLE_FORMAT_ELEMENTS if remaining.startswith(e[0])), None)
+        if not element:
+            return None
+        result += element[1]
+        remaining = remaining[len(element[0]):]
+    return result
+
+
+class RowConverter:
+    """
+    Converts CSV string rows into native Python values matching the destination column types and provides
+    the corresponding bind variable types for cursor.setinputsizes().
+
+    Columns whose type is not recognized (or whose format mask cannot be parsed client side) are passed
+    as strings and converted by Oracle using the session NLS settings.
+    """
+
+    def __init__(self, columns: List[ColumnSchema], default_format: DefaultFormatOptions,
+                 projection: Optional[RowProjection] = None):
+        """
+
+        Args:
+            columns: Schema of the converted values
+            projection: Positions of the converted values in the source rows, None when the rows hold only them
+
+        """
+        self._columns = columns
+        self._default_format = default_format
+        self._projection = projection
+        self.input_sizes = [self._get_input_size(c) for c in columns]
+        converters = [self._get_converter(c) for c in columns]
+        # string columns are passed through, convert only the rest
+        self._converters = [(idx, conv) for idx, conv in enumerate(converters) if conv is not None]
+
+    def convert_rows(self, rows: List[list]) -> List[list]:
+        """
+        Converts the rows in place, projected rows are converted as new lists.
+
+        Raises: ValueConversionError when value cannot be converted to the column type
+
+        """
+        if self._projection is not None:
+            rows = [self._project(row) for row in rows]
+        converters = self._converters
+        if not converters:
+            return rows
+        try:
+            for row in rows:
+                for idx, conv in converters:
+                    row[idx] = conv(row[idx])
+        except (ValueError, ArithmeticError, IndexError):
+            self._raise_conversion_error(rows)
+        return rows
+
+    def convert_rows_lenient(self, rows: List[list]) -> Tuple[List[list], List[int], List[Tuple[int, str]]]:
+        """
+        Converts copies of the rows, the source rows are kept untouched. Rows that cannot be converted are skipped.
+
+        Returns: Tuple of converted rows, their positions in the source rows and (position, error message) of the
+            rows that could not be converted
+
+        """
+        converted, positions, failures = [], [], []
+        converters = self._converters
+        for position, row in enumerate(rows):
+            if self._projection is None:
+                new_row = list(row)
+            else:
+                try:
+                    row = self._project(row)
+                except ValueConversionError as e:
+                    failures.append((position, str(e)))
+                    continue
+                new_row = list(row)
+            try:
+                for idx, conv in converters:
+                    new_row[idx] = conv(new_row[idx])
+            except (ValueError, ArithmeticError, IndexError):
+                failures.append((position, self._find_conversion_error(row)))
+                continue
+            converted.append(new_row)
+            positions.append(position)
+        return converted, positions, failures
+
+    def _project(self, row: list) -> list:
+        projection = self._projection
+        if len(row) != projection.width:
+            raise ValueConversionError(f"Row {row} has {len(row)} values, the input has {projection.width} columns.")
+        return [row[position] for position in projection.positions]
+
+    def _raise_conversion_error(self, rows: List[list]):
+        # slow path, find the offending value
+        for row in rows:
+            error = self._find_conversion_error(row)
+            if error:
+                raise ValueConversionError(error)
+        raise ValueConversionError("Failed to convert the loaded values to the destination column types.")
+
+    def _find_conversion_error(self, row: list) -> Optional[str]:
+        for idx, conv in self._converters:
+            if idx >= len(row):
+                return f"Row {row} has fewer values than the number of loaded columns."
+            value = row[idx]
+            if isinstance(value, str):
+                try:
+                    conv(value)
+                except (ValueError, ArithmeticError):
+                    column = self._columns[idx]
+                    return (f"Value '{value}' of column {column.name} cannot be converted "
+                            f"to the destination type {column.source_type}.")
+        return None
+
+    @staticmethod
+    def _base_type(column: ColumnSchema) -> str:
+        source_type = (column.source_type or '').upper()
+        if 'TIME ZONE' in source_type:
+            # e.g. TIMESTAMP(6) WITH TIME ZONE, bound as a string so Oracle keeps the offset or the region
+            return 'TIMESTAMP WITH TIME ZONE'
+        return source_type.split('(')[0]
+
+    def _get_input_size(self, column: ColumnSchema) -> Any:
+        base_type = self._base_type(column)
+        if base_type in ('NUMBER', 'FLOAT', 'INTEGER'):
+            return oracledb.DB_TYPE_NUMBER
+        if base_type in ('BINARY_DOUBLE', 'BINARY_FLOAT'):
+            return oracledb.DB_TYPE_BINARY_DOUBLE
+        if base_type == 'DATE' and self._get_datetime_converter(self._default_format.date_format):
+            return oracledb.DB_TYPE_DATE
+        if base_type == 'TIMESTAMP' and self._get_datetime_converter(self._default_format.timestamp_format):
+            return oracledb.DB_TYPE_TIMESTAMP
+        if 'CHAR' in base_type and column.length:
+            # fixed maximum size avoids re-binding the variable when a longer value appears in a batch
+            return int(column.length)
+        return None
+
+    def _get_converter(self, column: ColumnSchema) -> Optional[Converter]:
+        base_type = self._base_type(column)
+        if base_type in ('NUMBER', 'INTEGER'):
+            if column.scale == 0 and (column.precision or 0) <= INTEGER_MAX_PRECISION:
+                return _to_int
+            return _to_decimal
+        if base_type == 'FLOAT':
+            return _to_decimal
+        if base_type in ('BINARY_DOUBLE', 'BINARY_FLOAT'):
+            return _to_float
+        if base_type == 'DATE':
+            return self._get_datetime_converter(self._default_format.date_format)
+        if base_type == 'TIMESTAMP':
+            return self._get_datetime_converter(self._default_format.timestamp_format)
+        return None
+
+    @staticmethod
+    def _get_datetime_converter(oracle_format: str) -> Optional[Converter]:
+        python_format = oracle_to_python_format(oracle_format)
+        if python_format is None:
+            return None
+
+        iso_pattern = ISO_FORMATS.get(python_format)
+        if iso_pattern is not None:
+            match_iso = iso_pattern.fullmatch
+
+            def convert_iso(value: str):
+                if not value:
+                    return None
+                if match_iso(value):
+                    return datetime.fromisoformat(value)
+                # raises ValueError for the values not matching the format
+                return datetime.strptime(value, python_format)
+
+            return convert_iso
+
+        def convert(value: str):
+            return datetime.strptime(value, python_format) if value else None
+
+        return convert
+
+
+def _to_int(value: str):
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        # e.g. 1.0 or 1e3, let Oracle round it as it would do with the string
+        return _to_decimal(value)
+
+
+def _to_decimal(value: str):
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation as e:
+        raise ValueError(value) from e
+
+
+def _to_float(value: str):
+    return float(value) if value else None
@@ -0,0 +1,79 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass
+class PhaseMetric:
+    phase: str
+    # destination table, empty for the phases of the whole run
+    table_name: str = ''
+    started_at: str = ''
+    duration_seconds: float = 0
+    rows: Optional[int] = None
+    bytes: Optional[int] = None
+    # success or failed
+    status: str = 'success'
+
+
+class RunMetrics:
+    """
+    Thread safe collector of the duration, rows and bytes of the run phases: startup, client_init, connect,
+    nls_setup, metadata, pre_script, temp_table_ddl, load, merge, commit, drop and post_script.
+    """
+
+    def __init__(self):
+        self._phases: List[PhaseMetric] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, phase: str, table_name: str = '', rows: Optional[int] = None,
+              bytes: Optional[int] = None) -> Iterator[PhaseMetric]:
+        """
+        Measures the enclosed block. Rows and bytes known only at the end can be set on the yielded metric.
+        """
+        metric = PhaseMetric(phase, table_name, datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                             rows=rows, bytes=bytes)
+        started = time.perf_counter()
+        try:
+            yield metric
+        except BaseException:
+            metric.status = 'failed'
+            raise
+        finally:
+            metric.duration_seconds = round(time.perf_counter() - started, 3)
+            with self._lock:
+                self._phases.append(metric)
+
+    def record(self, phase: str, duration_seconds: float, table_name: str = ''):
+        """
+        Adds a phase measured elsewhere, e.g. before the collector existed.
+        """
+        metric = PhaseMetric(phase, table_name, datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                             duration_seconds=round(duration_seconds, 3))
+        with self._lock:
+            self._phases.append(metric)
+
+    @property
+    def phases(self) -> List[PhaseMetric]:
+        with self._lock:
+            return list(self._phases)
+
+    def totals(self) -> Dict[str, float]:
+        """
+        Returns: Summed duration of each recorded phase
+        """
+        totals: Dict[str, float] = {}
+        for metric in self.phases:
+            totals[metric.phase] = round(totals.get(metric.phase, 0) + metric.duration_seconds, 3)
+        return totals
+
+    def to_dict(self) -> dict:
+        phases = self.phases
+        return {'phases': [asdict(metric) for metric in phases],
+                'totals': self.totals(),
+                'rows_loaded': sum(m.rows or 0 for m in phases if m.phase == 'load' and m.status == 'success'),
+                'bytes_loaded': sum(m.bytes or 0 for m in phases if m.phase == 'load' and m.status == 'success')}
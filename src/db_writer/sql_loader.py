@@ -1,19 +1,234 @@
 import logging
 import os
+import re
 import subprocess
 import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Literal, List, Tuple
+from typing import Callable, Dict, Literal, List, Optional, Tuple
 
 from configuration import DefaultFormatOptions
+from db_writer.csv_input import named_pipe
+from db_writer.csv_splitter import CSVSplitter
+from db_writer.rejected_rows import RejectedRow, parse_sqlldr_rejected_rows
+
+# sqlldr exit code for loads finished with rejected or discarded rows
+SQLLDR_EX_WARN = 2
+
+# conventional path prints commit points, direct path prints data save points
+PROGRESS_LINE = re.compile(r'(?:Commit|Save data) point reached - logical record count (\d+)')
+
+PROGRESS_LOG_INTERVAL = 30
+
+ESTIMATE_SAMPLE_SIZE = 1024 * 1024
+
+# limits of the auto-tuned buffers, readsize must not be lower than bindsize
+AUTO_MAX_BINDSIZE = 16 * 1024 * 1024
+AUTO_MAX_READSIZE = 20 * 1024 * 1024
+AUTO_MAX_STREAMSIZE = 8 * 1024 * 1024
+AUTO_MIN_STREAMSIZE = 256000
+AUTO_MAX_ROWS = 50000
+AUTO_MIN_ROWS = 64
+# sqlldr length and indicator bytes of each bound field
+FIELD_OVERHEAD = 4
+# buffer of delimited fields without an explicit length
+DEFAULT_FIELD_WIDTH = 255
+# field of a CSV column that is read but not loaded, wide enough for any value the destination could take
+FILLER_FIELD = 'FILLER CHAR(32767)'
 
 
 class SQLLoaderException(Exception):
-    pass
+    def __init__(self, *args, result: Optional['SQLLoaderResult'] = None, commit_point: int = 0):
+        super().__init__(*args)
+        # row statistics of the failed run, when known
+        self.result = result
+        # logical record count of the last commit point printed by sqlldr, counted from the start of the file
+        self.commit_point = commit_point
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Args:
+        value: e.g. 00:01:02.35
+
+    """
+    if not value:
+        return None
+    seconds = 0.0
+    for part in value.split(':'):
+        seconds = seconds * 60 + float(part)
+    return round(seconds, 2)
+
+
+@dataclass
+class SQLLoaderResult:
+    """
+    Statistics of a finished SQL*Loader run parsed from its log.
+    """
+    rows_loaded: int = 0
+    rows_rejected: int = 0
+    rejected_rows: List[RejectedRow] = field(default_factory=list)
+    # rows filtered out by the WHEN clauses or with all fields null
+    rows_discarded: int = 0
+    # logical records read, excluding the skipped ones
+    rows_read: int = 0
+    # logical records committed by a run that crashed without writing the statistics to its log, from the last
+    # commit point, excluding the skipped ones
+    rows_committed: Optional[int] = None
+    # conventional path bind array
+    bind_array_rows: Optional[int] = None
+    bind_array_bytes: Optional[int] = None
+    elapsed_seconds: Optional[float] = None
+    cpu_seconds: Optional[float] = None
+    # number of rejected rows per column, for the errors of a particular column
+    column_errors: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_log(cls, log_text: str) -> 'SQLLoaderResult':
+        def total(pattern: str) -> int:
+            return sum(int(r) for r in re.findall(pattern, log_text))
+
+        def first(pattern: str) -> Optional[str]:
+            match = re.search(pattern, log_text)
+            return match.group(1) if match else None
+
+        bind_array = re.search(r'Space allocated for bind array:\s+(\d+) bytes\((\d+) rows\)', log_text)
+        column_errors = Counter(match.group(1).strip('"') for match in
+                                re.finditer(r'^Record \d+: Rejected - Error on table .*, column (.+)\.\s*$', log_text,
+                                            re.MULTILINE))
+        return cls(rows_loaded=total(r'(\d+) Rows? successfully loaded'),
+                   rows_rejected=total(r'(\d+) Rows? not loaded due to data errors'),
+                   rows_discarded=total(r'Total logical records discarded:\s+(\d+)'),
+                   rows_read=total(r'Total logical records read:\s+(\d+)'),
+                   bind_array_rows=int(bind_array.group(2)) if bind_array else None,
+                   bind_array_bytes=int(bind_array.group(1)) if bind_array else None,
+                   elapsed_seconds=_parse_duration(first(r'Elapsed time was:\s+([\d:.]+)')),
+                   cpu_seconds=_parse_duration(first(r'CPU time was:\s+([\d:.]+)')),
+                   column_errors=dict(column_errors))
+
+    @classmethod
+    def merge(cls, results: List['SQLLoaderResult']) -> 'SQLLoaderResult':
+        """
+        Combines the results of concurrent runs, the elapsed time is the longest one.
+        """
+        elapsed = [r.elapsed_seconds for r in results if r.elapsed_seconds is not None]
+        cpu = [r.cpu_seconds for r in results if r.cpu_seconds is not None]
+        bind_array = next((r for r in results if r.bind_array_rows is not None), cls())
+        column_errors = Counter()
+        for result in results:
+            column_errors.update(result.column_errors)
+        return cls(rows_loaded=sum(r.rows_loaded for r in results),
+                   rows_rejected=sum(r.rows_rejected for r in results),
+                   rejected_rows=[row for r in results for row in r.rejected_rows],
+                   rows_discarded=sum(r.rows_discarded for r in results),
+                   rows_read=sum(r.rows_read for r in results),
+                   bind_array_rows=bind_array.bind_array_rows,
+                   bind_array_bytes=bind_array.bind_array_bytes,
+                   elapsed_seconds=max(elapsed) if elapsed else None,
+                   cpu_seconds=round(sum(cpu), 2) if cpu else None,
+                   column_errors=dict(column_errors))
+
+    def summary(self) -> str:
+        text = f"{self.rows_loaded} rows loaded, {self.rows_rejected} rejected, {self.rows_discarded} discarded"
+        if self.elapsed_seconds is not None:
+            text += f", elapsed {self.elapsed_seconds} s, CPU {self.cpu_seconds} s"
+        if self.bind_array_rows:
+            text += f", bind array {self.bind_array_rows} rows ({self.bind_array_bytes} bytes)"
+        if self.column_errors:
+            text += ". Rejected rows per column: " + ', '.join(f'{column}: {count}'
+                                                               for column, count in self.column_errors.items())
+        return text
+
+
+class SQLLoaderProgress:
+    """
+    Logs the progress reported on the sqlldr standard output with the load rate and the estimated remaining time.
+    """
+
+    def __init__(self, name: str, expected_records: Optional[int] = None,
+                 interval: float = PROGRESS_LOG_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        """
+
+        Args:
+            name: Identifies the load in the messages
+            expected_records: Estimated number of records in the data file, the remaining time is logged when known
+            interval: Minimal number of seconds between two messages
+
+        """
+        self._name = name
+        self._expected_records = expected_records
+        self._interval = interval
+        self._clock = clock
+        self._started = clock()
+        self._last_logged = self._started
+        self.records = 0
+
+    def feed(self, line: str):
+        match = PROGRESS_LINE.search(line)
+        if not match:
+            return
+        self.records = int(match.group(1))
+        now = self._clock()
+        if now - self._last_logged >= self._interval:
+            self._last_logged = now
+            logging.info(self.message(now))
+
+    def message(self, now: float) -> str:
+        elapsed = now - self._started
+        rate = self.records / elapsed if elapsed > 0 else 0
+        message = f"SQL*Loader {self._name}: {self.records} records processed, {rate:.0f} rows/s"
+        if self._expected_records and rate:
+            remaining = max(self._expected_records - self.records, 0) / rate
+            message += f", estimated {remaining:.0f} s remaining"
+        return message
+
+
+def tune_buffer_sizes(field_widths: List[int], data_size: Optional[int] = None, direct: bool = False,
+                      parallel_workers: int = 1) -> Dict[str, int]:
+    """
+    Sizes the sqlldr buffers so that the whole bind array (conventional path) or column array (direct path) fits
+    in them, otherwise sqlldr silently lowers the number of rows of wide tables.
+
+    Args:
+        field_widths: Maximum byte width of each field in the data file
+        data_size: Size of the data file in bytes, None when unknown (streamed inputs)
+        direct: Direct path load
+        parallel_workers: The data file is split among the sqlldr processes
+
+    Returns: sqlldr parameters - rows, bindsize and readsize or readsize, columnarrayrows and streamsize
+    """
+    row_width = sum(field_widths) + FIELD_OVERHEAD * len(field_widths)
+    max_records = None
+    if data_size is not None:
+        # each field takes at least its delimiter, a smaller file cannot have more records
+        max_records = max(AUTO_MIN_ROWS, data_size // max(1, parallel_workers) // max(1, len(field_widths)))
+
+    def fitting_rows(buffer_size: int) -> int:
+        rows = max(1, min(AUTO_MAX_ROWS, buffer_size // row_width))
+        return min(rows, max_records) if max_records else rows
+
+    chunk_size = data_size // max(1, parallel_workers) if data_size is not None else AUTO_MAX_READSIZE
+    if direct:
+        # rows of direct path are the data save interval, the column array is sized instead
+        columnarrayrows = fitting_rows(AUTO_MAX_STREAMSIZE)
+        streamsize = max(AUTO_MIN_STREAMSIZE, min(AUTO_MAX_STREAMSIZE, columnarrayrows * row_width))
+        readsize = max(AUTO_MIN_STREAMSIZE, min(AUTO_MAX_READSIZE, chunk_size + 1))
+        return {"readsize": readsize, "columnarrayrows": columnarrayrows, "streamsize": streamsize}
+
+    rows = fitting_rows(AUTO_MAX_BINDSIZE)
+    bindsize = rows * row_width
+    readsize = max(bindsize, min(AUTO_MAX_READSIZE, chunk_size + 1))
+    return {"rows": rows, "bindsize": bindsize, "readsize": readsize}
 
 
 class CTLFileBuilder:
-    CTLLoadMode = Literal['INSERT', 'TRUNCATE', 'REPLACE']
+    CTLLoadMode = Literal['INSERT', 'APPEND', 'TRUNCATE', 'REPLACE']
 
     @staticmethod
     def _load_data_into(table_name: str, character_set: str = 'UTF8'):
@@ -124,12 +339,14 @@ class SQLLoaderExecutor:
                   table_name: str,
                   columns: List[Tuple[str, str]],
                   skip_first_line: bool = True,
-                  mode: Literal['INSERT', 'TRUNCATE', 'REPLACE'] = 'INSERT',
+                  mode: CTLFileBuilder.CTLLoadMode = 'INSERT',
                   field_delimiter: str = ',',
                   errors: int = 50,
                   rows: int = 5000,
                   bindsize: int = 8000000,
-                  **kwargs):
+                  parallel_workers: int = 1,
+                  skip_records: int = 0,
+                  **kwargs) -> SQLLoaderResult:
         """
 
         Performs sqlldr command to load data.
@@ -180,14 +397,32 @@ class SQLLoaderExecutor:
             errors:
             rows:
             bindsize:
+            parallel_workers: Number of concurrent sqlldr processes. When higher than 1 the input file is split
+                into chunks at record boundaries and each chunk is streamed to its own process through a named
+                pipe and loaded in APPEND mode. Each process may reject all allowed rows, their sum is checked
+                after the load. REPLACE and TRUNCATE modes are not supported, the table must be emptied by the
+                caller in a transaction of its own.
+                Direct path chunks run with parallel=TRUE and skip_index_maintenance=TRUE.
+            skip_records: Number of data records to skip after the header, e.g. when continuing a previous load.
+                Not supported with parallel_workers.
             **kwargs:
 
-        Returns:
+        Returns: SQLLoaderResult with the (combined) statistics parsed from the SQL*Loader log
+
+        Raises: SQLLoaderException, with the statistics of the failed single process run in its result
 
         """
         self._prepare_log_folder()
+        if parallel_workers > 1:
+            if skip_records:
+                raise SQLLoaderException("Parallel SQL*Loader load cannot skip records.")
+            return self._load_data_parallel(data_path, table_name, columns, skip_first_line, mode, field_delimiter,
+                                            parallel_workers,
+                                            {"errors": errors, "rows": rows, "bindsize": bindsize, **kwargs})
+
         ctl_file_path = CTLFileBuilder.build(table_name, columns, mode, self._global_format, field_delimiter)
-        skip = 1 if skip_first_line else 0
+        header = 1 if skip_first_line else 0
+        skip = header + skip_records
         logging.info(f"Sqlldr control file \n: {open(ctl_file_path, 'r').read()}")
         parameters = {
             "userid": self._uid_string,
@@ -202,7 +437,115 @@ class SQLLoaderExecutor:
         }
 
         parameters = {**parameters, **kwargs}
-        self._execute_sqlloader(parameters)
+        try:
+            self._execute_sqlloader(parameters)
+        except SQLLoaderException as e:
+            e.result = self._collect_result(parameters, field_delimiter, skip_records)
+            if not e.result.rows_read:
+                e.result.rows_committed = max(e.commit_point - skip, 0)
+            raise
+        result = self._collect_result(parameters, field_delimiter, skip_records)
+        logging.info(f"SQL*Loader finished: {result.summary()}.")
+        return result
+
+    def _load_data_parallel(self, data_path: str, table_name: str, columns: List[Tuple[str, str]],
+                            skip_first_line: bool, mode: CTLFileBuilder.CTLLoadMode, field_delimiter: str,
+                            parallel_workers: int, load_parameters: dict) -> SQLLoaderResult:
+        if mode in ('REPLACE', 'TRUNCATE'):
+            raise SQLLoaderException(f"Parallel SQL*Loader load does not support the {mode} mode, "
+                                     f"the table must be emptied before the load.")
+
+        if load_parameters.get('direct'):
+            # concurrent direct path sessions cannot maintain indexes, they must be rebuilt after the load
+            load_parameters = {**load_parameters, "parallel": True, "skip_index_maintenance": True}
+
+        # INSERT requires an empty table, which holds only for the first chunk to commit
+        ctl_file_path = CTLFileBuilder.build(table_name, columns, 'APPEND', self._global_format, field_delimiter)
+        logging.info(f"Sqlldr control file \n: {open(ctl_file_path, 'r').read()}")
+
+        splitter = CSVSplitter()
+        ranges = splitter.find_chunk_ranges(data_path, parallel_workers, skip_header=skip_first_line)
+        with ExitStack() as chunk_pipes:
+            # each process reads its byte range of the input through a named pipe, the chunks are not copied
+            chunk_paths = [chunk_pipes.enter_context(named_pipe(splitter.iter_range(data_path, start, end),
+                                                                f'chunk {index} of {data_path}'))
+                           for index, (start, end) in enumerate(ranges)]
+            logging.info(f"Input file split into {len(chunk_paths)} chunks, "
+                         f"running {len(chunk_paths)} SQL*Loader processes in parallel.")
+
+            parameters = [{"userid": self._uid_string,
+                           "control": ctl_file_path,
+                           "data": chunk_path,
+                           "bad": self._chunk_bad_log_path(index),
+                           "log": self._chunk_log_file_path(index),
+                           "skip": 0,
+                           **load_parameters} for index, chunk_path in enumerate(chunk_paths)]
+
+            with ThreadPoolExecutor(max_workers=parallel_workers) as executor:
+                outcomes = list(executor.map(partial(self._execute_sqlloader_chunk, field_delimiter=field_delimiter),
+                                             parameters))
+
+        results = [outcome[0] for outcome in outcomes]
+        self._number_rejected_rows(splitter, data_path, ranges, results)
+        result = SQLLoaderResult.merge(results)
+        failures = [outcome[1] for outcome in outcomes if outcome[1]]
+        if failures:
+            raise SQLLoaderException(f'{len(failures)} of {len(outcomes)} parallel SQL*Loader processes failed. '
+                                     f'{result.rows_loaded} rows were loaded by the rest, '
+                                     f'{result.rows_rejected} rows were rejected. Log in event detail. '
+                                     f'{failures[0].args[0]}',
+                                     '\n\n'.join(str(f.args[1]) for f in failures if len(f.args) > 1))
+        errors = int(load_parameters.get('errors', 0))
+        if result.rows_rejected > errors:
+            raise SQLLoaderException(f'The parallel SQL*Loader processes rejected {result.rows_rejected} rows in '
+                                     f'total, which exceeds the allowed maximum of {errors} rejected rows. '
+                                     f'{result.rows_loaded} rows were loaded. First error: '
+                                     f'{result.rejected_rows[0].error if result.rejected_rows else ""}')
+
+        logging.info(f"SQL*Loader finished in {len(outcomes)} parallel processes: {result.summary()}.")
+        return result
+
+    def _execute_sqlloader_chunk(self, parameters: dict,
+                                 field_delimiter: str = ',') -> Tuple[SQLLoaderResult, SQLLoaderException | None]:
+        error = None
+        try:
+            self._execute_sqlloader(parameters)
+        except SQLLoaderException as e:
+            error = e
+        # record numbers are relative to the chunk, not to the input file
+        return self._collect_result(parameters, field_delimiter), error
+
+    @staticmethod
+    def _number_rejected_rows(splitter: CSVSplitter, data_path: str, ranges: List[Tuple[int, int]],
+                              results: List[SQLLoaderResult]):
+        """
+        Turns the record numbers of the rejected rows relative to their chunk into the row numbers of the input.
+        The records of the preceding chunks are counted only when a chunk has rejected rows.
+        """
+        last_rejected = max((index for index, result in enumerate(results) if result.rejected_rows), default=-1)
+        rows_before = 0
+        for index in range(last_rejected + 1):
+            for row in results[index].rejected_rows:
+                row.row_number += rows_before
+            if index < last_rejected:
+                rows_before += splitter.count_records(data_path, *ranges[index])
+
+    def _collect_result(self, parameters: dict, field_delimiter: str, skip_records: int = 0) -> SQLLoaderResult:
+        log_text = self._read_log(parameters['log'])
+        result = SQLLoaderResult.from_log(log_text)
+        if result.rows_rejected:
+            # row numbers count the data rows from the start of the file, including the skipped ones
+            result.rejected_rows = parse_sqlldr_rejected_rows(log_text, parameters['bad'],
+                                                              skipped_records=int(parameters.get('skip', 0))
+                                                              - skip_records,
+                                                              field_delimiter=field_delimiter)
+        return result
+
+    def _within_error_budget(self, parameters: dict) -> bool:
+        log_text = self._read_log(parameters['log'])
+        if 'discontinued' in log_text.lower():
+            return False
+        return SQLLoaderResult.from_log(log_text).rows_rejected <= int(parameters.get('errors', 50))
 
     @property
     def bad_log_path(self) -> str:
@@ -212,26 +555,76 @@ class SQLLoaderExecutor:
     def log_file_path(self) -> str:
         return Path(f'{self._log_folder}/log.log').as_posix()
 
+    def _chunk_bad_log_path(self, index: int) -> str:
+        return Path(f'{self._log_folder}/bad_{index}.log').as_posix()
+
+    def _chunk_log_file_path(self, index: int) -> str:
+        return Path(f'{self._log_folder}/log_{index}.log').as_posix()
+
+    @staticmethod
+    def _read_log(log_path: str) -> str:
+        if not os.path.exists(log_path):
+            return ''
+        with open(log_path, 'r') as log_file:
+            return log_file.read()
+
     @staticmethod
     def _build_args_from_dict(parameters: dict):
-        args = [f"{key}={value}" for key, value in parameters.items()]
+        args = []
+        for key, value in parameters.items():
+            if value is None:
+                # not set, keep the sqlldr default
+                continue
+            if isinstance(value, bool):
+                value = 'TRUE' if value else 'FALSE'
+            args.append(f"{key}={value}")
         return args
 
+    @staticmethod
+    def _estimate_records(data_path: str, sample_size: int = ESTIMATE_SAMPLE_SIZE) -> Optional[int]:
+        """
+        Estimates the number of records from the file size and the line length of its start.
+
+        Returns: None for the streamed inputs (named pipes), their size is not known up front
+        """
+        if not os.path.isfile(data_path):
+            return None
+        with open(data_path, 'rb') as data_file:
+            sample = data_file.read(sample_size)
+        lines = sample.count(b'\n')
+        if not lines:
+            return None
+        return int(os.path.getsize(data_path) / (len(sample) / lines))
+
     def _execute_sqlloader(self, parameters: dict):
         additional_args = self._build_args_from_dict(parameters)
         args = [self._sql_loader_path] + additional_args
         process = subprocess.Popen(args,
                                    stdout=subprocess.PIPE,
-                                   stderr=subprocess.PIPE)
+                                   stderr=subprocess.PIPE,
+                                   text=True)
 
         logging.info(f'Running SQL loader command: {args}')
-        stdout, stderr = process.communicate()
-        process.poll()
-
-        if process.poll() != 0:
-            full_log = open(self.log_file_path, 'r').read()
-            raise SQLLoaderException(f'Failed to execute the SQL*Loader script. Log in event detail. {stderr}',
-                                     full_log)
+        # stderr is drained aside, a full pipe would block the process
+        stderr_lines = []
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        stderr_reader.start()
+        progress = SQLLoaderProgress(Path(parameters['log']).stem, self._estimate_records(parameters['data']))
+        stdout_lines = []
+        for line in process.stdout:
+            stdout_lines.append(line)
+            progress.feed(line)
+        return_code = process.wait()
+        stderr_reader.join()
+        stdout, stderr = ''.join(stdout_lines), ''.join(stderr_lines)
+
+        if return_code == SQLLDR_EX_WARN and self._within_error_budget(parameters):
+            logging.warning(f'SQL*Loader finished with rejected rows within the allowed maximum. {stderr}')
+        elif return_code != 0:
+            full_log = self._read_log(parameters['log'])
+            raise SQLLoaderException(f'Failed to execute the SQL*Loader script. Log in event detail. '
+                                     f'{SQLLoaderResult.from_log(full_log).summary()}. {stderr}',
+                                     full_log, commit_point=progress.records)
         elif stderr:
             logging.warning(stderr)
 
@@ -15,6 +15,8 @@ class ColumnSchema:
     description: Optional[str] = None
     nullable: bool = False
     length: Optional[str] = None
+    precision: Optional[int] = None
+    scale: Optional[int] = None
     default: Optional[str] = None
     additional_properties: dict = field(default_factory=dict)
 
@@ -23,6 +25,24 @@ class ColumnSchema:
         return self.base_type_converter(self.source_type)
 
 
+@dataclass
+class IndexSchema:
+    """
+    Defines an index (or a single index partition) of a table
+    """
+    owner: str
+    name: str
+    unique: bool = False
+    status: Optional[str] = None
+    partition_name: Optional[str] = None
+    # ALL_INDEXES.DEGREE, e.g. 1, 8 or DEFAULT
+    degree: Optional[str] = None
+
+    @property
+    def usable(self) -> bool:
+        return self.status != 'UNUSABLE'
+
+
 @dataclass
 class TableSchema:
     """
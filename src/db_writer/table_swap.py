@@ -0,0 +1,301 @@
+import logging
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from db_common.db_connection import DbConnection
+
+
+class TableSwapError(Exception):
+    pass
+
+
+@dataclass
+class SwapPlan:
+    """
+    Describes how the shadow table replaces the target table.
+
+    Exchange: the target has a single partition and no primary key or unique constraints, the partition is
+        exchanged with the shadow table. The target keeps its grants, comments, indexes and constraints.
+    Rename: the shadow table is created from the target DDL, indexes and constraints get temporary names.
+        After the load the comments and grants are copied to the shadow table, the tables are swapped by renaming
+        and the original names restored.
+    """
+    owner: str
+    table_name: str
+    shadow_name: str
+    partition_name: Optional[str] = None
+    create_statements: List[str] = field(default_factory=list)
+    post_load_statements: List[str] = field(default_factory=list)
+    # temporary -> original name
+    constraint_names: Dict[str, str] = field(default_factory=dict)
+    index_names: Dict[str, str] = field(default_factory=dict)
+    # the shadow table replaced the target, the rest of the swap only cleans up
+    swapped: bool = False
+
+    @property
+    def exchange(self) -> bool:
+        return self.partition_name is not None
+
+
+class ShadowTableSwap:
+    """
+    Replaces the whole content of a table by a shadow table loaded in the background, so readers never see the
+    table empty or half loaded.
+    """
+
+    SHADOW_PREFIX = 'KBC_SHADOW_'
+    OLD_PREFIX = 'KBC_OLD_'
+
+    def __init__(self, connection: DbConnection, logger: logging.Logger = None):
+        self._connection = connection
+        self._logger = logger or logging.getLogger(__name__)
+
+    @staticmethod
+    def _escape(identifier: str) -> str:
+        return f'"{identifier}"'
+
+    def _identifier(self, owner: str, name: str) -> str:
+        return f'{self._escape(owner)}.{self._escape(name)}'
+
+    def _query(self, query: str, bind_parameters: Optional[dict] = None) -> list:
+        return list(self._connection.perform_query(query, bind_parameters))
+
+    def _execute(self, statement: str):
+        self._logger.debug(f"Executing: {statement}")
+        self._query(statement)
+
+    def prepare(self, schema: Optional[str], table_name: str) -> SwapPlan:
+        """
+        Creates the empty shadow table.
+
+        Returns: SwapPlan to pass to finish() after the shadow table is loaded
+
+        """
+        owner = schema.strip().upper() if schema else self._query(
+            "SELECT SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') FROM DUAL")[0][0]
+        table_name = table_name.strip().upper()
+        shadow_name = self._short_name(self.SHADOW_PREFIX, owner, table_name)
+        self._drop_table_if_exists(owner, shadow_name)
+
+        partition_name = self._get_single_partition(owner, table_name)
+        if partition_name and self._has_unique_constraints(owner, table_name):
+            # CREATE TABLE FOR EXCHANGE copies no constraints, the exchange would fail with ORA-14130
+            self._logger.info(f"The table {owner}.{table_name} has primary key or unique constraints, "
+                              f"the shadow table is swapped by renaming instead of the partition exchange.")
+            partition_name = None
+        if partition_name:
+            plan = SwapPlan(owner, table_name, shadow_name, partition_name=partition_name)
+            plan.create_statements = [f"CREATE TABLE {self._identifier(owner, shadow_name)} "
+                                      f"FOR EXCHANGE WITH TABLE {self._identifier(owner, table_name)}"]
+        else:
+            plan = self._build_rename_plan(owner, table_name, shadow_name)
+
+        for statement in plan.create_statements:
+            self._execute(statement)
+        return plan
+
+    def finish(self, plan: SwapPlan):
+        """
+        Swaps the loaded shadow table with the target table and removes the old data.
+        """
+        for statement in plan.post_load_statements:
+            self._execute(statement)
+
+        if plan.exchange:
+            self._logger.info(f"Exchanging partition {plan.partition_name} of {plan.owner}.{plan.table_name} "
+                              f"with the loaded shadow table.")
+            self._execute(f"ALTER TABLE {self._identifier(plan.owner, plan.table_name)} "
+                          f"EXCHANGE PARTITION {self._escape(plan.partition_name)} "
+                          f"WITH TABLE {self._identifier(plan.owner, plan.shadow_name)} "
+                          f"EXCLUDING INDEXES UPDATE GLOBAL INDEXES")
+            # the shadow table now holds the previous data
+            self._execute(f"DROP TABLE {self._identifier(plan.owner, plan.shadow_name)} PURGE")
+            return
+
+        old_name = self._short_name(self.OLD_PREFIX, plan.owner, plan.table_name)
+        self._drop_table_if_exists(plan.owner, old_name)
+        self._logger.info(f"Swapping {plan.owner}.{plan.table_name} with the loaded shadow table.")
+        self._execute(f"ALTER TABLE {self._identifier(plan.owner, plan.table_name)} "
+                      f"RENAME TO {self._escape(old_name)}")
+        try:
+            self._execute(f"ALTER TABLE {self._identifier(plan.owner, plan.shadow_name)} "
+                          f"RENAME TO {self._escape(plan.table_name)}")
+        except Exception:
+            self._execute(f"ALTER TABLE {self._identifier(plan.owner, old_name)} "
+                          f"RENAME TO {self._escape(plan.table_name)}")
+            raise
+        plan.swapped = True
+        self._execute(f"DROP TABLE {self._identifier(plan.owner, old_name)} PURGE")
+        self._restore_original_names(plan)
+
+    def abort(self, plan: SwapPlan):
+        """
+        Cleans up after a failed load or swap. The target table keeps the previous data, unless the shadow table
+        already replaced it, then the remaining steps of the swap are completed.
+        """
+        if not plan.exchange:
+            old_name = self._short_name(self.OLD_PREFIX, plan.owner, plan.table_name)
+            if plan.swapped:
+                self._drop_table_if_exists(plan.owner, old_name)
+                self._restore_original_names(plan)
+            elif self._table_exists(plan.owner, old_name) and not self._table_exists(plan.owner, plan.table_name):
+                # the target was renamed and restoring the name failed
+                self._logger.info(f"Restoring the name of the table {plan.owner}.{plan.table_name}.")
+                self._execute(f"ALTER TABLE {self._identifier(plan.owner, old_name)} "
+                              f"RENAME TO {self._escape(plan.table_name)}")
+        self._drop_table_if_exists(plan.owner, plan.shadow_name)
+
+    def _restore_original_names(self, plan: SwapPlan):
+        """
+        Renames the constraints and indexes of the swapped table back, the ones already renamed by an interrupted
+        swap are skipped.
+        """
+        constraints = {c[0] for c in self._query("""SELECT CONSTRAINT_NAME FROM ALL_CONSTRAINTS
+                                                     WHERE OWNER = :owner AND TABLE_NAME = :table_name""",
+                                                 {"owner": plan.owner, "table_name": plan.table_name})}
+        for temporary, original in plan.constraint_names.items():
+            if temporary in constraints:
+                self._execute(f"ALTER TABLE {self._identifier(plan.owner, plan.table_name)} "
+                              f"RENAME CONSTRAINT {self._escape(temporary)} TO {self._escape(original)}")
+        indexes = {i[0] for i in self._query("""SELECT INDEX_NAME FROM ALL_INDEXES
+                                                 WHERE TABLE_OWNER = :owner AND TABLE_NAME = :table_name""",
+                                             {"owner": plan.owner, "table_name": plan.table_name})}
+        for temporary, original in plan.index_names.items():
+            if temporary in indexes:
+                self._execute(f"ALTER INDEX {self._identifier(plan.owner, temporary)} "
+                              f"RENAME TO {self._escape(original)}")
+
+    def _build_rename_plan(self, owner: str, table_name: str, shadow_name: str) -> SwapPlan:
+        self._validate_rename_swap(owner, table_name)
+        plan = SwapPlan(owner, table_name, shadow_name)
+
+        constraints = self._query("""SELECT CONSTRAINT_NAME, CONSTRAINT_TYPE, GENERATED, INDEX_NAME
+                                     FROM ALL_CONSTRAINTS WHERE OWNER = :owner AND TABLE_NAME = :table_name""",
+                                  {"owner": owner, "table_name": table_name})
+        constraint_indexes = {c[3] for c in constraints if c[3]}
+        indexes = [i[0] for i in self._query("""SELECT INDEX_NAME FROM ALL_INDEXES
+                                                 WHERE TABLE_OWNER = :owner AND TABLE_NAME = :table_name
+                                                   AND INDEX_TYPE <> 'LOB' AND GENERATED = 'N'""",
+                                             {"owner": owner, "table_name": table_name})]
+
+        renames: List[Tuple[str, str]] = []
+        for constraint_name, constraint_type, generated, index_name in constraints:
+            if generated != 'USER NAME':
+                continue
+            temporary = self._short_name(f'KBC_SC{len(renames)}_', owner, table_name)
+            renames.append((constraint_name, temporary))
+            plan.constraint_names[temporary] = constraint_name
+            if constraint_type in ('P', 'U') and index_name:
+                # the index created by ALTER TABLE ADD CONSTRAINT is named after the constraint
+                plan.index_names[temporary] = index_name
+        index_renames: List[Tuple[str, str]] = []
+        for index_name in indexes:
+            if index_name in constraint_indexes:
+                continue
+            temporary = self._short_name(f'KBC_SI{len(index_renames)}_', owner, table_name)
+            index_renames.append((index_name, temporary))
+            plan.index_names[temporary] = index_name
+
+        table_statements = self._get_ddl_statements('GET_DDL', 'TABLE', owner, table_name)
+        index_statements = [statement
+                            for statement in self._get_ddl_statements('GET_DEPENDENT_DDL', 'INDEX', owner, table_name)
+                            if not any(f'INDEX {self._identifier(owner, name)}' in statement
+                                       for name in constraint_indexes)]
+
+        def rewrite(statement: str) -> str:
+            statement = statement.replace(self._identifier(owner, table_name), self._identifier(owner, shadow_name))
+            for original, temporary in renames:
+                statement = statement.replace(f'CONSTRAINT {self._escape(original)}',
+                                              f'CONSTRAINT {self._escape(temporary)}')
+            for original, temporary in index_renames:
+                statement = statement.replace(f'INDEX {self._identifier(owner, original)}',
+                                              f'INDEX {self._identifier(owner, temporary)}')
+            return statement
+
+        # create the bare table first, indexes and constraints are built after the load
+        plan.create_statements = [rewrite(s) for s in table_statements if s.lstrip().upper().startswith('CREATE')]
+        plan.post_load_statements = [rewrite(s) for s in index_statements]
+        plan.post_load_statements += [rewrite(s) for s in table_statements
+                                      if not s.lstrip().upper().startswith('CREATE')]
+        # comments and grants move with the table on rename, the shadow table has them before it replaces the target
+        plan.post_load_statements += [rewrite(s) for object_type in ('COMMENT', 'OBJECT_GRANT')
+                                      for s in self._get_ddl_statements('GET_DEPENDENT_DDL', object_type, owner,
+                                                                        table_name)]
+        return plan
+
+    def _validate_rename_swap(self, owner: str, table_name: str):
+        referencing = self._query("""SELECT c.OWNER || '.' || c.TABLE_NAME || '.' || c.CONSTRAINT_NAME
+                                     FROM ALL_CONSTRAINTS c
+                                     JOIN ALL_CONSTRAINTS r
+                                       ON r.OWNER = c.R_OWNER AND r.CONSTRAINT_NAME = c.R_CONSTRAINT_NAME
+                                     WHERE c.CONSTRAINT_TYPE = 'R' AND r.OWNER = :owner
+                                       AND r.TABLE_NAME = :table_name
+                                       AND NOT (c.OWNER = :owner AND c.TABLE_NAME = :table_name)""",
+                                  {"owner": owner, "table_name": table_name})
+        if referencing:
+            raise TableSwapError(f"The table {owner}.{table_name} is referenced by foreign keys "
+                                 f"{[r[0] for r in referencing]}, it cannot be replaced by a shadow table.")
+        triggers = self._query("""SELECT TRIGGER_NAME FROM ALL_TRIGGERS
+                                  WHERE TABLE_OWNER = :owner AND TABLE_NAME = :table_name""",
+                               {"owner": owner, "table_name": table_name})
+        if triggers:
+            raise TableSwapError(f"The table {owner}.{table_name} has triggers {[t[0] for t in triggers]}, "
+                                 f"they would not be preserved by the shadow table swap.")
+
+    def _get_single_partition(self, owner: str, table_name: str) -> Optional[str]:
+        partitions = self._query("""SELECT p.PARTITION_NAME FROM ALL_TAB_PARTITIONS p
+                                    JOIN ALL_PART_TABLES t ON t.OWNER = p.TABLE_OWNER AND t.TABLE_NAME = p.TABLE_NAME
+                                    WHERE p.TABLE_OWNER = :owner AND p.TABLE_NAME = :table_name
+                                      AND t.SUBPARTITIONING_TYPE = 'NONE'""",
+                                 {"owner": owner, "table_name": table_name})
+        return partitions[0][0] if len(partitions) == 1 else None
+
+    def _has_unique_constraints(self, owner: str, table_name: str) -> bool:
+        return bool(self._query("""SELECT CONSTRAINT_NAME FROM ALL_CONSTRAINTS
+                                   WHERE OWNER = :owner AND TABLE_NAME = :table_name
+                                     AND CONSTRAINT_TYPE IN ('P', 'U')""",
+                                {"owner": owner, "table_name": table_name}))
+
+    def _get_ddl_statements(self, function: str, object_type: str, owner: str, table_name: str) -> List[str]:
+        self._execute("""BEGIN
+              DBMS_METADATA.SET_TRANSFORM_PARAM(DBMS_METADATA.SESSION_TRANSFORM, 'SQLTERMINATOR', TRUE);
+              DBMS_METADATA.SET_TRANSFORM_PARAM(DBMS_METADATA.SESSION_TRANSFORM, 'CONSTRAINTS_AS_ALTER', TRUE);
+              DBMS_METADATA.SET_TRANSFORM_PARAM(DBMS_METADATA.SESSION_TRANSFORM, 'PRETTY', FALSE);
+            END;""")
+        try:
+            rows = self._query(f"SELECT DBMS_METADATA.{function}(:object_type, :table_name, :owner) FROM DUAL",
+                               {"object_type": object_type, "table_name": table_name, "owner": owner})
+        except Exception as e:
+            # ORA-31608: specified object of type ... not found, e.g. no grants
+            if 'ORA-31608' in str(e):
+                return []
+            raise
+        finally:
+            self._execute("BEGIN DBMS_METADATA.SET_TRANSFORM_PARAM(DBMS_METADATA.SESSION_TRANSFORM, 'DEFAULT'); "
+                          "END;")
+        ddl = rows[0][0] if rows else ''
+        ddl = ddl.read() if hasattr(ddl, 'read') else (ddl or '')
+        return self.split_statements(ddl)
+
+    @staticmethod
+    def split_statements(ddl: str) -> List[str]:
+        statements = re.split(r';\s*(?:\n|$)', ddl)
+        return [s.strip() for s in statements if s.strip()]
+
+    def _table_exists(self, owner: str, table_name: str) -> bool:
+        return bool(self._query("SELECT 1 FROM ALL_TABLES WHERE OWNER = :owner AND TABLE_NAME = :table_name",
+                                {"owner": owner, "table_name": table_name}))
+
+    def _drop_table_if_exists(self, owner: str, table_name: str):
+        if self._table_exists(owner, table_name):
+            self._execute(f"DROP TABLE {self._identifier(owner, table_name)} PURGE")
+
+    @staticmethod
+    def _short_name(prefix: str, owner: str, table_name: str) -> str:
+        # stays within the 30 character limit of older databases
+        name = f'{prefix}{table_name}'
+        if len(name) <= 30:
+            return name
+        return f'{prefix}{zlib.crc32(f"{owner}.{table_name}".encode()):X}'
@@ -1,24 +1,59 @@
 import csv
+import itertools
 import logging
 import logging.handlers
 import os
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import List, Iterable, Optional, Literal, Tuple
+from typing import List, Iterable, Optional, Literal, Set, Tuple
 
 import oracledb
 from oracledb import DatabaseError
 
-from configuration import SQLLoaderOptions, DefaultFormatOptions
+from configuration import SQLLoaderOptions, DefaultFormatOptions, QueryLoadOptions, MergeOptions, PreflightOptions
 from db_common.db_connection import DbConnection
-from db_writer.sql_loader import SQLLoaderExecutor
-from db_writer.table_schema import TableSchema, ColumnSchema
+from db_writer.arrow_input import ArrowInput, ArrowInputError
+from db_writer.bucketed_merge import FAILURE_POLICIES, BucketedMerge, BucketedMergeException
+from db_writer.checkpoint import CheckpointStore, LoadCheckpoint
+from db_writer.concurrent_loader import COMMIT_POLICIES, ConcurrentQueryLoader, BatchInserter, PartialCommitException
+from db_writer.csv_input import CSVInput
+from db_writer.exceptions import WriterUserException
+from db_writer.metadata_cache import TableMetadataCache
+from db_writer.preflight import PreflightValidator
+from db_writer.rejected_rows import RejectedRow, RejectedRowsCollector, RejectedRowsLimitExceeded
+from db_writer.run_metrics import RunMetrics
+from db_writer.row_converter import RowConverter, RowProjection, ValueConversionError
+from db_writer.sql_loader import (DEFAULT_FIELD_WIDTH, FILLER_FIELD, SQLLoaderExecutor, SQLLoaderException,
+                                  tune_buffer_sizes)
+from db_writer.table_swap import ShadowTableSwap, TableSwapError
+from db_writer.table_schema import TableSchema, ColumnSchema, IndexSchema
+
+StagingTableStrategy = Literal['temporary', 'global_temporary', 'nologging']
+# direct_path is the direct path load API of python-oracledb, it needs the Thin mode
+LoadMethod = Literal['sqlldr', 'query', 'direct_path']
+# truncate_as_delete is the original name of the delete mode
+FullLoadMode = Literal['delete', 'truncate_as_delete', 'truncate', 'defined_procedure', 'shadow_swap']
+TruncateStorage = Literal['drop', 'reuse']
+# compared by DBMS_LOB.COMPARE in the upsert change detection
+LOB_TYPES = ('CLOB', 'NCLOB', 'BLOB')
+CHANGE_DETECTION_MODES = ('none', 'columns', 'hash')
+# limit of the concatenated values hashed at once, the VARCHAR2 limit of the standard MAX_STRING_SIZE
+HASH_INPUT_MAX_BYTES = 4000
+# maximum length of the text of a value of the other types, e.g. TO_CHAR of a NUMBER
+HASH_OPERAND_DEFAULT_WIDTH = 64
+
+# CREATE statement table type and properties of the persistent staging tables
+STAGING_TABLE_OPTIONS = {
+    'global_temporary': ('GLOBAL TEMPORARY TABLE', 'ON COMMIT PRESERVE ROWS'),
+    'nologging': ('TABLE', 'NOLOGGING')
+}
 
 
 class OracleConnection(DbConnection):
 
     def __init__(self, username: str, password: str, host: str, port: int, service_name: str,
                  insta_client_path: str = os.environ.get("HOME") + "/Downloads/instantclient_19_8",
+                 thick_mode: bool = True,
                  logger: str = __name__):
         self.__username = username
         self.__password = password
@@ -26,6 +61,7 @@ class OracleConnection(DbConnection):
         self.port = port
         self.service_name = service_name
         self._insta_client_path = insta_client_path
+        self._thick_mode = thick_mode
         self.__connection: oracledb.Connection | None = None
         self._connected = False
         self._logger = logging.getLogger(logger)
@@ -46,10 +82,21 @@ class OracleConnection(DbConnection):
         self.connect()
         self.__connection.close()
 
-    def connect(self) -> None:
-        # You must always call init_oracle_client() to use thick mode in any platform
-        oracledb.init_oracle_client(lib_dir=self._insta_client_path)
+    @property
+    def thick_mode(self) -> bool:
+        return self._thick_mode
+
+    def init_client(self) -> None:
+        """
+        Loads the Instant Client libraries in the Thick mode, the Thin mode needs no client libraries.
+        The libraries are loaded once per process.
+        """
+        if self._thick_mode and oracledb.is_thin_mode():
+            # You must always call init_oracle_client() to use thick mode in any platform
+            oracledb.init_oracle_client(lib_dir=self._insta_client_path)
 
+    def connect(self) -> None:
+        self.init_client()
         self.__connection = oracledb.connect(user=self.__username, password=self.__password, dsn=self.dsn)
         self._connected = True
 
@@ -60,6 +107,14 @@ class OracleConnection(DbConnection):
 
         return self.__connection
 
+    def create_pool(self, size: int, session_callback=None) -> oracledb.ConnectionPool:
+        """
+        Creates a pool of sessions with the same credentials. Requires connect() to be called first,
+        so the client libraries are initialized.
+        """
+        return oracledb.create_pool(user=self.__username, password=self.__password, dsn=self.dsn,
+                                    min=size, max=size, increment=0, session_callback=session_callback)
+
     def run_procedure(self, procedure_name, parameters: list = None, keyword_parameters: dict = None):
         cur = self.connection.cursor()
         try:
@@ -102,6 +157,25 @@ class OracleConnection(DbConnection):
 
         cursor.close()
 
+    def execute_dml(self, query: str, bind_parameters: Optional[dict] = None) -> int:
+        """
+        Executes a DML statement, e.g. MERGE.
+
+        Returns: Number of affected rows
+        """
+        cursor = self.connection.cursor()
+        self._logger.debug(f'Running statement: \n "{query}" \n '
+                           f'Parameters: {bind_parameters}')
+        try:
+            cursor.execute(query, bind_parameters)
+            return cursor.rowcount
+        except oracledb.DatabaseError as e:
+            error, = e.args
+            raise WriterUserException(f"Query failed with error: {error.message}",
+                                      {"query": query, "parameters": bind_parameters}, db_error=error)
+        finally:
+            cursor.close()
+
     def get_session_id(self) -> Tuple[int, int]:
         query = "SELECT SID, SERIAL# FROM V$SESSION WHERE AUDSID = Sys_Context('USERENV', 'SESSIONID')"
         res = self.perform_query(query)
@@ -114,34 +188,90 @@ class TableNotFoundError(Exception):
 
 
 class OracleMetadataProvider:
-    def __init__(self, connection: DbConnection):
+    def __init__(self, connection: DbConnection, cache: Optional[TableMetadataCache] = None):
         self.__connection = connection
+        self._cache = cache
 
     NO_LENGTH_DATATYPES = ('DATE', 'LONG', 'TIMESTAMP')
     NO_PRECISION_DATATYPES = ('FLOAT',)
 
     def get_table_metadata(self, schema: str, table_name: str) -> TableSchema:
-        table_schema = TableSchema(table_name, [])
-        query = """SELECT COLUMN_NAME, DATA_TYPE, 
-                         DATA_LENGTH, DATA_PRECISION, NULLABLE as nullable  
-                    FROM ALL_TAB_COLS 
-                    where TABLE_NAME = :table_name AND OWNER = :schema"""  # noqa
         schema_norm = schema.strip().upper() if schema is not None else schema
         table_norm = table_name.strip().upper()
+        if self._cache is None:
+            return self._query_table_metadata(schema_norm, table_norm)
+
+        # a single cheap dictionary lookup decides whether the cached columns are still valid
+        try:
+            owner, last_ddl_time = self.get_last_ddl_time(schema, table_name)
+        except TableNotFoundError:
+            # e.g. a view or a synonym, their LAST_DDL_TIME does not follow the changes of the underlying table
+            return self._query_table_metadata(schema_norm, table_norm)
+        table_schema = self._cache.get(owner, table_norm, last_ddl_time)
+        if table_schema is None:
+            table_schema = self._query_table_metadata(owner, table_norm)
+            self._cache.put(owner, table_norm, last_ddl_time, table_schema)
+        return table_schema
+
+    def get_last_ddl_time(self, schema: str | None, table_name: str) -> Tuple[str, str]:
+        """
+        Returns: Owner of the table and the time of its last DDL, e.g. ALTER or TRUNCATE
+        """
+        schema_norm = schema.strip().upper() if schema is not None else schema
+        table_norm = table_name.strip().upper()
+        query = """SELECT OWNER, TO_CHAR(LAST_DDL_TIME, 'YYYY-MM-DD"T"HH24:MI:SS')
+                    FROM ALL_OBJECTS
+                    WHERE OBJECT_NAME = :table_name AND OBJECT_TYPE = 'TABLE'
+                      AND OWNER = NVL(:schema, SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA'))"""
+        rows = list(self.__connection.perform_query(query, {"table_name": table_norm, "schema": schema_norm}))
+        if not rows:
+            raise TableNotFoundError(f"The specified table {schema_norm}.{table_norm} was not found.")
+        return rows[0][0], rows[0][1]
+
+    def _query_table_metadata(self, schema_norm: Optional[str], table_norm: str) -> TableSchema:
+        table_schema = TableSchema(table_norm, [])
+        query = """SELECT COLUMN_NAME, DATA_TYPE, 
+                         DATA_LENGTH, DATA_PRECISION, NULLABLE as nullable, DATA_SCALE  
+                    FROM ALL_TAB_COLS 
+                    where TABLE_NAME = :table_name 
+                      AND OWNER = NVL(:schema, SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA'))"""  # noqa
         rows = list(self.__connection.perform_query(query, {"table_name": table_norm, "schema": schema_norm}))
         if not rows:
             raise TableNotFoundError(f"The specified table {schema_norm}.{table_norm} was not found.")
 
         for res in rows:
+            # ALL_TAB_COLS.NULLABLE is Y or N
+            nullable = res[4] == 'Y'
             col = ColumnSchema(name=res[0],
                                source_type_signature=self._get_column_datatype_signature(res[1], res[2], res[3],
-                                                                                         res[4]),
+                                                                                         nullable),
                                source_type=res[1],
                                length=res[2],
-                               nullable=res[4])
+                               precision=res[3],
+                               scale=res[5],
+                               nullable=nullable)
             table_schema.add_column(col)
         return table_schema
 
+    def get_table_indexes(self, schema: str | None, table_name: str) -> List[IndexSchema]:
+        """
+        Returns indexes of the table. Partitioned indexes are returned per partition.
+        LOB indexes are excluded, they are maintained by Oracle.
+        """
+        query = """SELECT i.OWNER, i.INDEX_NAME, i.UNIQUENESS, NVL(p.STATUS, i.STATUS), p.PARTITION_NAME,
+                           TRIM(i.DEGREE)
+                    FROM ALL_INDEXES i
+                    LEFT JOIN ALL_IND_PARTITIONS p ON p.INDEX_OWNER = i.OWNER AND p.INDEX_NAME = i.INDEX_NAME
+                    WHERE i.TABLE_NAME = :table_name
+                      AND i.TABLE_OWNER = NVL(:schema, SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA'))
+                      AND i.INDEX_TYPE <> 'LOB'"""
+        schema_norm = schema.strip().upper() if schema is not None else schema
+        table_norm = table_name.strip().upper()
+        rows = self.__connection.perform_query(query, {"table_name": table_norm, "schema": schema_norm})
+        return [IndexSchema(owner=res[0], name=res[1], unique=res[2] == 'UNIQUE', status=res[3],
+                            partition_name=res[4], degree=res[5])
+                for res in rows]
+
     @staticmethod
     def _get_column_datatype_signature(dtype, length, precision, nullable) -> str:
         datatype = dtype
@@ -166,12 +296,8 @@ class OracleCredentials:
     port: int
     service_name: str
     insta_client_path: str = os.environ.get("HOME") + "/Downloads/instantclient_19_8"
-
-
-class WriterUserException(Exception):
-    def __init__(self, *args, db_error: Optional[oracledb.DatabaseError] = None):
-        self.db_error = db_error
-        super().__init__(*args)
+    # Thin mode needs no Instant Client, the direct_path load method works only in Thin mode
+    thick_mode: bool = True
 
 
 class OracleWriter:
@@ -181,12 +307,21 @@ class OracleWriter:
                  default_format: DefaultFormatOptions,
                  sql_loader_path: str = 'sqlldr',
                  load_batch_size: int = 5000,
-                 verbose_logging: bool = False, db_trace_enabled=False):
+                 verbose_logging: bool = False, db_trace_enabled=False,
+                 query_load_options: Optional[QueryLoadOptions] = None,
+                 merge_options: Optional[MergeOptions] = None,
+                 preflight_options: Optional[PreflightOptions] = None,
+                 max_rejected_rows: int = 0,
+                 staging_id: str = '',
+                 log_name: str = '',
+                 metadata_cache: Optional[TableMetadataCache] = None,
+                 resumable: bool = False,
+                 metrics: Optional[RunMetrics] = None):
         self.__credentials = oracle_credentials
-        self._logger = self._set_logger(log_folder, verbose_logging)
+        self._logger = self._set_logger(log_folder, verbose_logging, log_name)
         self._connection = OracleConnection(**asdict(self.__credentials),
                                             logger=__name__)
-        self._metadata_provider = OracleMetadataProvider(self._connection)
+        self._metadata_provider = OracleMetadataProvider(self._connection, cache=metadata_cache)
         self._sql_loader_options = sql_loader_options
 
         self._sql_loader = SQLLoaderExecutor(self._connection.dsn,
@@ -196,17 +331,38 @@ class OracleWriter:
                                              log_folder=log_folder,
                                              sql_loader_path=sql_loader_path)
         self.log_folder = log_folder
-        self._batch_size = load_batch_size
+        self._query_load_options = query_load_options or QueryLoadOptions(batch_size=load_batch_size)
+        self._batch_size = self._query_load_options.batch_size
+        self._merge_options = merge_options or MergeOptions()
+        if self._merge_options.change_detection not in CHANGE_DETECTION_MODES:
+            raise WriterUserException(f"Unsupported change detection: {self._merge_options.change_detection}, "
+                                      f"use one of {list(CHANGE_DETECTION_MODES)}.")
+        if self._merge_options.failure_policy not in FAILURE_POLICIES:
+            raise WriterUserException(f"Unsupported bucket failure policy: {self._merge_options.failure_policy}, "
+                                      f"use one of {list(FAILURE_POLICIES)}.")
+        if self._query_load_options.commit_policy not in COMMIT_POLICIES:
+            raise WriterUserException(f"Unsupported commit policy: {self._query_load_options.commit_policy}, "
+                                      f"use one of {list(COMMIT_POLICIES)}.")
+        self._preflight_options = preflight_options or PreflightOptions()
         self.trace_enabled = db_trace_enabled
         self._ext_session_id = ''
         self._default_format = default_format
+        self._rejected_rows = RejectedRowsCollector(max_rejected_rows)
+        self._staging_id = staging_id
+        self._resumable = resumable
+        self.metrics = metrics or RunMetrics()
 
     def connect(self, ext_session_id: str = ''):
         self._logger.debug("Connecting to database.")
         try:
-            self._connection.connect()
+            with self.metrics.phase('client_init'):
+                self._connection.init_client()
+            with self.metrics.phase('connect'):
+                self._connection.connect()
+            self._logger.info(f"Connected in the {'Thick' if self._connection.thick_mode else 'Thin'} mode.")
             self._logger.info("Setting default NLS session.")
-            self._set_default_session()
+            with self.metrics.phase('nls_setup'):
+                self._set_default_session()
         except DatabaseError as e:
             raise WriterUserException(f"Login to database failed, please check your credentials. Detail: {e}") from e
 
@@ -220,11 +376,25 @@ class OracleWriter:
         self.close_connection()
 
     def _set_default_session(self):
-        self.execute_script("alter session set NLS_NUMERIC_CHARACTERS = '. '")
-        self.execute_script(f"alter session set NLS_TIMESTAMP_FORMAT = '{self._default_format.timestamp_format}'")
-        self.execute_script(f"alter session set NLS_DATE_FORMAT = '{self._default_format.date_format}'")
+        for statement in self._get_default_session_statements():
+            self.execute_script(statement)
+
+    def _get_default_session_statements(self) -> List[str]:
+        return ["alter session set NLS_NUMERIC_CHARACTERS = '. '",
+                f"alter session set NLS_TIMESTAMP_FORMAT = '{self._default_format.timestamp_format}'",
+                f"alter session set NLS_DATE_FORMAT = '{self._default_format.date_format}'"]
+
+    def _init_pooled_session(self, connection: oracledb.Connection, requested_tag: str):
+        cursor = connection.cursor()
+        try:
+            for statement in self._get_default_session_statements():
+                cursor.execute(statement)
+        finally:
+            cursor.close()
 
     def close_connection(self):
+        if not self._connection.connected:
+            return
         self._logger.debug("Closing the connection.")
         self._connection.connection.close()
         if self.trace_enabled:
@@ -278,7 +448,7 @@ class OracleWriter:
         res = self._connection.perform_query(query)
         return list(res)[0][0]
 
-    def _set_logger(self, log_folder: str, verbose: bool = False) -> logging.Logger:
+    def _set_logger(self, log_folder: str, verbose: bool = False, log_name: str = '') -> logging.Logger:
         sql_log_path = Path(f'{log_folder}/writer_debug.log')
         sql_log_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -290,38 +460,198 @@ class OracleWriter:
         # handler.addFilter(DebugFilter())
         formatter = logging.Formatter("[%(asctime)s]:  %(message)s")
         handler.setFormatter(formatter)
-        logger = logging.getLogger(__name__)
+        # writers loading tables concurrently log into their own child logger and file
+        logger = logging.getLogger(f'{__name__}.{log_name}' if log_name else __name__)
         level = 'DEBUG' if verbose else 'INFO'
         logger.setLevel(level)
         logger.addHandler(handler)
 
         return logger
 
+    @property
+    def rejected_rows(self) -> List[RejectedRow]:
+        """
+        Rows refused by the database within the allowed maximum of rejected rows.
+        """
+        return self._rejected_rows.rows
+
     def execute_script(self, script: str, continue_on_failure: bool = False):
         res = self._connection.perform_query(script)
         return list(res)
 
     def upload_full(self, data_path: str, schema: str, table_name: str, columns: List[str],
-                    pre_procedure: Optional[str] = None, pre_procedure_parameters: Optional[list] = None):
-
-        table_metadata = self._metadata_provider.get_table_metadata(schema, table_name)
-        self._validate_schema(columns, table_metadata.columns)
+                    pre_procedure: Optional[str] = None, pre_procedure_parameters: Optional[list] = None,
+                    full_load_mode: FullLoadMode = 'truncate_as_delete', truncate_storage: TruncateStorage = 'drop',
+                    skip_columns: Optional[List[str]] = None):
+        """
+        Args:
+            pre_procedure: Procedure emptying the table, run only in the defined_procedure mode
+            columns: Destination columns in the order of the CSV columns, including the skipped ones
+            skip_columns: Columns of the CSV that are not loaded
 
+        """
+        table_metadata = self._get_table_metadata(schema, table_name)
+        self._validate_schema(self._loaded_columns(columns, skip_columns), table_metadata.columns)
+        self._validate_input(data_path, table_name, columns, table_metadata.columns, skip_columns)
+
+        if full_load_mode == 'defined_procedure' and not pre_procedure:
+            raise WriterUserException("The full load mode defined_procedure requires the PRE procedure name.")
+        if full_load_mode == 'shadow_swap':
+            self._upload_full_shadow_swap(data_path, schema, table_name, columns, table_metadata.columns,
+                                          skip_columns)
+            return
+
+        checkpoint = self._start_checkpoint(data_path, schema, table_name, method='sqlldr', restartable=True)
         sql_loader_mode = 'REPLACE'
-        if pre_procedure:
+        if checkpoint and checkpoint.offset:
+            # the table was already emptied by the interrupted run
+            sql_loader_mode = 'APPEND'
+        elif full_load_mode == 'defined_procedure':
+            # the procedure of the other modes is a leftover of the configuration, it is not run
             self._logger.info(f"Running PRE procedure '{pre_procedure}' with parameters {pre_procedure_parameters}")
             self._connection.run_procedure(pre_procedure, pre_procedure_parameters)
             # the procedure is expected to empty the table
             sql_loader_mode = 'INSERT'
-        self._logger.info(f"Inserting data in full mode using SQL*Loader, mode: {sql_loader_mode}")
-        self._load_data_into_table(data_path, schema, table_name, columns,
-                                   table_metadata.columns,
-                                   method='sqlldr',
-                                   mode=sql_loader_mode)
+        elif full_load_mode == 'truncate':
+            # DDL, commits immediately and cannot be rolled back if the load fails
+            self._empty_table(self._build_table_identifier(schema, table_name), truncate=True,
+                              storage=truncate_storage)
+            sql_loader_mode = 'INSERT'
+        if not self._sql_loader_options.direct:
+            self._logger.info(f"Inserting data in full mode using SQL*Loader, mode: {sql_loader_mode}")
+            self._load_data_into_table(data_path, schema, table_name, columns,
+                                       table_metadata.columns,
+                                       method='sqlldr',
+                                       mode=sql_loader_mode,
+                                       checkpoint=checkpoint,
+                                       skip_columns=skip_columns)
+            return
+
+        self._logger.info(f"Inserting data in full mode using SQL*Loader direct path, mode: {sql_loader_mode}")
+        marked_indexes = self._mark_indexes_unusable(schema, table_name)
+        try:
+            self._load_data_into_table(data_path, schema, table_name, columns,
+                                       table_metadata.columns,
+                                       method='sqlldr',
+                                       mode=sql_loader_mode,
+                                       skip_unusable_indexes=True,
+                                       skip_columns=skip_columns)
+        except Exception:
+            # never leave the table with unusable indexes behind, without hiding the error of the load
+            try:
+                self._rebuild_unusable_indexes(schema, table_name, marked_indexes)
+            except Exception as e:
+                self._logger.warning(f"Failed to rebuild the unusable indexes of the table {table_name}: {e}")
+            raise
+        self._rebuild_unusable_indexes(schema, table_name, marked_indexes)
+        self._validate_indexes(schema, table_name, marked_indexes)
+
+    def _upload_full_shadow_swap(self, data_path: str, schema: str | None, table_name: str, columns: List[str],
+                                 column_metadata: List[ColumnSchema], skip_columns: Optional[List[str]] = None):
+        """
+        Loads a shadow table with the structure of the target table using direct path and swaps it with the target,
+        so the target stays readable with the previous data during the whole load.
+        """
+        table_swap = ShadowTableSwap(self._connection, self._logger)
+        try:
+            plan = table_swap.prepare(schema, table_name)
+        except TableSwapError as e:
+            raise WriterUserException(str(e)) from e
+
+        self._logger.info(f"Inserting data in full mode into the shadow table {plan.owner}.{plan.shadow_name} "
+                          f"using SQL*Loader direct path.")
+        try:
+            self._load_data_into_table(data_path, plan.owner, plan.shadow_name, columns, column_metadata,
+                                       method='sqlldr',
+                                       mode='INSERT',
+                                       direct_path=True,
+                                       skip_columns=skip_columns)
+            table_swap.finish(plan)
+        except Exception:
+            try:
+                table_swap.abort(plan)
+            except Exception as e:
+                self._logger.warning(f"Failed to clean up after the failed shadow table swap: {e}")
+            raise
+
+        if plan.exchange:
+            # the exchange excludes the local indexes, their partition is left unusable
+            self._rebuild_unusable_indexes(plan.owner, table_name)
+            self._validate_indexes(plan.owner, table_name)
+
+    def _mark_indexes_unusable(self, schema: str | None, table_name: str) -> Set[Tuple[str, str]]:
+        """
+        Marks non-unique indexes unusable so the direct path load does not maintain them.
+        Unique indexes must stay usable to enforce the constraints during the load.
+
+        Returns:
+            (owner, name) of the indexes marked unusable, indexes that were already unusable are left out
+        """
+        escape = self._connection.escape
+        indexes = self._metadata_provider.get_table_indexes(schema, table_name)
+        # a partially unusable index is not marked, its unusable partitions might be unusable on purpose
+        unusable_names = {(idx.owner, idx.name) for idx in indexes if not idx.usable}
+        index_names = {(idx.owner, idx.name) for idx in indexes if not idx.unique} - unusable_names
+        for owner, name in sorted(index_names):
+            self._logger.info(f"Marking index {owner}.{name} unusable for the direct path load.")
+            self.execute_script(f"ALTER INDEX {escape(owner)}.{escape(name)} UNUSABLE")
+        return index_names
+
+    def _rebuild_unusable_indexes(self, schema: str | None, table_name: str,
+                                  index_names: Optional[Set[Tuple[str, str]]] = None):
+        """
+        Rebuilds the unusable indexes of the table.
+
+        Args:
+            schema:
+            table_name:
+            index_names: (owner, name) of the indexes to rebuild, all unusable indexes of the table if not set
+        """
+        escape = self._connection.escape
+        degree = self._sql_loader_options.index_rebuild_parallel_degree
+        indexes = [idx for idx in self._metadata_provider.get_table_indexes(schema, table_name)
+                   if not idx.usable and (index_names is None or (idx.owner, idx.name) in index_names)]
+        for idx in indexes:
+            identifier = f"{escape(idx.owner)}.{escape(idx.name)}"
+            partition = f" PARTITION {escape(idx.partition_name)}" if idx.partition_name else ''
+            self._logger.info(f"Rebuilding index {identifier}{partition} with parallel degree {degree}.")
+            self.execute_script(f"ALTER INDEX {identifier} REBUILD{partition} PARALLEL {degree}")
+
+        # the rebuild leaves the parallel degree set on the index, restore the previous one
+        for (owner, name), previous in sorted({(idx.owner, idx.name): idx.degree for idx in indexes}.items()):
+            self.execute_script(f"ALTER INDEX {escape(owner)}.{escape(name)} {self._parallel_clause(previous)}")
+
+    @staticmethod
+    def _parallel_clause(degree: Optional[str]) -> str:
+        if not degree or degree == '1':
+            return 'NOPARALLEL'
+        if degree == 'DEFAULT':
+            return 'PARALLEL'
+        return f'PARALLEL {degree}'
+
+    def _validate_indexes(self, schema: str | None, table_name: str,
+                          index_names: Optional[Set[Tuple[str, str]]] = None):
+        """
+        Fails if an index the load maintained or rebuilt is left unusable.
+
+        Args:
+            schema:
+            table_name:
+            index_names: (owner, name) of the rebuilt non-unique indexes, all indexes are checked if not set
+        """
+        unusable = [f"{idx.owner}.{idx.name}{' (' + idx.partition_name + ')' if idx.partition_name else ''}"
+                    for idx in self._metadata_provider.get_table_indexes(schema, table_name)
+                    if not idx.usable and (index_names is None or idx.unique or (idx.owner, idx.name) in index_names)]
+        if unusable:
+            raise WriterUserException(f"Some indexes of the table {table_name} remained unusable after "
+                                      f"the direct path load: {unusable}. This usually means that the data "
+                                      f"contains duplicate values in unique or primary key columns.")
 
     def upload_incremental(self, data_path: str, schema: str, table_name: str, columns: List[str],
                            primary_key: Optional[List[str]] = None,
-                           method: Literal['query', 'sqlldr'] = 'sqlldr'):
+                           method: LoadMethod = 'sqlldr',
+                           staging_table: StagingTableStrategy = 'temporary',
+                           skip_columns: Optional[List[str]] = None):
         """
         Perform upsert or append if no primary key is defined.
 
@@ -329,32 +659,93 @@ class OracleWriter:
             data_path:
             schema:
             table_name:
-            columns:
+            columns: Destination columns in the order of the CSV columns, including the skipped ones
             primary_key:
-            method: Literal['query', 'sqlldr']: data load method
+            method: data load method - sqlldr, query or direct_path
+            staging_table: Staging table used for the upsert:
+                temporary - created and dropped in every run
+                global_temporary - persistent global temporary table per target, rows are private to the session
+                nologging - persistent NOLOGGING table per target and configuration, truncated between runs
+            skip_columns: Columns of the CSV that are not loaded, e.g. FILLER fields of SQL*Loader
 
         Returns:
 
         """
         self._logger.debug(f"Getting metadata for table: {schema}.{table_name}")
-        table_metadata = self._metadata_provider.get_table_metadata(schema, table_name)
+        table_metadata = self._get_table_metadata(schema, table_name)
 
-        self._validate_schema(columns, table_metadata.columns)
+        self._validate_schema(self._loaded_columns(columns, skip_columns), table_metadata.columns)
+        self._validate_input(data_path, table_name, columns, table_metadata.columns, skip_columns)
         target_table_name = self._build_table_identifier(schema, table_name)
-        if primary_key and method == 'query':
+        if primary_key:
             # upsert mode
-            try:
-                self._perform_upsert(data_path, table_name, target_table_name, columns, primary_key, table_metadata,
-                                     method=method)
-            except Exception as e:
-                # always drop temp table
-                self._drop_temp_table(table_name)
-                raise e
+            if staging_table == 'global_temporary' and method != 'query':
+                raise WriterUserException("The global temporary staging table can be used only with the Query "
+                                          "load mode, SQL*Loader loads the data in a different session and the "
+                                          "direct path load API does not load temporary tables.")
+            self._perform_upsert(data_path, schema, table_name, target_table_name, columns, primary_key,
+                                 table_metadata, method=method, staging_table=staging_table,
+                                 skip_columns=skip_columns)
         else:
             # append mode
             self._load_data_into_table(data_path, schema, table_name, columns, table_metadata.columns,
                                        method=method,
-                                       mode='APPEND')
+                                       mode='APPEND',
+                                       checkpoint=self._start_checkpoint(data_path, schema, table_name, method),
+                                       skip_columns=skip_columns)
+
+    def get_table_fingerprint(self, schema: str | None, table_name: str) -> Tuple[int, str]:
+        """
+        Returns: Number of rows and LAST_DDL_TIME of the table, they change when the table is emptied or modified
+            outside of this writer
+        """
+        _, last_ddl_time = self._metadata_provider.get_last_ddl_time(schema, table_name)
+        query = f"SELECT COUNT(*) FROM {self._build_table_identifier(schema, table_name)}"
+        rows = list(self._connection.perform_query(query))[0][0]
+        return rows, last_ddl_time
+
+    def _start_checkpoint(self, data_path: str, schema: str | None, table_name: str,
+                          method: LoadMethod, restartable: bool = False) -> Optional[LoadCheckpoint]:
+        """
+        The offset is row exact for the query and direct path methods, their checkpoint is committed together with
+        the rows. SQL*Loader commits on its own, a run killed during the sqlldr load leaves the offset unverified.
+
+        Args:
+            restartable: The load replaces the data of the table, it starts over when the offset is unverified
+
+        Returns: Checkpoint of a load directly into the destination table or None when the load is not resumable
+        """
+        if not self._resumable:
+            return None
+        if method == 'sqlldr' and (self._sql_loader_options.direct or self._sql_loader_options.parallel_workers > 1):
+            self._logger.warning("Checkpoints are not supported with SQL*Loader direct path and parallel workers, "
+                                 "the load will not be resumable.")
+            return None
+        if method == 'query' and self._query_load_options.sessions > 1:
+            self._logger.warning("Checkpoints are not supported with concurrent query sessions, "
+                                 "the load will not be resumable.")
+            return None
+
+        checkpoint = CheckpointStore(self._connection).start(self._build_table_identifier(schema, table_name),
+                                                             data_path)
+        if not checkpoint.verified and restartable:
+            self._logger.warning(f"The previous load of the same file into {table_name} was interrupted during "
+                                 f"the SQL*Loader load, the committed rows are unknown. The load starts over.")
+            checkpoint.restart()
+        elif not checkpoint.verified:
+            raise WriterUserException(f"The previous load of the same file into {table_name} was interrupted during "
+                                      f"the SQL*Loader load, the rows committed after row {checkpoint.offset} are "
+                                      f"unknown and the load cannot continue without duplicating them. Remove "
+                                      f"the rows loaded by the interrupted run and delete the row of the table from "
+                                      f"{CheckpointStore.TABLE_NAME} to load the file again.")
+        if checkpoint.offset:
+            self._logger.info(f"Continuing the interrupted load of the same file into {table_name} "
+                              f"after row {checkpoint.offset}.")
+        return checkpoint
+
+    def _get_table_metadata(self, schema: str | None, table_name: str) -> TableSchema:
+        with self.metrics.phase('metadata', table_name):
+            return self._metadata_provider.get_table_metadata(schema, table_name)
 
     def _build_table_identifier(self, schema: str | None, table_name: str):
         target_table_name = self._connection.escape(table_name)
@@ -363,44 +754,327 @@ class OracleWriter:
 
         return target_table_name
 
-    def _perform_upsert(self, data_path: str, table_name: str, target_table_name: str,
+    def _perform_upsert(self, data_path: str, schema: str | None, table_name: str, target_table_name: str,
                         columns: List[str], primary_key: List[str], table_metadata: TableSchema,
-                        method: Literal['query', 'sqlldr']):
-        temp_table_name = self._create_temp_table(table_name, table_metadata.columns)
-
-        self._load_data_into_table(data_path, None, temp_table_name, columns, table_metadata.columns, method=method)
+                        method: LoadMethod, staging_table: StagingTableStrategy = 'temporary',
+                        skip_columns: Optional[List[str]] = None):
+        with self.metrics.phase('temp_table_ddl', table_name):
+            temp_table_name = self._prepare_staging_table(schema, table_name, table_metadata.columns, staging_table)
+        try:
+            self._merge_staging_table(data_path, table_name, temp_table_name, target_table_name, columns,
+                                      primary_key, table_metadata, method, staging_table, skip_columns)
+        except Exception as e:
+            # always drop temp table
+            self._cleanup_staging_table(temp_table_name, staging_table)
+            raise e
+
+    def _merge_staging_table(self, data_path: str, table_name: str, temp_table_name: str, target_table_name: str,
+                             columns: List[str], primary_key: List[str], table_metadata: TableSchema,
+                             method: LoadMethod, staging_table: StagingTableStrategy,
+                             skip_columns: Optional[List[str]]):
+        # sqlldr fills the persistent staging table in a single direct path load, the inserts of the query method
+        # are conventional, APPEND_VALUES committed after every batch would allocate new blocks above the high
+        # water mark each time. The session private rows of the global temporary table are visible only to this
+        # session.
+        self._logger.info(f"Loading staging table {temp_table_name} using method: {method}")
+        self._load_data_into_table(data_path, None, temp_table_name, columns, table_metadata.columns, method=method,
+                                   direct_path=staging_table == 'nologging' and method == 'sqlldr',
+                                   single_session=staging_table == 'global_temporary',
+                                   skip_columns=skip_columns)
+        # the skipped columns stay empty in the staging table and are not merged
+        columns = self._loaded_columns(columns, skip_columns)
 
         escape = self._connection.escape
         join_clause = ' AND '.join([f'a.{escape(col)}=b.{escape(col)}' for col in primary_key])
 
-        update_clause = ', '.join([f'a.{escape(col)}=b.{escape(col)}' for col in columns if col not in primary_key])
+        update_columns = [col for col in columns if col not in primary_key]
+        update_clause = ', '.join([f'a.{escape(col)}=b.{escape(col)}' for col in update_columns])
 
         insert_clause = ', '.join(columns)
         insert_values_clause = ', '.join([f'b.{escape(col)}' for col in columns])
 
-        merge_query = f"""MERGE INTO {target_table_name} a
-                                    USING (SELECT * FROM {temp_table_name}) b
+        merge_options = self._merge_options
+        bucketed = merge_options.buckets > 1
+        if bucketed and staging_table == 'global_temporary':
+            self._logger.warning("The rows of the global temporary staging table are visible only to this session, "
+                                 "the staging table is merged at once instead of in buckets.")
+            bucketed = False
+
+        hint = f"/*+ PARALLEL({merge_options.parallel_degree}) */ " if merge_options.parallel_degree else ''
+        source_query = f"SELECT * FROM {temp_table_name}"
+        if bucketed:
+            bucket = BucketedMerge.bucket_expression([escape(col) for col in primary_key], merge_options.buckets)
+            source_query += f" WHERE {bucket} = :bucket"
+
+        matched_clause = ''
+        if update_columns:
+            matched_clause = f"WHEN MATCHED THEN UPDATE SET {update_clause}"
+        detect_changes = merge_options.change_detection != 'none'
+        if update_columns and detect_changes:
+            # rows equal to the target are not updated, they produce no redo, trigger calls or index maintenance
+            indexed_schema = {col.name: col for col in table_metadata.columns}
+            change_predicate = self._build_change_predicate([indexed_schema[col] for col in update_columns],
+                                                            merge_options.change_detection)
+            matched_clause += f" WHERE {change_predicate}"
+
+        merge_query = f"""MERGE {hint}INTO {target_table_name} a
+                                    USING ({source_query}) b
                                     ON ({join_clause})
-                                    WHEN MATCHED THEN UPDATE SET {update_clause}
+                                    {matched_clause}
                                     WHEN NOT MATCHED THEN INSERT ({insert_clause}) VALUES ({insert_values_clause})
                                     """
 
-        res = self._connection.perform_query(merge_query)
-        list(res)
-        # TODO: Is it necessary to commit, if so when?
-        self._logger.debug("Executing Commit")
-        self._connection.connection.commit()
+        staged_rows, new_rows = 0, 0
+        if detect_changes:
+            with self.metrics.phase('change_detection', table_name):
+                staged_rows, new_rows = self._count_new_rows(temp_table_name, target_table_name, join_clause)
 
-        drop_query = f"DROP TABLE {temp_table_name}"
-        self._logger.info("Removing temporary table")
-        res = self._connection.perform_query(drop_query)
-        list(res)
+        if bucketed:
+            # each bucket is committed in its own session
+            with self.metrics.phase('merge', table_name) as metric:
+                metric.rows = merged_rows = self._merge_buckets(merge_query)
+        else:
+            with self.metrics.phase('merge', table_name) as metric:
+                metric.rows = merged_rows = self._connection.execute_dml(merge_query)
+            # TODO: Is it necessary to commit, if so when?
+            self._logger.debug("Executing Commit")
+            with self.metrics.phase('commit', table_name):
+                self._connection.connection.commit()
+
+        if detect_changes:
+            self._logger.info(f"Upsert into {target_table_name}: {new_rows} rows inserted, "
+                              f"{merged_rows - new_rows} updated, {staged_rows - merged_rows} unchanged.")
+
+        with self.metrics.phase('drop', table_name):
+            if staging_table == 'temporary':
+                drop_query = f"DROP TABLE {temp_table_name}"
+                self._logger.info("Removing temporary table")
+                res = self._connection.perform_query(drop_query)
+                list(res)
+            else:
+                self._truncate_staging_table(temp_table_name)
+
+    def _count_new_rows(self, staging_table_name: str, target_table_name: str, join_clause: str) -> Tuple[int, int]:
+        """
+        Counts the staged rows and the rows with a primary key missing in the target, the join is answered from
+        the primary key index.
+
+        Returns: Number of staged rows, number of new rows
+        """
+        query = f"""SELECT COUNT(*), COUNT(*) - COUNT(a.ROWID)
+                    FROM {staging_table_name} b LEFT JOIN {target_table_name} a ON ({join_clause})"""
+        staged_rows, new_rows = list(self._connection.perform_query(query))[0]
+        return staged_rows, new_rows
+
+    def _build_change_predicate(self, columns: List[ColumnSchema], change_detection: str) -> str:
+        """
+        Condition of a matched row that differs from the target, NULLs are equal to each other.
 
-    def _create_temp_table(self, table_name: str, columns: List[ColumnSchema]) -> str:
+        Args:
+            columns: Updated columns
+            change_detection: columns - null-safe comparison of each column,
+                hash - comparison of STANDARD_HASH of the concatenated columns, in groups that fit the VARCHAR2
+                limit, LOB columns and columns wider than the limit are compared separately
+
+        """
+        escape = self._connection.escape
+        lob_columns = [c for c in columns if c.source_type.upper() in LOB_TYPES]
+        other_columns = [c for c in columns if c.source_type.upper() not in LOB_TYPES]
+
+        conditions = []
+        compared_columns = other_columns
+        if change_detection == 'hash':
+            groups, compared_columns = self._group_hashed_columns(other_columns)
+
+            def group_hash(alias: str, group: List[ColumnSchema]) -> str:
+                values = ' || CHR(1) || '.join(self._hash_operand(f'{alias}.{escape(c.name)}', c) for c in group)
+                # the leading separator keeps the input non-NULL even when all columns are NULL
+                return f"STANDARD_HASH(CHR(1) || {values})"
+
+            conditions.extend(f"{group_hash('a', group)} <> {group_hash('b', group)}" for group in groups)
+        # DECODE treats two NULLs as equal
+        conditions.extend(f"DECODE(a.{escape(c.name)}, b.{escape(c.name)}, 0, 1) = 1" for c in compared_columns)
+        # DBMS_LOB.COMPARE returns NULL when any side is NULL, those rows are always updated
+        conditions.extend(f"NVL(DBMS_LOB.COMPARE(a.{escape(c.name)}, b.{escape(c.name)}), 1) <> 0"
+                          for c in lob_columns)
+        return '(' + ' OR '.join(conditions) + ')'
+
+    @classmethod
+    def _group_hashed_columns(cls, columns: List[ColumnSchema]) -> Tuple[List[List[ColumnSchema]], List[ColumnSchema]]:
+        """
+        Splits the columns into groups whose concatenated text fits HASH_INPUT_MAX_BYTES, each group is hashed
+        on its own.
+
+        Returns: Groups of the hashed columns, columns too wide to be hashed that are compared directly
+        """
+        groups, too_wide = [], []
+        group, group_width = [], 0
+        for column in columns:
+            # each value is preceded by a separator
+            width = cls._hash_operand_width(column) + 1
+            if width > HASH_INPUT_MAX_BYTES:
+                too_wide.append(column)
+                continue
+            if group_width + width > HASH_INPUT_MAX_BYTES:
+                groups.append(group)
+                group, group_width = [], 0
+            group.append(column)
+            group_width += width
+        if group:
+            groups.append(group)
+        return groups, too_wide
+
+    @staticmethod
+    def _hash_operand_width(column: ColumnSchema) -> int:
+        """
+        Returns: Maximum length in bytes of the text produced by _hash_operand
+        """
+        column_type = column.source_type.upper()
+        if 'CHAR' in column_type or column_type == 'RAW':
+            if not column.length:
+                return HASH_INPUT_MAX_BYTES
+            # RAW is converted to hexadecimal digits
+            return int(column.length) * (2 if column_type == 'RAW' else 1)
+        return HASH_OPERAND_DEFAULT_WIDTH
+
+    @staticmethod
+    def _hash_operand(column_reference: str, column: ColumnSchema) -> str:
+        """
+        Explicit conversion to text, the session NLS date format may drop the time part.
+        """
+        column_type = column.source_type.upper()
+        if column_type == 'DATE':
+            return f"TO_CHAR({column_reference}, 'YYYY-MM-DD HH24:MI:SS')"
+        if column_type.startswith('TIMESTAMP') and 'TIME ZONE' in column_type and 'LOCAL' not in column_type:
+            # a change of the offset or the region is a change of the value
+            return f"TO_CHAR({column_reference}, 'YYYY-MM-DD HH24:MI:SS.FF9 TZR')"
+        if column_type.startswith('TIMESTAMP'):
+            return f"TO_CHAR({column_reference}, 'YYYY-MM-DD HH24:MI:SS.FF9')"
+        if 'CHAR' in column_type:
+            return column_reference
+        return f"TO_CHAR({column_reference})"
+
+    def _merge_buckets(self, merge_query: str) -> int:
+        """
+        Merges the staging table bucket by bucket in concurrent sessions.
+
+        Returns: Number of merged rows
+        """
+        options = self._merge_options
+        sessions = min(options.sessions, options.buckets)
+        if options.parallel_dml and sessions > 1:
+            # parallel DML locks the whole target table, concurrent sessions would only wait for each other
+            self._logger.warning("Parallel DML locks the target table, the buckets are merged one after another.")
+            sessions = 1
+        self._logger.info(f"Merging the staging table in {options.buckets} buckets using {sessions} sessions, "
+                          f"failure policy: {options.failure_policy}")
+        pool = self._connection.create_pool(sessions, session_callback=self._init_pooled_session)
+        try:
+            bucketed_merge = BucketedMerge(pool, merge_query, options.buckets, sessions,
+                                           parallel_dml=options.parallel_dml,
+                                           failure_policy=options.failure_policy,
+                                           logger=self._logger)
+            return bucketed_merge.merge()
+        except BucketedMergeException as e:
+            # the staging table is cleared afterwards, a rerun stages the data again
+            raise WriterUserException(f"The upsert did not finish, the committed buckets remain merged and the "
+                                      f"staging table is cleared. Running the load again with the same data stages "
+                                      f"it again and completes the upsert. {e}") from e
+        finally:
+            pool.close(force=True)
+
+    def _prepare_staging_table(self, schema: str | None, table_name: str, columns: List[ColumnSchema],
+                               staging_table: StagingTableStrategy) -> str:
+        if staging_table == 'temporary':
+            return self._create_temp_table(schema, table_name, columns)
+
+        staging_table_name = self._get_staging_table_name(schema, table_name, staging_table)
+        table_options = STAGING_TABLE_OPTIONS[staging_table]
+        created = self._create_staging_table(staging_table_name, columns, *table_options)
+        if not created and not self._staging_table_matches(staging_table_name, columns):
+            self._logger.info(f"Staging table {staging_table_name} does not match the destination table, "
+                              f"recreating it.")
+            self.execute_script(f"DROP TABLE {staging_table_name}")
+            self._create_staging_table(staging_table_name, columns, *table_options)
+        elif not created:
+            # leftovers of a failed run
+            self._truncate_staging_table(staging_table_name)
+        return staging_table_name
+
+    def _create_staging_table(self, staging_table_name: str, columns: List[ColumnSchema],
+                              table_type: str, table_properties: str) -> bool:
+        """
+        Creates the persistent staging table.
 
-        column_signatures = [f'{self._connection.escape(col.name)} {col.source_type_signature}' for col in columns]
+        Returns: False if the table already exists
 
-        temp_table_name = self._get_temp_table_name(table_name)
+        """
+        column_signatures = [f'{self._connection.escape(col.name)} {self._staging_column_signature(col)}'
+                             for col in columns]
+        query = f"""CREATE {table_type} {staging_table_name}
+                    ({', '.join(column_signatures)}) {table_properties}
+        """
+        self._logger.debug(f"Creating staging table {staging_table_name}.")
+        try:
+            self.execute_script(query)
+        except WriterUserException as e:
+            if e.db_error and e.db_error.full_code == 'ORA-00955':
+                self._logger.debug(f"Staging table {staging_table_name} already exists.")
+                return False
+            raise e
+        return True
+
+    def _staging_table_matches(self, staging_table_name: str, columns: List[ColumnSchema]) -> bool:
+        staging_metadata = self._metadata_provider.get_table_metadata(None, staging_table_name)
+        expected = sorted((col.name, self._staging_column_signature(col)) for col in columns)
+        actual = sorted((col.name, col.source_type_signature) for col in staging_metadata.columns)
+        return expected == actual
+
+    @staticmethod
+    def _staging_column_signature(column: ColumnSchema) -> str:
+        """
+        The staging columns are always nullable. Columns missing in the input, e.g. with a DEFAULT, identity or
+        skipped columns, stay NULL in the staging table, the MERGE enforces the constraints of the target.
+        """
+        signature = column.source_type_signature or column.source_type
+        if signature.endswith(' NOT NULL'):
+            signature = signature[:-len(' NOT NULL')] + ' NULL'
+        return signature
+
+    def _truncate_staging_table(self, staging_table_name: str):
+        self._logger.info(f"Truncating staging table {staging_table_name}")
+        self.execute_script(f"TRUNCATE TABLE {staging_table_name} REUSE STORAGE")
+
+    def _cleanup_staging_table(self, staging_table_name: str, staging_table: StagingTableStrategy):
+        if staging_table == 'temporary':
+            self._drop_temp_table(staging_table_name)
+            return
+        try:
+            self._connection.connection.rollback()
+            self._truncate_staging_table(staging_table_name)
+        except (WriterUserException, oracledb.Error) as e:
+            self._logger.warning(f"Failed to clean up the staging table: {e}")
+
+    def _get_staging_table_name(self, schema: str | None, table_name: str,
+                                staging_table: StagingTableStrategy) -> str:
+        if staging_table == 'global_temporary':
+            # the definition is shared, the rows are private to the session
+            return f'KBC_GTT_{self._get_staging_target_name(schema, table_name)}'
+        # shared by all runs of the configuration, configurations must not overwrite each other's data
+        return (f'KBC_STG_{self._staging_id + "_" if self._staging_id else ""}'
+                f'{self._get_staging_target_name(schema, table_name)}')
+
+    @staticmethod
+    def _get_staging_target_name(schema: str | None, table_name: str) -> str:
+        # tables of the same name in different schemas must not share a staging table
+        return f'{schema.upper()}_{table_name.upper()}' if schema else table_name.upper()
+
+    def _create_temp_table(self, schema: str | None, table_name: str, columns: List[ColumnSchema]) -> str:
+
+        column_signatures = [f'{self._connection.escape(col.name)} {self._staging_column_signature(col)}'
+                             for col in columns]
+
+        temp_table_name = self._get_temp_table_name(schema, table_name)
         query = f"""CREATE TABLE {temp_table_name}
                     ({', '.join(column_signatures)})
         """
@@ -410,17 +1084,17 @@ class OracleWriter:
             # just trigger the results
             list(res)
         except WriterUserException as e:
-            if e.db_error.full_code == 'ORA-00955':
-                # table already exists error skipped
-                self._logger.debug(f"Temporary table {temp_table_name} already exists!")
-            else:
-                raise e
+            if e.db_error and e.db_error.full_code == 'ORA-00955':
+                # the table belongs to another load of the same run, it must not be reused or dropped
+                raise WriterUserException(f"The temporary table {temp_table_name} already exists, the table "
+                                          f"{table_name} is loaded more than once in the same run.",
+                                          db_error=e.db_error) from e
+            raise e
 
         return temp_table_name
 
-    def _drop_temp_table(self, table_name: str) -> str:
+    def _drop_temp_table(self, temp_table_name: str) -> str:
 
-        temp_table_name = self._get_temp_table_name(table_name)
         query = f"DROP TABLE {temp_table_name}"
         self._logger.debug("Dropping temporary table.")
         try:
@@ -428,10 +1102,7 @@ class OracleWriter:
             # just trigger the results
             list(res)
         except WriterUserException as e:
-            if e.db_error.full_code == 'ORA-00955':
-                # table already exists error skipped
-                self._logger.debug(f"Temporary table {temp_table_name} already exists!")
-            elif e.db_error.full_code == 'ORA-00942':
+            if e.db_error.full_code == 'ORA-00942':
                 # table does not exist error skipped
                 self._logger.debug(f"Temporary table {temp_table_name} does not exist!")
             else:
@@ -439,28 +1110,113 @@ class OracleWriter:
 
         return temp_table_name
 
-    def _get_temp_table_name(self, table_name):
-        temp_table_name = f'KBC_TMP_{self._ext_session_id}_{table_name.upper()}'
+    def _get_temp_table_name(self, schema: str | None, table_name: str):
+        temp_table_name = f'KBC_TMP_{self._ext_session_id}_{self._get_staging_target_name(schema, table_name)}'
         return temp_table_name
 
     def _load_data_into_table(self, data_path: str, schema: str | None, table_name: str, columns: List[str],
                               destination_schema: List[ColumnSchema],
-                              method: Literal['sqlldr', 'query'] = 'sqlldr', mode='INSERT'):
+                              method: LoadMethod = 'sqlldr', mode='INSERT',
+                              direct_path: bool = False, single_session: bool = False,
+                              checkpoint: Optional[LoadCheckpoint] = None,
+                              skip_unusable_indexes: bool = False,
+                              skip_columns: Optional[List[str]] = None):
+        with self.metrics.phase('load', table_name, bytes=CSVInput(data_path).size) as metric:
+            metric.rows = self._load_data(data_path, schema, table_name, columns, destination_schema, method, mode,
+                                          direct_path, single_session, checkpoint, skip_unusable_indexes,
+                                          skip_columns)
+
+    def _load_data(self, data_path: str, schema: str | None, table_name: str, columns: List[str],
+                   destination_schema: List[ColumnSchema], method: LoadMethod, mode: str,
+                   direct_path: bool, single_session: bool, checkpoint: Optional[LoadCheckpoint],
+                   skip_unusable_indexes: bool = False, skip_columns: Optional[List[str]] = None) -> int:
+        """
+        Args:
+            skip_unusable_indexes: The indexes were marked unusable for the sqlldr direct path load
+
+        Returns: Number of loaded rows
+        """
+        # the CSV columns are read as they are, the skipped ones are FILLER fields of sqlldr and are projected out
+        # of the rows read by the other methods
+        source_columns = columns
+        projection = self._get_projection(source_columns, skip_columns)
+        columns = self._loaded_columns(source_columns, skip_columns)
         # important to order by CSV column order
         indexed_schema = {col.name: col for col in destination_schema}
         columns_involved = [indexed_schema[col] for col in columns]
 
+        if method == 'sqlldr' and ArrowInput.is_columnar(data_path):
+            self._logger.warning(f"SQL*Loader reads only CSV, the columnar input {data_path} is loaded using "
+                                 f"the query method.")
+            method = 'query'
+
         if method == 'sqlldr':
             self._logger.info(f"Running load mode: {method}")
             table_identifier = self._build_table_identifier(schema, table_name)
             columns_types = self._get_sqlldr_types(columns_involved)
-            self._sql_loader.load_data(data_path, table_identifier, columns_types,
-                                       mode=mode, errors=0,
-                                       **asdict(self._sql_loader_options))
+            if projection is not None:
+                columns_types = self._add_filler_fields(source_columns, columns_types, projection)
+            data_input = CSVInput(data_path)
+            sqlldr_parameters = self._get_sqlldr_parameters(direct_path, columns_involved,
+                                                            data_input.size if data_input.is_plain_file else None,
+                                                            skip_unusable_indexes)
+            if sqlldr_parameters['parallel_workers'] > 1 and not data_input.is_plain_file:
+                self._logger.warning("Parallel sqlldr workers need an uncompressed single file input, "
+                                     f"{data_path} is streamed to a single sqlldr process.")
+                sqlldr_parameters['parallel_workers'] = 1
+            if sqlldr_parameters['parallel_workers'] > 1 and mode in ('REPLACE', 'TRUNCATE'):
+                # concurrent sqlldr processes cannot each replace the table, empty it once up front. The emptying
+                # is committed on its own, a failed load leaves the table empty.
+                self._logger.warning(f"The table {table_identifier} is emptied before the parallel sqlldr load, "
+                                     f"it stays empty if the load fails.")
+                self._empty_table(table_identifier, truncate=mode == 'TRUNCATE')
+                mode = 'APPEND'
+            checkpoint_parameters = {}
+            if checkpoint:
+                # rows loaded before a failure stay committed, the next run continues after them. Until sqlldr
+                # reports them, the offset is unverified and a run killed in between does not continue.
+                checkpoint_parameters = {"skip_records": checkpoint.offset, "commit_discontinued": True}
+                checkpoint.start_external()
+                self._connection.connection.commit()
+            try:
+                # compressed and sliced inputs reach sqlldr through a named pipe, never unpacked to disk
+                with data_input.file_path() as sqlldr_data_path:
+                    result = self._sql_loader.load_data(sqlldr_data_path, table_identifier, columns_types,
+                                                        skip_first_line=data_input.has_header,
+                                                        mode=mode, errors=self._rejected_rows.max_rejected_rows,
+                                                        **checkpoint_parameters, **sqlldr_parameters)
+            except SQLLoaderException as e:
+                if checkpoint and e.result:
+                    # without the log statistics, e.g. after a crash, the last commit point is the known progress
+                    committed = e.result.rows_read if e.result.rows_committed is None else e.result.rows_committed
+                    checkpoint.save(committed)
+                    self._connection.connection.commit()
+                raise
+            if checkpoint:
+                checkpoint.complete()
+                self._connection.connection.commit()
+            self._logger.info(f"SQL*Loader finished: {result.summary()}.")
+            if result.rows_discarded:
+                self._logger.warning(f"{result.rows_discarded} rows were discarded by SQL*Loader and not loaded, "
+                                     f"e.g. rows with all fields empty.")
+            try:
+                self._rejected_rows.add(result.rejected_rows)
+            except RejectedRowsLimitExceeded as e:
+                raise WriterUserException(str(e)) from e
+            return result.rows_loaded
         elif method == 'query':
             self._logger.info(f"Running load mode: '{method}'")
             try:
-                self._insert_records_query(data_path, schema, table_name, columns)
+                return self._insert_records_query(data_path, schema, table_name, columns, columns_involved,
+                                                  direct_path=direct_path, single_session=single_session,
+                                                  checkpoint=checkpoint, projection=projection)
+            except ValueConversionError as e:
+                raise WriterUserException(f"The input data does not match the destination table types. {e}") from e
+            except ArrowInputError as e:
+                raise WriterUserException(str(e)) from e
+            except RejectedRowsLimitExceeded as e:
+                self._connection.connection.rollback()
+                raise WriterUserException(str(e)) from e
             except oracledb.IntegrityError as e:
                 # The destination table refused the data (ORA-00001 duplicate key, ORA-01400 NULL,
                 # ORA-01438 value too large, ORA-0229x constraint violations) - a data/config problem
@@ -475,38 +1231,395 @@ class OracleWriter:
                     "duplicate values in unique or primary key columns and no NULL or oversized values "
                     f"in columns that do not allow them. Oracle error: {detail}",
                     db_error=error) from e
+        elif method == 'direct_path':
+            self._logger.info(f"Running load mode: '{method}'")
+            try:
+                return self._insert_records_direct_path(data_path, schema, table_name, columns, columns_involved,
+                                                        checkpoint=checkpoint, projection=projection)
+            except ValueConversionError as e:
+                raise WriterUserException(f"The input data does not match the destination table types. {e}") from e
+            except ArrowInputError as e:
+                raise WriterUserException(str(e)) from e
+            except RejectedRowsLimitExceeded as e:
+                raise WriterUserException(str(e)) from e
+        else:
+            raise WriterUserException(f"Unsupported load method: {method}")
+
+    def _get_sqlldr_parameters(self, direct_path: bool = False,
+                               columns_involved: Optional[List[ColumnSchema]] = None,
+                               data_size: Optional[int] = None, skip_unusable_indexes: bool = False) -> dict:
+        """
+        Args:
+            direct_path: Force the direct path load
+            columns_involved: Loaded columns, the buffer sizes are derived from them when auto-tuning
+            data_size: Size of the data file, None when unknown (streamed inputs)
+            skip_unusable_indexes: Do not maintain the indexes marked unusable before the load
+
+        """
+        parameters = asdict(self._sql_loader_options)
+        # handled by the writer, not sqlldr parameters
+        parameters.pop('index_rebuild_parallel_degree')
+        auto_tune = parameters.pop('auto_tune')
+        parameters['direct'] = parameters['direct'] or direct_path
+        if parameters['direct'] and skip_unusable_indexes:
+            # non-unique indexes are marked unusable before direct path full loads
+            parameters['skip_unusable_indexes'] = True
+        if auto_tune and columns_involved:
+            tuned = tune_buffer_sizes(self._get_sqlldr_field_widths(columns_involved), data_size,
+                                      parameters['direct'], parameters['parallel_workers'])
+            for key in ('columnarrayrows', 'streamsize'):
+                # explicitly configured direct path sizes are kept
+                if parameters[key] is not None:
+                    tuned.pop(key, None)
+            self._logger.info("SQL*Loader buffers auto-tuned: "
+                              + ', '.join(f'{key}={value}' for key, value in tuned.items()))
+            parameters.update(tuned)
+        return parameters
+
+    def _empty_table(self, table_identifier: str, truncate: bool = False, storage: Optional[TruncateStorage] = None):
+        if truncate:
+            storage_clause = f" {storage.upper()} STORAGE" if storage else ''
+            self._logger.info(f"Truncating table {table_identifier}{storage_clause}")
+            query = f"TRUNCATE TABLE {table_identifier}{storage_clause}"
+        else:
+            self._logger.info(f"Deleting all rows from table {table_identifier}")
+            query = f"DELETE FROM {table_identifier}"
+        res = self._connection.perform_query(query)
+        list(res)
+        self._connection.connection.commit()
 
     def _insert_records_query(self, data_path: str, schema: str, table_name: str, columns: List[str],
-                              skip_first_line: bool = True):
+                              columns_schema: List[ColumnSchema], skip_first_line: bool = True,
+                              direct_path: bool = False, single_session: bool = False,
+                              checkpoint: Optional[LoadCheckpoint] = None,
+                              projection: Optional[RowProjection] = None) -> int:
+        """
+        Inserts the CSV rows using executemany.
+
+        Args:
+            direct_path: Insert with the APPEND_VALUES hint. Each batch is committed, because the table cannot be
+                modified again in the same transaction. Not used with concurrent sessions (they would block each
+                other) and with the rejected rows collection.
+            single_session: Do not use concurrent sessions, e.g. for session private global temporary tables
+            checkpoint: Continue after the rows committed by a previous run and commit every checkpoint_batches
+                batches, saving the number of committed rows. Not used with concurrent sessions.
+            projection: Loaded values of the CSV rows, None to load all
+
+        Returns: Number of inserted rows
+
+        """
+        if ArrowInput.is_columnar(data_path):
+            return self._insert_records_arrow(data_path, schema, table_name, columns, direct_path=direct_path,
+                                              checkpoint=checkpoint, projection=projection)
+
+        concurrent = self._query_load_options.sessions > 1 and not single_session
+        direct_path = direct_path and not concurrent and not self._rejected_rows.max_rejected_rows
         cursor = self._connection.connection.cursor()
         # Predefine the memory areas to match the table definition
-        # cursor.setinputsizes(None, 25)
+        row_converter = RowConverter(columns_schema, self._default_format, projection)
+        cursor.setinputsizes(*row_converter.input_sizes)
 
         table_identifier = self._build_table_identifier(schema, table_name)
         values_clause = ', '.join([f':{i}' for i, col in enumerate(columns)])
         columns_clause = ', '.join([col for col in columns])
-        insert_query = f"INSERT INTO {table_identifier} ({columns_clause}) VALUES ({values_clause})"
+        hint = '/*+ APPEND_VALUES */ ' if direct_path else ''
+        insert_query = f"INSERT {hint}INTO {table_identifier} ({columns_clause}) VALUES ({values_clause})"
 
         self._logger.debug(f"Executing insert queries with parameters: batch_size={self._batch_size}")
         self._logger.debug(f"Insert query template: {insert_query}")
 
-        with open(data_path, 'r') as csv_file:
+        def insert_batch(batch_cursor: oracledb.Cursor, batch: List[list], first_row_number: int) -> int:
+            inserted = self._insert_batch(batch_cursor, insert_query, row_converter, batch, first_row_number)
+            if direct_path:
+                batch_cursor.connection.commit()
+            return inserted
+
+        if concurrent:
+            cursor.close()
+            return self._insert_records_concurrent(data_path, insert_batch, row_converter.input_sizes,
+                                                   skip_first_line)
+
+        skip_rows = checkpoint.offset if checkpoint else 0
+        checkpoint_batches = self._query_load_options.checkpoint_batches
+        # the checkpoint counts the processed rows, the rejected ones too, the result only the inserted ones
+        rows_read, rows_inserted = 0, 0
+        batches = self._read_batches(data_path, skip_first_line, skip_rows)
+        for batch_number, (first_row_number, buffer) in enumerate(batches, start=1):
+            rows_inserted += insert_batch(cursor, buffer, first_row_number)
+            rows_read += len(buffer)
+            if checkpoint and batch_number % checkpoint_batches == 0:
+                # committed together with the rows
+                checkpoint.save(rows_read)
+                self._connection.connection.commit()
+
+        cursor.close()
+        if checkpoint:
+            checkpoint.complete()
+        # TODO: Is it necessary to commit, if so when?
+        self._logger.debug("Executing Commit")
+        with self.metrics.phase('commit', table_name):
+            self._connection.connection.commit()
+        return rows_inserted
+
+    def _insert_records_direct_path(self, data_path: str, schema: str | None, table_name: str, columns: List[str],
+                                    columns_schema: List[ColumnSchema], skip_first_line: bool = True,
+                                    checkpoint: Optional[LoadCheckpoint] = None,
+                                    projection: Optional[RowProjection] = None) -> int:
+        """
+        Loads the CSV rows using the direct path load API of python-oracledb, in process without sqlldr.
+
+        Each API call is a direct path load of its own, committed at its end. A call loads checkpoint_batches
+        batches, the rows are sent in batches of batch_size. Rows that cannot be converted to the column types
+        are collected as rejected rows, an error of the database fails the load. The record batches of columnar
+        inputs are not converted, they have no rejected rows. The checkpoint is committed right after each call,
+        a crash in between loads the rows of the call again on resume.
+
+        Returns: Number of loaded rows
+
+        """
+        if not oracledb.is_thin_mode():
+            raise WriterUserException("The direct path load method requires the python-oracledb Thin mode, "
+                                      "the connection uses the Thick mode. Set the connection mode to Thin or "
+                                      "Automatic.")
+        connection = self._connection.connection
+        schema_name = schema.strip().upper() if schema else self._get_current_schema()
+        column_names = [col.upper() for col in columns]
+        row_converter = RowConverter(columns_schema, self._default_format, projection)
+        load_batches = self._query_load_options.checkpoint_batches
+
+        def load(rows: List[list]):
+            if rows:
+                connection.direct_path_load(schema_name, table_name.strip().upper(), column_names, rows,
+                                            batch_size=self._batch_size)
+
+        skip_rows = checkpoint.offset if checkpoint else 0
+        if ArrowInput.is_columnar(data_path):
+            # the record batches are loaded as they are, no conversion of the values
+            arrow_input = self._open_arrow_input(data_path, columns, projection)
+            if self._rejected_rows.max_rejected_rows:
+                self._logger.warning("The direct path load of a columnar input collects no rejected rows, "
+                                     "any row refused by the database fails the load.")
+            rows_loaded = 0
+            for table in arrow_input.iter_tables(self._batch_size * load_batches, skip_rows):
+                if projection is not None:
+                    table = table.select(projection.positions)
+                connection.direct_path_load(schema_name, table_name.strip().upper(), column_names, table,
+                                            batch_size=self._batch_size)
+                rows_loaded += table.num_rows
+                if checkpoint:
+                    checkpoint.save(rows_loaded)
+                    connection.commit()
+            if checkpoint:
+                checkpoint.complete()
+                connection.commit()
+            self._logger.info(f"Direct path load finished, {rows_loaded} rows loaded.")
+            return rows_loaded
+
+        rows_read, rows_loaded = 0, 0
+        pending: List[list] = []
+        batches = self._read_batches(data_path, skip_first_line, skip_rows)
+        for batch_number, (first_row_number, batch) in enumerate(batches, start=1):
+            pending.extend(self._convert_direct_path_batch(row_converter, batch, first_row_number))
+            rows_read += len(batch)
+            if batch_number % load_batches == 0:
+                load(pending)
+                rows_loaded += len(pending)
+                pending = []
+                if checkpoint:
+                    checkpoint.save(rows_read)
+                    connection.commit()
+        load(pending)
+        rows_loaded += len(pending)
+        if checkpoint:
+            checkpoint.complete()
+            connection.commit()
+        self._logger.info(f"Direct path load finished, {rows_loaded} rows loaded.")
+        return rows_loaded
+
+    def _convert_direct_path_batch(self, row_converter: RowConverter, batch: List[list],
+                                   first_row_number: int) -> List[list]:
+        if not self._rejected_rows.max_rejected_rows:
+            return row_converter.convert_rows(batch)
+        converted, _, failures = row_converter.convert_rows_lenient(batch)
+        if failures:
+            self._rejected_rows.add([RejectedRow(first_row_number + position, batch[position], error)
+                                     for position, error in failures])
+        return converted
+
+    def _get_current_schema(self) -> str:
+        rows = list(self._connection.perform_query("SELECT SYS_CONTEXT('USERENV', 'CURRENT_SCHEMA') FROM DUAL"))
+        return rows[0][0]
+
+    def _open_arrow_input(self, data_path: str, columns: List[str],
+                          projection: Optional[RowProjection] = None) -> ArrowInput:
+        arrow_input = ArrowInput(data_path)
+        source_columns = arrow_input.column_names()
+        if projection is not None:
+            if len(source_columns) != projection.width:
+                raise WriterUserException(f"The input {data_path} has {len(source_columns)} columns "
+                                          f"{source_columns}, {projection.width} columns are expected.")
+            # the loaded columns are matched by their position among the input columns
+            source_columns = [source_columns[position] for position in projection.positions]
+        if len(source_columns) != len(columns):
+            raise WriterUserException(f"The input {data_path} has {len(source_columns)} columns {source_columns}, "
+                                      f"{len(columns)} columns are expected: {columns}.")
+        self._logger.info(f"Loading the {arrow_input.format} input in record batches.")
+        return arrow_input
+
+    def _insert_records_arrow(self, data_path: str, schema: str | None, table_name: str, columns: List[str],
+                              direct_path: bool = False, checkpoint: Optional[LoadCheckpoint] = None,
+                              projection: Optional[RowProjection] = None) -> int:
+        """
+        Inserts the record batches of a Parquet or Arrow input using executemany in a single session. The columnar
+        buffers are bound with their native types, there is no conversion to and from text. The columns are
+        matched to the destination columns by their position.
+
+        Returns: Number of inserted rows
+
+        """
+        arrow_input = self._open_arrow_input(data_path, columns, projection)
+        direct_path = direct_path and not self._rejected_rows.max_rejected_rows
+        table_identifier = self._build_table_identifier(schema, table_name)
+        values_clause = ', '.join([f':{i}' for i, col in enumerate(columns)])
+        hint = '/*+ APPEND_VALUES */ ' if direct_path else ''
+        insert_query = f"INSERT {hint}INTO {table_identifier} ({', '.join(columns)}) VALUES ({values_clause})"
+
+        skip_rows = checkpoint.offset if checkpoint else 0
+        checkpoint_batches = self._query_load_options.checkpoint_batches
+        rows_read, rows_inserted = 0, 0
+        cursor = self._connection.connection.cursor()
+        for batch_number, table in enumerate(arrow_input.iter_tables(self._batch_size, skip_rows), start=1):
+            if projection is not None:
+                table = table.select(projection.positions)
+            rows_inserted += self._insert_arrow_batch(cursor, insert_query, table, skip_rows + rows_read + 1)
+            rows_read += table.num_rows
+            if direct_path:
+                cursor.connection.commit()
+            if checkpoint and batch_number % checkpoint_batches == 0:
+                # committed together with the rows
+                checkpoint.save(rows_read)
+                self._connection.connection.commit()
+        cursor.close()
+
+        if checkpoint:
+            checkpoint.complete()
+        with self.metrics.phase('commit', table_name):
+            self._connection.connection.commit()
+        return rows_inserted
+
+    def _insert_arrow_batch(self, cursor: oracledb.Cursor, insert_query: str, table, first_row_number: int) -> int:
+        """
+        Returns: Number of inserted rows
+        """
+        if not self._rejected_rows.max_rejected_rows:
+            cursor.executemany(insert_query, table)
+            return table.num_rows
+
+        cursor.executemany(insert_query, table, batcherrors=True)
+        rejected = []
+        for error in cursor.getbatcherrors():
+            values = table.slice(error.offset, 1).to_pylist()[0].values()
+            rejected.append(RejectedRow(first_row_number + error.offset,
+                                        [None if value is None else str(value) for value in values], error.message))
+        if rejected:
+            self._rejected_rows.add(rejected)
+        return table.num_rows - len(rejected)
+
+    def _insert_batch(self, cursor: oracledb.Cursor, insert_query: str, row_converter: RowConverter,
+                      batch: List[list], first_row_number: int) -> int:
+        """
+        Returns: Number of inserted rows
+        """
+        if not self._rejected_rows.max_rejected_rows:
+            cursor.executemany(insert_query, row_converter.convert_rows(batch))
+            return len(batch)
+
+        # collect the refused rows instead of failing, batch keeps the source values for the output
+        converted, positions, failures = row_converter.convert_rows_lenient(batch)
+        rejected = [RejectedRow(first_row_number + position, batch[position], error) for position, error in failures]
+        if converted:
+            cursor.executemany(insert_query, converted, batcherrors=True)
+            for error in cursor.getbatcherrors():
+                position = positions[error.offset]
+                rejected.append(RejectedRow(first_row_number + position, batch[position], error.message))
+        if rejected:
+            self._rejected_rows.add(sorted(rejected, key=lambda r: r.row_number))
+        return len(batch) - len(rejected)
+
+    def _insert_records_concurrent(self, data_path: str, insert_batch: BatchInserter, input_sizes: list,
+                                   skip_first_line: bool = True) -> int:
+        options = self._query_load_options
+        self._logger.info(f"Inserting records using {options.sessions} concurrent sessions, "
+                          f"commit policy: {options.commit_policy}")
+        pool = self._connection.create_pool(options.sessions, session_callback=self._init_pooled_session)
+        try:
+            loader = ConcurrentQueryLoader(pool, insert_batch, input_sizes,
+                                           sessions=options.sessions,
+                                           commit_policy=options.commit_policy,
+                                           logger=self._logger)
+            return loader.load(self._read_batches(data_path, skip_first_line))
+        except PartialCommitException as e:
+            raise WriterUserException(str(e)) from e
+        finally:
+            pool.close(force=True)
+
+    def _read_batches(self, data_path: str, skip_first_line: bool = True,
+                      skip_rows: int = 0) -> Iterable[Tuple[int, List[list]]]:
+        """
+        Reads the CSV input in batches of rows, compressed and sliced inputs are streamed.
+
+        Args:
+            skip_first_line: Skip the header, if the input has one
+            skip_rows: Number of data rows to skip, e.g. rows loaded by a previous run
+
+        Returns: Iterable of (row number of the first row in the batch, batch rows), rows are numbered from 1
+            excluding the header
+
+        """
+        data_input = CSVInput(data_path)
+        with data_input.open_text() as csv_file:
             csv_reader = csv.reader(csv_file, delimiter=',')
             buffer = []
-            if skip_first_line:
+            first_row_number = 1 + skip_rows
+            if skip_first_line and data_input.has_header:
                 csv_file.readline()
+            for _ in itertools.islice(csv_reader, skip_rows):
+                pass
             for line in csv_reader:
                 buffer.append(line)
                 if len(buffer) % self._batch_size == 0:
-                    cursor.executemany(insert_query, buffer)
+                    yield first_row_number, buffer
+                    first_row_number += len(buffer)
                     buffer = []
             if buffer:
-                cursor.executemany(insert_query, buffer)
+                yield first_row_number, buffer
 
-        cursor.close()
-        # TODO: Is it necessary to commit, if so when?
-        self._logger.debug("Executing Commit")
-        self._connection.connection.commit()
+    @staticmethod
+    def _loaded_columns(columns: List[str], skip_columns: Optional[List[str]]) -> List[str]:
+        if not skip_columns:
+            return columns
+        return [col for col in columns if col not in skip_columns]
+
+    @staticmethod
+    def _get_projection(columns: List[str], skip_columns: Optional[List[str]]) -> Optional[RowProjection]:
+        """
+        Returns: Positions of the loaded columns among the CSV columns, None when all columns are loaded
+        """
+        if not skip_columns:
+            return None
+        return RowProjection([position for position, col in enumerate(columns) if col not in skip_columns],
+                             len(columns))
+
+    @staticmethod
+    def _add_filler_fields(columns: List[str], columns_types: List[Tuple[str, str]],
+                           projection: RowProjection) -> List[Tuple[str, str]]:
+        """
+        Returns: Fields of all CSV columns, the skipped columns are read as FILLER fields that are not loaded
+        """
+        loaded = dict(zip(projection.positions, columns_types))
+        # the filler names never clash with the loaded columns
+        return [loaded.get(position, (f'KBC_FILLER_{position + 1}', FILLER_FIELD))
+                for position in range(len(columns))]
 
     def _validate_schema(self, columns: List[str], destination_columns: List[ColumnSchema]):
         expected_names = [col.name for col in destination_columns]
@@ -516,6 +1629,37 @@ class OracleWriter:
                                       f"The expected schema is: {expected_names}. "
                                       "Please check the column mapping and case")
 
+    def _validate_input(self, data_path: str, table_name: str, columns: List[str],
+                        destination_columns: List[ColumnSchema], skip_columns: Optional[List[str]] = None):
+        """
+        Pre-flight validation of the input against the destination columns, fails before any data is written
+        when more rows violate the column definitions than the allowed rejected rows.
+        """
+        if not self._preflight_options.enabled:
+            return
+        if ArrowInput.is_columnar(data_path):
+            self._logger.info("Pre-flight validation checks only CSV inputs, the columnar input is not validated.")
+            return
+
+        indexed_schema = {col.name: col for col in destination_columns}
+        max_rejected_rows = self._rejected_rows.max_rejected_rows
+        max_violations = self._preflight_options.max_violations
+        skipped = skip_columns or []
+        validator = PreflightValidator([None if col in skipped else indexed_schema[col] for col in columns],
+                                       self._default_format,
+                                       max_violations=max_rejected_rows + max_violations,
+                                       workers=self._preflight_options.workers, logger=self._logger)
+        with self.metrics.phase('preflight', table_name, bytes=CSVInput(data_path).size) as metric:
+            result = validator.validate(data_path)
+            metric.rows = result.rows_checked
+
+        if len(result.violations) > max_rejected_rows:
+            details = [f"Row {violation.row_number}: {violation.error}"
+                       for violation in result.violations[:max_violations]]
+            raise WriterUserException(f"Pre-flight validation found {len(result.violations)}"
+                                      f"{' or more' if result.stopped else ''} rows that do not match the "
+                                      f"destination table {table_name}, no data was written:\n" + '\n'.join(details))
+
     def _get_sqlldr_types(self, columns_involved: List[ColumnSchema]) -> List[Tuple[str, str]]:
         """
         Returns column names with SQLLoader type annotations
@@ -537,3 +1681,16 @@ class OracleWriter:
             result_typed.append((c.name, sqlldr_type))
 
         return result_typed
+
+    @staticmethod
+    def _get_sqlldr_field_widths(columns_involved: List[ColumnSchema]) -> List[int]:
+        """
+        Maximum byte width of each field as declared in the control file by _get_sqlldr_types.
+        """
+        widths = []
+        for c in columns_involved:
+            if 'CHAR' in c.source_type.split('(')[0].upper() and c.length:
+                widths.append(int(c.length))
+            else:
+                widths.append(DEFAULT_FIELD_WIDTH)
+        return widths
@@ -0,0 +1,9 @@
+"""
+Throughput benchmarks of the writer load paths against a fake oracledb connection and a fake sqlldr executable.
+
+Run from the repository root:
+
+    python -m tests.benchmark --rows 100000 --width 20 --check
+
+The thresholds of the --check option are in thresholds.json.
+"""
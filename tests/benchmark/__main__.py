@@ -0,0 +1,69 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from tests.benchmark.data_generator import DEFAULT_TYPE_MIX, build_table_schema, generate_csv, parse_type_mix
+from tests.benchmark.runner import (SCENARIOS, THRESHOLDS_PATH, check_thresholds, format_report, load_thresholds,
+                                    results_to_json, run_isolated, run_scenario)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m tests.benchmark',
+                                     description="Measures the load paths of the writer against a fake database "
+                                                 "and a fake sqlldr.")
+    parser.add_argument('--rows', type=int, default=100000, help="Number of generated rows")
+    parser.add_argument('--width', type=int, default=20, help="Number of columns including the ID")
+    parser.add_argument('--types', type=parse_type_mix, default=DEFAULT_TYPE_MIX,
+                        help=f"Column type weights, e.g. NUMBER:4,VARCHAR2:4,DATE:1. Types: {list(DEFAULT_TYPE_MIX)}")
+    parser.add_argument('--null-ratio', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"Comma separated scenarios: {list(SCENARIOS)}")
+    parser.add_argument('--check', action='store_true', help="Fail when a scenario is below its thresholds")
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH)
+    parser.add_argument('--output', help="Write the results as JSON into this file")
+    parser.add_argument('--in-process', action='store_true',
+                        help="Run all scenarios in this process, the peak RSS is then shared by them")
+    return parser.parse_args(argv)
+
+
+def main(argv) -> int:
+    args = parse_args(argv)
+    scenarios = [name.strip() for name in args.scenarios.split(',')]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios {unknown}, use one of {list(SCENARIOS)}", file=sys.stderr)
+        return 2
+
+    folder = tempfile.mkdtemp(prefix='benchmark_data_')
+    try:
+        table_schema = build_table_schema(args.width, args.types)
+        data_path = os.path.join(folder, 'data.csv')
+        generate_csv(data_path, table_schema, args.rows, null_ratio=args.null_ratio, seed=args.seed)
+        print(f"Generated {args.rows} rows x {args.width} columns, {os.path.getsize(data_path) / 2 ** 20:.1f} MB")
+
+        run = run_scenario if args.in_process else run_isolated
+        results = []
+        print(format_report([]))
+        for name in scenarios:
+            results.append(run(name, data_path, args.width, args.types))
+            print(format_report(results[-1:]).splitlines()[-1])
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(results_to_json(results))
+
+    if args.check:
+        regressions = check_thresholds(results, load_thresholds(args.thresholds), args.rows)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
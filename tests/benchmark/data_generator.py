@@ -0,0 +1,89 @@
+import csv
+import random
+import string
+from datetime import date, datetime, timedelta
+from itertools import cycle
+from typing import Callable, Dict, List, Optional
+
+from db_writer.table_schema import ColumnSchema, TableSchema
+
+# relative weights of the generated column types
+DEFAULT_TYPE_MIX = {'NUMBER': 4, 'DECIMAL': 2, 'VARCHAR2': 4, 'DATE': 1, 'TIMESTAMP': 1}
+
+VARCHAR_LENGTH = 100
+TEXT_ALPHABET = string.ascii_letters + string.digits + '  ,"'
+# random texts are drawn from a pool, building each of them char by char would dominate the generation time
+TEXT_POOL_SIZE = 4096
+EPOCH = datetime(2000, 1, 1)
+
+
+def parse_type_mix(value: str) -> Dict[str, int]:
+    """
+    Args:
+        value: e.g. NUMBER:4,VARCHAR2:4,DATE:1
+
+    """
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition(':')
+        name = name.strip().upper()
+        if name not in DEFAULT_TYPE_MIX:
+            raise ValueError(f"Unsupported column type {name}, use one of {list(DEFAULT_TYPE_MIX)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _column(name: str, kind: str) -> ColumnSchema:
+    if kind == 'NUMBER':
+        return ColumnSchema(name, 'NUMBER', 'NUMBER(18,0)', nullable=True, length='22', precision=18, scale=0)
+    if kind == 'DECIMAL':
+        return ColumnSchema(name, 'NUMBER', 'NUMBER(15,2)', nullable=True, length='22', precision=15, scale=2)
+    if kind == 'VARCHAR2':
+        return ColumnSchema(name, 'VARCHAR2', f'VARCHAR2({VARCHAR_LENGTH})', nullable=True,
+                            length=str(VARCHAR_LENGTH))
+    return ColumnSchema(name, kind, kind, nullable=True, length='7' if kind == 'DATE' else '11')
+
+
+def build_table_schema(width: int, type_mix: Optional[Dict[str, int]] = None,
+                       name: str = 'BENCHMARK') -> TableSchema:
+    """
+    Table with the ID primary key followed by width - 1 columns of the types interleaved by their weights.
+    """
+    pattern = [kind for kind, weight in (type_mix or DEFAULT_TYPE_MIX).items() for _ in range(weight)]
+    kinds = cycle(pattern)
+    columns = [ColumnSchema('ID', 'NUMBER', 'NUMBER(18,0)', length='22', precision=18, scale=0)]
+    columns += [_column(f'COL_{index}', next(kinds)) for index in range(1, width)]
+    return TableSchema(name, columns, primary_keys=['ID'])
+
+
+def _value_generator(column: ColumnSchema, rng: random.Random) -> Callable[[], str]:
+    if column.source_type == 'NUMBER' and column.scale:
+        return lambda: f'{rng.uniform(-10 ** 12, 10 ** 12):.{column.scale}f}'
+    if column.source_type == 'NUMBER':
+        return lambda: str(rng.randrange(-10 ** 15, 10 ** 15))
+    if column.source_type == 'VARCHAR2':
+        length = int(column.length)
+        pool = [''.join(rng.choices(TEXT_ALPHABET, k=rng.randint(1, length))) for _ in range(TEXT_POOL_SIZE)]
+        return lambda: rng.choice(pool)
+    if column.source_type == 'DATE':
+        return lambda: (date(2000, 1, 1) + timedelta(days=rng.randrange(20000))).isoformat()
+    return lambda: (EPOCH + timedelta(seconds=rng.randrange(10 ** 9),
+                                      microseconds=rng.randrange(10 ** 6))).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+
+def generate_csv(path: str, table_schema: TableSchema, rows: int, null_ratio: float = 0.05, seed: int = 0):
+    """
+    Writes a CSV with a header and rows of random values matching the column types.
+    The first column holds the row number, the values of the nullable columns are empty with null_ratio probability.
+    """
+    rng = random.Random(seed)
+    generators = [_value_generator(column, rng) for column in table_schema.columns[1:]]
+    nullable = [column.nullable for column in table_schema.columns[1:]]
+    with open(path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(table_schema.field_names)
+        for row_number in range(1, rows + 1):
+            row: List[str] = [str(row_number)]
+            for generate, can_be_null in zip(generators, nullable):
+                row.append('' if can_be_null and rng.random() < null_ratio else generate())
+            writer.writerow(row)
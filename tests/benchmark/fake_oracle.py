@@ -0,0 +1,101 @@
+from typing import List, Optional
+
+from db_writer.table_schema import TableSchema
+
+
+class FakeCursor:
+    """
+    Cursor that answers the metadata queries of the writer from the TableSchema and records the inserted batches.
+    """
+
+    def __init__(self, connection: 'FakeConnection'):
+        self._connection = connection
+        self._result = []
+        self.rowcount = 0
+
+    def execute(self, query: str, parameters: Optional[dict] = None):
+        self._connection.queries.append(query)
+        self._result = self._connection.answer(query)
+        # a MERGE of the staging table touches every staged row
+        self.rowcount = self._connection.rows_inserted if query.lstrip().startswith('MERGE') else 0
+
+    def fetchall(self) -> list:
+        return self._result
+
+    def setinputsizes(self, *sizes):
+        pass
+
+    def executemany(self, query: str, rows: List[list], batcherrors: bool = False):
+        # the bound values are materialized by the driver, consume them the same way
+        if rows and len(rows[0]) != query.count(':'):
+            raise AssertionError(f"{len(rows[0])} values bound to the query: {query}")
+        self._connection.record_batch(len(rows))
+
+    def getbatcherrors(self) -> list:
+        return []
+
+    def callproc(self, name: str, parameters: list = None, keyword_parameters: dict = None):
+        self._connection.queries.append(name)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """
+    Stand-in for oracledb.Connection. Connections acquired from a FakePool share the records of the pool.
+    """
+
+    def __init__(self, table_schema: TableSchema, shared: Optional['FakeConnection'] = None):
+        self._table_schema = table_schema
+        self._shared = shared
+        self.queries: List[str] = []
+        self.batch_sizes: List[int] = []
+        self.commits = 0
+
+    def answer(self, query: str) -> list:
+        if 'ALL_TAB_COLS' in query:
+            return [(column.name, column.source_type, column.length, column.precision,
+                     'Y' if column.nullable else 'N', column.scale) for column in self._table_schema.columns]
+        return []
+
+    def record_batch(self, size: int):
+        (self._shared or self).batch_sizes.append(size)
+
+    @property
+    def rows_inserted(self) -> int:
+        return sum((self._shared or self).batch_sizes)
+
+    def cursor(self) -> FakeCursor:
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    """
+    Stand-in for oracledb.ConnectionPool.
+    """
+
+    def __init__(self, connection: FakeConnection, session_callback=None):
+        self._connection = connection
+        self._session_callback = session_callback
+
+    def acquire(self) -> FakeConnection:
+        session = FakeConnection(self._connection._table_schema, shared=self._connection)
+        if self._session_callback:
+            self._session_callback(session, None)
+        return session
+
+    def release(self, connection: FakeConnection):
+        pass
+
+    def close(self, force: bool = False):
+        pass
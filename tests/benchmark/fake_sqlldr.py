@@ -0,0 +1,79 @@
+"""
+Stand-in for the sqlldr executable. Parses the control file, reads the data file the way SQL*Loader does
+(CSV records, skip, field count) and writes the log and bad files in the SQL*Loader format.
+
+Usage: fake_sqlldr.py userid=... control=... data=... log=... bad=... [skip=N] [errors=N] ...
+"""
+import csv
+import re
+import sys
+import time
+
+SQLLDR_EX_WARN = 2
+
+
+def parse_arguments(argv):
+    parameters = {}
+    for argument in argv:
+        key, _, value = argument.partition('=')
+        parameters[key.lower()] = value
+    return parameters
+
+
+def parse_control_file(path):
+    with open(path, 'r', encoding='utf-8') as control_file:
+        text = control_file.read()
+    table = re.search(r'into table (\S+)', text).group(1)
+    column_list = text.split('TRAILING NULLCOLS', 1)[1].strip()
+    # CTLFileBuilder puts each column on its own line
+    return table, len(column_list.splitlines())
+
+
+def format_duration(seconds):
+    return f'{int(seconds // 3600):02d}:{int(seconds % 3600 // 60):02d}:{seconds % 60:05.2f}'
+
+
+def main(argv):
+    parameters = parse_arguments(argv)
+    table, column_count = parse_control_file(parameters['control'])
+    skip = int(parameters.get('skip', 0))
+    errors = int(parameters.get('errors', 50))
+    commit_rows = int(parameters.get('rows', 64))
+    started = time.process_time(), time.perf_counter()
+    loaded, rejected, record_number = 0, 0, 0
+    messages = []
+    with open(parameters['data'], 'r', newline='', encoding='utf-8') as data_file, \
+            open(parameters['bad'], 'w', newline='', encoding='utf-8') as bad_file:
+        bad_writer = csv.writer(bad_file, lineterminator='\n')
+        for record in csv.reader(data_file):
+            record_number += 1
+            if record_number <= skip:
+                continue
+            if len(record) > column_count:
+                rejected += 1
+                bad_writer.writerow(record)
+                messages.append(f'Record {record_number}: Rejected - Error on table {table}.\n'
+                                f'ORA-01722: invalid number\n')
+                if rejected > errors:
+                    break
+                continue
+            loaded += 1
+            if loaded % commit_rows == 0:
+                print(f'Commit point reached - logical record count {record_number}', flush=True)
+
+    with open(parameters['log'], 'w', encoding='utf-8') as log_file:
+        log_file.write(f'Control File:   {parameters["control"]}\nData File:      {parameters["data"]}\n\n')
+        log_file.write(''.join(messages))
+        log_file.write(f'\nTable {table}:\n  {loaded} Rows successfully loaded.\n'
+                       f'  {rejected} Rows not loaded due to data errors.\n\n')
+        log_file.write(f'Total logical records skipped: {min(skip, record_number)}\n'
+                       f'Total logical records read: {loaded + rejected}\n'
+                       f'Total logical records rejected: {rejected}\n'
+                       f'Total logical records discarded: 0\n\n')
+        log_file.write(f'Elapsed time was:     {format_duration(time.perf_counter() - started[1])}\n'
+                       f'CPU time was:         {format_duration(time.process_time() - started[0])}\n')
+    return SQLLDR_EX_WARN if rejected else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
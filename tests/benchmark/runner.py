@@ -0,0 +1,252 @@
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import mock
+
+from configuration import DefaultFormatOptions, QueryLoadOptions, SQLLoaderOptions
+from db_writer.csv_splitter import CSVSplitter
+from db_writer.row_converter import RowConverter
+from db_writer.sql_loader import CTLFileBuilder, SQLLoaderExecutor
+from db_writer.table_schema import TableSchema
+from db_writer.writer import OracleCredentials, OracleMetadataProvider, OracleWriter
+from tests.benchmark.data_generator import build_table_schema
+from tests.benchmark.fake_oracle import FakeConnection, FakeCursor, FakePool
+
+FAKE_SQLLDR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'fake_sqlldr.py')
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'thresholds.json')
+
+
+@dataclass
+class Scenario:
+    description: str
+    load: Callable[[OracleWriter, str, TableSchema], None]
+    sql_loader_options: Callable[[], SQLLoaderOptions] = SQLLoaderOptions
+    query_load_options: Callable[[], QueryLoadOptions] = QueryLoadOptions
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'query': Scenario("Append using executemany in a single session",
+                      lambda writer, path, table: writer.upload_incremental(path, None, table.name, table.field_names,
+                                                                            method='query')),
+    'query_sessions': Scenario("Append using executemany in 4 concurrent sessions",
+                               lambda writer, path, table: writer.upload_incremental(path, None, table.name,
+                                                                                     table.field_names,
+                                                                                     method='query'),
+                               query_load_options=lambda: QueryLoadOptions(sessions=4)),
+    'sqlldr': Scenario("Full load using a single SQL*Loader process",
+                       lambda writer, path, table: writer.upload_full(path, None, table.name, table.field_names)),
+    'sqlldr_parallel': Scenario("Append using 4 SQL*Loader processes over the split input",
+                                lambda writer, path, table: writer.upload_incremental(path, None, table.name,
+                                                                                      table.field_names),
+                                sql_loader_options=lambda: SQLLoaderOptions(parallel_workers=4)),
+    'upsert': Scenario("Upsert through a temporary staging table filled using executemany",
+                       lambda writer, path, table: writer.upload_incremental(path, None, table.name,
+                                                                             table.field_names,
+                                                                             primary_key=table.primary_keys,
+                                                                             method='query')),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    rows: int
+    seconds: float
+    rows_per_second: float
+    # high-water marks of the benchmark process and of the (fake) sqlldr processes
+    peak_rss_mb: float
+    child_peak_rss_mb: float
+    # time spent in each phase, summed over the threads
+    phases: Dict[str, float] = field(default_factory=dict)
+
+
+class PhaseTimer:
+    """
+    Wraps methods of the measured classes and sums the time spent in them per phase.
+    Generators are measured while they produce the items, not while the consumer processes them.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._patches = []
+
+    def measure(self, owner: type, attribute: str, phase: str, on_result: Optional[Callable] = None):
+        original = inspect.getattr_static(owner, attribute)
+        bound = getattr(owner, attribute)
+
+        def add(started: float):
+            with self._lock:
+                self.phases[phase] += time.perf_counter() - started
+
+        def timed_generator(generator):
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    add(started)
+                    return
+                add(started)
+                yield item
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = bound(*args, **kwargs)
+            if inspect.isgenerator(result):
+                add(started)
+                return timed_generator(result)
+            add(started)
+            if on_result:
+                on_result(result)
+            return result
+
+        replacement = staticmethod(wrapper) if isinstance(original, (staticmethod, classmethod)) else wrapper
+        patch = mock.patch.object(owner, attribute, replacement)
+        patch.start()
+        self._patches.append(patch)
+
+    def __enter__(self) -> 'PhaseTimer':
+        return self
+
+    def __exit__(self, *exc):
+        for patch in reversed(self._patches):
+            patch.stop()
+        self._patches.clear()
+
+
+def _write_sqlldr_wrapper(folder: str) -> str:
+    path = os.path.join(folder, 'sqlldr')
+    with open(path, 'w') as out:
+        out.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_SQLLDR}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
+
+
+def _peak_rss_mb(who: int) -> float:
+    # kilobytes on Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def run_scenario(name: str, data_path: str, width: int,
+                 type_mix: Optional[Dict[str, int]] = None) -> BenchmarkResult:
+    """
+    Loads the file using the scenario against the fake database and the fake sqlldr in the current process.
+    The table is described by its width and type mix, the same as for generate_csv().
+    """
+    scenario = SCENARIOS[name]
+    table_schema = build_table_schema(width, type_mix)
+    work_folder = tempfile.mkdtemp(prefix=f'benchmark_{name}_')
+    connection = FakeConnection(table_schema)
+    logger = logging.getLogger('db_writer.writer')
+    original_handlers = list(logger.handlers)
+    sqlldr_rows: List[int] = []
+    # the writer log goes to its file only, not into the report
+    logger.propagate = False
+    try:
+        credentials = OracleCredentials(username='benchmark', password='benchmark', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path=work_folder)
+        writer = OracleWriter(credentials, log_folder=work_folder,
+                              sql_loader_options=scenario.sql_loader_options(),
+                              default_format=DefaultFormatOptions(),
+                              sql_loader_path=_write_sqlldr_wrapper(work_folder),
+                              query_load_options=scenario.query_load_options())
+
+        def create_pool(*args, session_callback=None, **kwargs):
+            return FakePool(connection, session_callback)
+
+        with mock.patch('oracledb.init_oracle_client'), \
+                mock.patch('oracledb.connect', return_value=connection), \
+                mock.patch('oracledb.create_pool', side_effect=create_pool), \
+                PhaseTimer() as timer:
+            timer.measure(OracleMetadataProvider, 'get_table_metadata', 'metadata')
+            timer.measure(OracleWriter, '_read_batches', 'read_csv')
+            timer.measure(RowConverter, 'convert_rows', 'convert')
+            timer.measure(FakeCursor, 'executemany', 'insert')
+            timer.measure(CTLFileBuilder, 'build', 'ctl_file')
+            timer.measure(CSVSplitter, 'find_chunk_ranges', 'split')
+            timer.measure(SQLLoaderExecutor, '_execute_sqlloader', 'sqlldr')
+            timer.measure(SQLLoaderExecutor, '_collect_result', 'sqlldr_log',
+                          on_result=lambda result: sqlldr_rows.append(result.rows_loaded))
+
+            started = time.perf_counter()
+            writer.connect()
+            scenario.load(writer, data_path, table_schema)
+            writer.close_connection()
+            seconds = time.perf_counter() - started
+            phases = {phase: round(value, 3) for phase, value in sorted(timer.phases.items())}
+    finally:
+        logger.propagate = True
+        for handler in list(logger.handlers):
+            if handler not in original_handlers:
+                handler.close()
+                logger.removeHandler(handler)
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    rows = connection.rows_inserted + sum(sqlldr_rows)
+    return BenchmarkResult(scenario=name, rows=rows, seconds=round(seconds, 3),
+                           rows_per_second=round(rows / seconds, 1) if seconds else 0.0,
+                           peak_rss_mb=_peak_rss_mb(resource.RUSAGE_SELF),
+                           child_peak_rss_mb=_peak_rss_mb(resource.RUSAGE_CHILDREN),
+                           phases=phases)
+
+
+def run_isolated(name: str, data_path: str, width: int,
+                 type_mix: Optional[Dict[str, int]] = None) -> BenchmarkResult:
+    """
+    Runs the scenario in a fresh process, the peak RSS would be shared by the scenarios otherwise.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_scenario, name, data_path, width, type_mix).result()
+
+
+def load_thresholds(path: str = THRESHOLDS_PATH) -> Dict[str, dict]:
+    with open(path, 'r') as thresholds_file:
+        return json.load(thresholds_file)['scenarios']
+
+
+def check_thresholds(results: List[BenchmarkResult], thresholds: Dict[str, dict], expected_rows: int) -> List[str]:
+    """
+    Returns: Descriptions of the regressions, empty when all scenarios are within their thresholds
+    """
+    regressions = []
+    for result in results:
+        if result.rows != expected_rows:
+            regressions.append(f"{result.scenario}: loaded {result.rows} rows instead of {expected_rows}")
+        limits = thresholds.get(result.scenario, {})
+        min_rows_per_second = limits.get('min_rows_per_second')
+        if min_rows_per_second and result.rows_per_second < min_rows_per_second:
+            regressions.append(f"{result.scenario}: {result.rows_per_second} rows/s is below the threshold "
+                               f"of {min_rows_per_second} rows/s")
+        max_peak_rss_mb = limits.get('max_peak_rss_mb')
+        if max_peak_rss_mb and result.peak_rss_mb > max_peak_rss_mb:
+            regressions.append(f"{result.scenario}: peak RSS {result.peak_rss_mb} MB exceeds the threshold "
+                               f"of {max_peak_rss_mb} MB")
+    return regressions
+
+
+def format_report(results: List[BenchmarkResult]) -> str:
+    lines = [f"{'scenario':<16} {'rows':>10} {'seconds':>9} {'rows/s':>11} {'RSS MB':>8} {'sqlldr MB':>9}  phases"]
+    for result in results:
+        phases = ', '.join(f'{phase}={seconds}s' for phase, seconds in result.phases.items())
+        lines.append(f"{result.scenario:<16} {result.rows:>10} {result.seconds:>9} {result.rows_per_second:>11} "
+                     f"{result.peak_rss_mb:>8} {result.child_peak_rss_mb:>9}  {phases}")
+    return '\n'.join(lines)
+
+
+def results_to_json(results: List[BenchmarkResult]) -> str:
+    return json.dumps([asdict(result) for result in results], indent=2)
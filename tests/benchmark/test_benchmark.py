@@ -0,0 +1,58 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.benchmark.data_generator import build_table_schema, generate_csv, parse_type_mix
+from tests.benchmark.runner import SCENARIOS, check_thresholds, load_thresholds, run_scenario
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Keeps the benchmark harness working, the throughput itself is checked by python -m tests.benchmark --check."""
+
+    ROWS = 25
+    WIDTH = 7
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._data_path = os.path.join(self._folder, 'data.csv')
+        generate_csv(self._data_path, build_table_schema(self.WIDTH), self.ROWS)
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def test_generated_csv_matches_schema(self):
+        with open(self._data_path, 'r', newline='') as data_file:
+            rows = list(csv.reader(data_file))
+
+        self.assertEqual(build_table_schema(self.WIDTH).field_names, rows[0])
+        self.assertEqual(self.ROWS, len(rows) - 1)
+        self.assertTrue(all(len(row) == self.WIDTH for row in rows))
+        self.assertEqual([str(i) for i in range(1, self.ROWS + 1)], [row[0] for row in rows[1:]])
+
+    def test_type_mix(self):
+        table_schema = build_table_schema(4, parse_type_mix('DATE:1,VARCHAR2'))
+
+        self.assertEqual(['NUMBER', 'DATE', 'VARCHAR2', 'DATE'], [c.source_type for c in table_schema.columns])
+
+    def test_all_scenarios_load_all_rows(self):
+        results = [run_scenario(name, self._data_path, self.WIDTH) for name in SCENARIOS]
+
+        self.assertEqual([self.ROWS] * len(SCENARIOS), [result.rows for result in results])
+        self.assertEqual([], check_thresholds(results, {}, self.ROWS))
+        self.assertIn('read_csv', results[0].phases)
+        self.assertIn('sqlldr', results[2].phases)
+
+    def test_thresholds_report_regressions(self):
+        result = run_scenario('query', self._data_path, self.WIDTH)
+        thresholds = {'query': {'min_rows_per_second': 10 ** 12, 'max_peak_rss_mb': 1}}
+
+        regressions = check_thresholds([result], thresholds, self.ROWS)
+
+        self.assertEqual(2, len(regressions))
+        self.assertEqual(set(SCENARIOS), set(load_thresholds()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from db_writer.arrow_input import ArrowInput, ArrowInputError
+
+PYARROW_INSTALLED = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestArrowInput(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self._folder, name)
+        with open(path, 'wb') as out:
+            out.write(content)
+        return path
+
+    def test_format_detected_by_extension(self):
+        self.assertEqual('parquet', ArrowInput.detect_format(self._write('data.parquet', b'')))
+        self.assertEqual('arrow', ArrowInput.detect_format(self._write('data.feather', b'')))
+        self.assertEqual('', ArrowInput.detect_format(self._write('data.csv', b'ID\n1\n')))
+
+    def test_format_detected_by_magic_bytes(self):
+        self.assertEqual('parquet', ArrowInput.detect_format(self._write('data', b'PAR1\x15\x04')))
+        self.assertEqual('arrow', ArrowInput.detect_format(self._write('table', b'ARROW1\x00\x00')))
+        self.assertFalse(ArrowInput.is_columnar(self._write('other', b'PA')))
+
+    def test_sliced_and_missing_inputs_are_not_columnar(self):
+        self.assertFalse(ArrowInput.is_columnar(self._folder))
+        self.assertFalse(ArrowInput.is_columnar(os.path.join(self._folder, 'missing')))
+
+    def test_missing_pyarrow_raises(self):
+        arrow_input = ArrowInput(self._write('data.parquet', b'PAR1'))
+        with mock.patch.dict(sys.modules, {'pyarrow': None}):
+            with self.assertRaisesRegex(ArrowInputError, 'pyarrow'):
+                arrow_input.column_names()
+
+    @unittest.skipUnless(PYARROW_INSTALLED, 'pyarrow is not installed')
+    def test_iter_tables_skips_rows_and_splits_batches(self):
+        import pyarrow
+        import pyarrow.parquet
+        path = os.path.join(self._folder, 'data.parquet')
+        pyarrow.parquet.write_table(pyarrow.table({'ID': list(range(1, 8)), 'NAME': list('abcdefg')}), path)
+
+        arrow_input = ArrowInput(path)
+        tables = list(arrow_input.iter_tables(batch_size=2, skip_rows=3))
+
+        self.assertEqual(['ID', 'NAME'], arrow_input.column_names())
+        self.assertEqual([[4, 5], [6, 7]], [table.column('ID').to_pylist() for table in tables])
+
+    @unittest.skipUnless(PYARROW_INSTALLED, 'pyarrow is not installed')
+    def test_iter_tables_reads_ipc_stream(self):
+        import pyarrow
+        import pyarrow.ipc
+        path = os.path.join(self._folder, 'data.arrows')
+        table = pyarrow.table({'ID': [1, 2, 3]})
+        with pyarrow.ipc.new_stream(path, table.schema) as stream:
+            stream.write_table(table)
+
+        tables = list(ArrowInput(path).iter_tables(batch_size=2))
+
+        self.assertEqual([[1, 2], [3]], [table.column('ID').to_pylist() for table in tables])
+
+
+if __name__ == '__main__':
+    unittest.main()
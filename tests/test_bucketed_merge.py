@@ -0,0 +1,78 @@
+import unittest
+
+import mock
+import oracledb
+
+from db_writer.bucketed_merge import BucketedMerge, BucketedMergeException
+
+
+class FakePool:
+    """Hands out mock connections, the merge of the given buckets fails."""
+
+    def __init__(self, failing_buckets=()):
+        self.connections = []
+        self.released = []
+        self._failing_buckets = failing_buckets
+
+    def acquire(self):
+        connection = mock.Mock()
+        connection.cursor.return_value.execute.side_effect = self._execute
+        connection.cursor.return_value.rowcount = 10
+        self.connections.append(connection)
+        return connection
+
+    def release(self, connection):
+        self.released.append(connection)
+
+    def _execute(self, query, bucket=None):
+        if bucket in self._failing_buckets:
+            raise oracledb.DatabaseError('ORA-01555: snapshot too old')
+
+
+class TestBucketedMerge(unittest.TestCase):
+
+    def test_all_buckets_are_committed(self):
+        pool = FakePool()
+
+        rows = BucketedMerge(pool, 'MERGE', buckets=5, sessions=2).merge()
+
+        self.assertEqual(50, rows)
+        self.assertEqual(5, len(pool.released))
+        for connection in pool.connections:
+            connection.commit.assert_called_once()
+
+    def test_stop_policy_skips_remaining_buckets(self):
+        pool = FakePool(failing_buckets=(1,))
+
+        with self.assertRaises(BucketedMergeException) as context:
+            BucketedMerge(pool, 'MERGE', buckets=4, sessions=1).merge()
+
+        self.assertEqual([0], context.exception.committed_buckets)
+        self.assertEqual([1], context.exception.failed_buckets)
+        self.assertEqual(['committed', 'failed', 'skipped', 'skipped'],
+                         [r.status for r in context.exception.results])
+        pool.connections[1].rollback.assert_called_once()
+        self.assertEqual(2, len(pool.released))
+
+    def test_continue_policy_merges_remaining_buckets(self):
+        pool = FakePool(failing_buckets=(1,))
+
+        with self.assertRaises(BucketedMergeException) as context:
+            BucketedMerge(pool, 'MERGE', buckets=4, sessions=1, failure_policy='continue').merge()
+
+        self.assertEqual([0, 2, 3], context.exception.committed_buckets)
+
+    def test_parallel_dml_is_enabled_in_each_session(self):
+        pool = FakePool()
+
+        BucketedMerge(pool, 'MERGE', buckets=2, sessions=1, parallel_dml=True).merge()
+
+        for connection in pool.connections:
+            connection.cursor.return_value.execute.assert_any_call("ALTER SESSION ENABLE PARALLEL DML")
+
+    def test_bucket_expression(self):
+        self.assertEqual('ORA_HASH("A" || CHR(1) || "B", 7)', BucketedMerge.bucket_expression(['"A"', '"B"'], 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
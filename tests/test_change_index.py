@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from db_writer.change_index import (ChangeIndex, ChangeIndexBuilder, TableFingerprint, build_change_index,
+                                    filter_changed_rows, hash_values)
+
+FINGERPRINT = TableFingerprint(3, '2024-01-01T00:00:00')
+
+
+class TestChangeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self._folder, name)
+        with open(path, 'w', newline='') as out:
+            out.write(text)
+        return path
+
+    def _filter(self, data_path: str, previous_index_path=None, rejected_rows=()):
+        output_folder = tempfile.mkdtemp(dir=self._folder)
+        result = filter_changed_rows(data_path, ['ID', 'NAME'], ['ID'], previous_index_path, output_folder)
+        index_path = os.path.join(output_folder, 'change_index.bin')
+        build_change_index(result, rejected_rows, FINGERPRINT, index_path)
+        return result, index_path
+
+    def test_first_run_loads_all_rows(self):
+        result, index_path = self._filter(self._write('in.csv', 'ID,NAME\n1,a\n2,b\n'))
+
+        self.assertEqual((2, 2), (result.rows_total, result.rows_changed))
+        with ChangeIndex(index_path) as index:
+            self.assertEqual(FINGERPRINT, index.fingerprint)
+            self.assertEqual(2, len(index))
+            self.assertEqual(hash_values(['1', 'a']), index.lookup(hash_values(['1'])))
+            self.assertIsNone(index.lookup(hash_values(['3'])))
+
+    def test_only_new_and_changed_rows_are_kept(self):
+        _, first_index_path = self._filter(self._write('in.csv', 'ID,NAME\n1,a\n2,b\n3,c\n'))
+
+        second, second_index_path = self._filter(self._write('in2.csv', 'ID,NAME\n1,a\n2,x\n4,d\n'), first_index_path)
+
+        with open(second.data_path) as filtered:
+            self.assertEqual('ID,NAME\n2,x\n4,d\n', filtered.read())
+        with ChangeIndex(second_index_path) as index:
+            # keys missing in the current input keep their previous hashes
+            self.assertEqual(4, len(index))
+            self.assertEqual(hash_values(['2', 'x']), index.lookup(hash_values(['2'])))
+            self.assertEqual(hash_values(['3', 'c']), index.lookup(hash_values(['3'])))
+
+    def test_rejected_rows_keep_previous_records(self):
+        _, first_index_path = self._filter(self._write('in.csv', 'ID,NAME\n1,a\n2,b\n'))
+
+        second, second_index_path = self._filter(self._write('in2.csv', 'ID,NAME\n1,x\n2,y\n3,z\n'), first_index_path,
+                              rejected_rows=[['2', 'y'], ['3', 'z']])
+
+        with ChangeIndex(second_index_path) as index:
+            self.assertEqual(hash_values(['1', 'x']), index.lookup(hash_values(['1'])))
+            self.assertEqual(hash_values(['2', 'b']), index.lookup(hash_values(['2'])))
+            self.assertIsNone(index.lookup(hash_values(['3'])))
+
+    def test_sliced_input_without_header(self):
+        sliced = os.path.join(self._folder, 'sliced.csv')
+        os.mkdir(sliced)
+        self._write('sliced.csv/part_1', '1,a\n')
+        self._write('sliced.csv/part_2', '2,b\n')
+
+        result, index_path = self._filter(sliced)
+
+        with open(result.data_path) as filtered:
+            self.assertEqual('ID,NAME\n1,a\n2,b\n', filtered.read())
+
+    def test_runs_are_merged_in_sorted_order(self):
+        builder = ChangeIndexBuilder(self._folder, run_size=3)
+        keys = [9, 2, 7, 4, 1, 8, 3]
+        for key in keys:
+            builder.add(key, key * 10)
+        builder.add(7, 71)
+        index_path = os.path.join(self._folder, 'index.bin')
+
+        with ChangeIndex() as empty:
+            count = builder.build(index_path, empty, FINGERPRINT)
+
+        with ChangeIndex(index_path) as index:
+            self.assertEqual(len(keys), count)
+            self.assertEqual(sorted(keys), [key for key, _ in index])
+            self.assertEqual(71, index.lookup(7))
+
+    def test_invalid_index_file(self):
+        path = self._write('broken.bin', 'x' * 64)
+
+        with self.assertRaises(ValueError):
+            ChangeIndex(path)
+
+    def test_missing_primary_key_column(self):
+        with self.assertRaises(ValueError):
+            filter_changed_rows(self._write('in.csv', 'ID\n1\n'), ['ID'], ['CODE'], None, self._folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from db_writer.checkpoint import CheckpointStore, file_fingerprint
+
+
+class FakeConnection:
+    """Keeps the checkpoint table in a dictionary, the statements are recognized by their start."""
+
+    def __init__(self, table_exists: bool = True, verified_column: bool = True):
+        self.table_exists = table_exists
+        self.verified_column = verified_column
+        self.rows = {}
+        self.statements = []
+
+    def perform_query(self, query, bind_parameters=None):
+        statement = query.strip()
+        self.statements.append(statement)
+        if statement.startswith('SELECT 1 FROM ALL_TABLES'):
+            return iter([(1,)] if self.table_exists else [])
+        if statement.startswith('SELECT 1 FROM ALL_TAB_COLUMNS'):
+            return iter([(1,)] if self.verified_column else [])
+        if statement.startswith('CREATE TABLE'):
+            self.table_exists = True
+        elif statement.startswith('ALTER TABLE'):
+            self.verified_column = True
+        elif statement.startswith('SELECT FINGERPRINT'):
+            entry = self.rows.get(bind_parameters['key'])
+            return iter([entry] if entry else [])
+        elif statement.startswith('MERGE'):
+            self.rows[bind_parameters['key']] = (bind_parameters['fingerprint'], bind_parameters['rows'],
+                                                 bind_parameters['verified'])
+        elif statement.startswith('DELETE'):
+            self.rows.pop(bind_parameters['key'], None)
+        return iter([])
+
+
+class TestCheckpointStore(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._path = os.path.join(self._folder, 'data.csv')
+        self._write('ID\n1\n2\n3\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write(self, content: str):
+        with open(self._path, 'w') as out:
+            out.write(content)
+
+    def test_same_file_continues_from_saved_rows(self):
+        connection = FakeConnection()
+        CheckpointStore(connection).start('"S"."T"', self._path).save(2)
+
+        checkpoint = CheckpointStore(connection).start('"S"."T"', self._path)
+
+        self.assertEqual(2, checkpoint.offset)
+
+    def test_changed_file_starts_over(self):
+        store = CheckpointStore(FakeConnection())
+        store.start('"S"."T"', self._path).save(2)
+        self._write('ID\n1\n2\n4\n')
+
+        self.assertEqual(0, store.start('"S"."T"', self._path).offset)
+
+    def test_offset_accumulates_and_completion_clears(self):
+        connection = FakeConnection()
+        connection.rows['"S"."T"'] = (file_fingerprint(self._path), 2, 1)
+        checkpoint = CheckpointStore(connection).start('"S"."T"', self._path)
+
+        checkpoint.save(1)
+        self.assertEqual(3, connection.rows['"S"."T"'][1])
+
+        checkpoint.complete()
+        self.assertEqual({}, connection.rows)
+
+    def test_external_load_leaves_offset_unverified(self):
+        connection = FakeConnection()
+        store = CheckpointStore(connection)
+        store.start('"S"."T"', self._path).save(2)
+
+        store.start('"S"."T"', self._path).start_external()
+        checkpoint = store.start('"S"."T"', self._path)
+        self.assertEqual((2, False), (checkpoint.offset, checkpoint.verified))
+
+        checkpoint.save(1)
+        checkpoint = store.start('"S"."T"', self._path)
+        self.assertEqual((3, True), (checkpoint.offset, checkpoint.verified))
+
+    def test_missing_table_is_created(self):
+        connection = FakeConnection(table_exists=False)
+
+        CheckpointStore(connection).start('"S"."T"', self._path)
+
+        self.assertTrue(connection.statements[1].startswith('CREATE TABLE KBC_LOAD_CHECKPOINTS'))
+        CheckpointStore(connection).start('"S"."T"', self._path)
+        self.assertEqual(1, sum(s.startswith('CREATE TABLE') for s in connection.statements))
+
+    def test_verified_column_is_added_to_old_table(self):
+        connection = FakeConnection(verified_column=False)
+
+        CheckpointStore(connection).start('"S"."T"', self._path)
+
+        self.assertIn('ALTER TABLE KBC_LOAD_CHECKPOINTS ADD (VERIFIED NUMBER(1) DEFAULT 1 NOT NULL)',
+                      connection.statements)
+        CheckpointStore(connection).start('"S"."T"', self._path)
+        self.assertEqual(1, sum(s.startswith('ALTER TABLE') for s in connection.statements))
+
+    def test_fingerprint_samples_large_files(self):
+        self._write('x' * 100)
+        first = file_fingerprint(self._path, sample_size=10)
+        self._write('x' * 50 + 'y' + 'x' * 49)
+
+        self.assertEqual(first, file_fingerprint(self._path, sample_size=10))
+        self._write('x' * 99 + 'y')
+        self.assertNotEqual(first, file_fingerprint(self._path, sample_size=10))
+
+    def test_fingerprint_of_sliced_input_covers_slices(self):
+        sliced = os.path.join(self._folder, 'sliced')
+        os.mkdir(sliced)
+        for name in ('part_1', 'part_2'):
+            with open(os.path.join(sliced, name), 'w') as out:
+                out.write('1\n')
+        first = file_fingerprint(sliced)
+
+        with open(os.path.join(sliced, 'part_2'), 'w') as out:
+            out.write('2\n')
+        self.assertNotEqual(first, file_fingerprint(sliced))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,12 +3,25 @@ Created on 12. 11. 2018
 
 @author: esner
 '''
+import csv
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 import mock
 import os
 from freezegun import freeze_time
 
-from component import Component
+from keboola.component.dao import FileDefinition, TableDefinition
+from keboola.component.exceptions import UserException
+
+import configuration
+from component import Component, TableLoad
+from db_writer.rejected_rows import RejectedRow
+from db_writer.run_metrics import RunMetrics
+from db_writer.writer import WriterUserException
 
 
 class TestComponent(unittest.TestCase):
@@ -23,6 +36,314 @@ class TestComponent(unittest.TestCase):
             comp.run()
 
 
+class TestMultipleTables(unittest.TestCase):
+    """Covers loading of several input tables in Component._load_tables."""
+
+    @staticmethod
+    def _build_component(**parameters) -> Component:
+        component = Component.__new__(Component)
+        config = {"db": {"host_port": "localhost:1521", "database": "ORCL", "user": "u", "pswd_password": "p"},
+                  "schema": "S",
+                  "loading_options": {"load_type": "full_load"},
+                  "default_format_options": {}}
+        config.update(parameters)
+        component._configuration = configuration.Configuration.load_from_dict(config)
+        component.environment_variables = mock.Mock(run_id='run', config_id='cfg')
+        return component
+
+    @staticmethod
+    def _input_table(name: str) -> TableDefinition:
+        return TableDefinition(name, full_path=f'/data/in/tables/{name}', columns=['ID'])
+
+    def test_tables_are_mapped_by_file_name(self):
+        component = self._build_component(tables=[{"source": "b.csv", "table_name": "B", "schema": "OTHER"},
+                                                  {"source": "a.csv", "table_name": "A"}])
+
+        with mock.patch.object(component, 'get_input_tables_definitions',
+                               return_value=[self._input_table('a.csv'), self._input_table('b.csv')]):
+            table_loads = component._get_table_loads()
+
+        self.assertEqual([('b.csv', 'OTHER', 'B'), ('a.csv', 'S', 'A')],
+                         [(t.input_table.name, t.schema, t.table_name) for t in table_loads])
+
+    def test_missing_input_table_fails(self):
+        component = self._build_component(tables=[{"source": "missing.csv", "table_name": "A"}])
+
+        with mock.patch.object(component, 'get_input_tables_definitions', return_value=[self._input_table('a.csv')]):
+            with self.assertRaises(UserException):
+                component._get_table_loads()
+
+    def test_skipped_columns_follow_column_mapping(self):
+        component = self._build_component(tables=[{"source": "a.csv", "table_name": "A", "skip_columns": ["note"],
+                                                   "columns": [{"source_name": "note", "destination_name": "NOTE"},
+                                                               {"source_name": "id", "destination_name": "ID"}]}])
+        input_table = TableDefinition('a.csv', full_path='/data/in/tables/a.csv', columns=['id', 'note', 'name'])
+
+        with mock.patch.object(component, 'get_input_tables_definitions', return_value=[input_table]):
+            table_load = component._get_table_loads()[0]
+
+        self.assertEqual((['ID', 'NOTE', 'name'], ['NOTE']), (table_load.columns, table_load.skip_columns))
+
+    def test_source_table_is_mapped_more_than_once(self):
+        component = self._build_component(tables=[
+            {"source": "a.csv", "table_name": "A", "columns": [{"source_name": "id", "destination_name": "ID"}]},
+            {"source": "a.csv", "table_name": "B", "columns": [{"source_name": "id", "destination_name": "KEY"}]}])
+        input_table = TableDefinition('a.csv', full_path='/data/in/tables/a.csv', columns=['id', 'name'])
+
+        with mock.patch.object(component, 'get_input_tables_definitions', return_value=[input_table]):
+            table_loads = component._get_table_loads()
+
+        self.assertEqual([['ID', 'name'], ['KEY', 'name']], [table_load.columns for table_load in table_loads])
+        self.assertEqual(['id', 'name'], input_table.columns)
+
+    def test_primary_key_follows_column_mapping(self):
+        component = self._build_component(table_name='A',
+                                          columns=[{"source_name": "id", "destination_name": "KEY"}])
+        input_table = TableDefinition('a.csv', full_path='/data/in/tables/a.csv', columns=['id', 'name'],
+                                      primary_key=['id'])
+
+        with mock.patch.object(component, 'get_input_tables_definitions', return_value=[input_table]):
+            table_load = component._get_table_loads()[0]
+
+        self.assertEqual(['KEY'], table_load.primary_key)
+
+    def test_unknown_mapped_column_fails(self):
+        component = self._build_component(table_name='A',
+                                          columns=[{"source_name": "missing", "destination_name": "ID"}])
+        input_table = TableDefinition('a.csv', full_path='/data/in/tables/a.csv', columns=['id'])
+
+        with mock.patch.object(component, 'get_input_tables_definitions', return_value=[input_table]):
+            with self.assertRaisesRegex(UserException, r"do not exist in the source table: \['missing'\]"):
+                component._get_table_loads()
+
+    def test_unknown_or_clashing_skipped_columns_fail(self):
+        for skip_columns, columns in [(['missing'], []),
+                                      (['note'], [{"source_name": "note", "destination_name": "id"}]),
+                                      (['id', 'note'], []),
+                                      (['note'], [])]:
+            component = self._build_component(table_name='A', skip_columns=skip_columns, columns=columns)
+            input_table = TableDefinition('a.csv', full_path='/data/in/tables/a.csv', columns=['id', 'note'],
+                                          primary_key=['note'])
+
+            with self.subTest(skip_columns=skip_columns), \
+                    mock.patch.object(component, 'get_input_tables_definitions', return_value=[input_table]):
+                with self.assertRaises(UserException):
+                    component._get_table_loads()
+
+    def _load(self, component: Component, failing_table: str):
+        table_loads = [TableLoad(self._input_table(f'{name}.csv'), 'S', name, ['ID']) for name in ('A', 'B', 'C')]
+
+        def load_table(writer, table_load):
+            if table_load.table_name == failing_table:
+                raise WriterUserException('ORA-00942: table or view does not exist', {'detail': 1})
+
+        with mock.patch.object(Component, 'files_out_path', new_callable=mock.PropertyMock, return_value='/tmp'), \
+                mock.patch.object(component, '_create_writer') as create_writer, \
+                mock.patch.object(component, '_load_table', side_effect=load_table):
+            create_writer.return_value.rejected_rows = []
+            statuses = component._load_tables(table_loads)
+        return create_writer, statuses
+
+    def test_fail_fast_skips_remaining_tables(self):
+        component = self._build_component(max_concurrent_tables=1, table_failure_policy='fail_fast')
+
+        create_writer, statuses = self._load(component, failing_table='A')
+
+        self.assertEqual(['failed', 'skipped', 'skipped'], [status.status for status in statuses])
+        self.assertEqual('ORA-00942: table or view does not exist', statuses[0].error)
+        self.assertEqual(1, create_writer.call_count)
+
+    def test_unknown_table_failure_policy_fails(self):
+        component = self._build_component(table_failure_policy='fail-fast')
+
+        with self.assertRaises(UserException):
+            self._load(component, failing_table='A')
+
+    def test_continue_loads_remaining_tables(self):
+        component = self._build_component(max_concurrent_tables=2, table_failure_policy='continue')
+
+        create_writer, statuses = self._load(component, failing_table='B')
+
+        self.assertEqual(['success', 'failed', 'success'], [status.status for status in statuses])
+        self.assertEqual(3, create_writer.return_value.close_connection.call_count)
+
+
+class TestRunMetricsReport(unittest.TestCase):
+    """Covers the run metrics report written by Component._write_run_metrics."""
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write_report(self, **parameters) -> mock.Mock:
+        component = TestMultipleTables._build_component(**parameters)
+        component._metrics = RunMetrics()
+        with component._metrics.phase('load', 'SOME_TABLE', bytes=20) as metric:
+            metric.rows = 2
+        table = TableDefinition('run_metrics.csv', full_path=os.path.join(self._folder, 'run_metrics.csv'))
+        with mock.patch.object(Component, 'files_out_path', new_callable=mock.PropertyMock,
+                               return_value=self._folder), \
+                mock.patch.object(component, 'create_out_table_definition', return_value=table) as create_table, \
+                mock.patch.object(component, 'write_manifest'):
+            component._write_run_metrics('failed', 1.5)
+        return create_table
+
+    def test_report_is_written_to_files(self):
+        create_table = self._write_report()
+
+        with open(os.path.join(self._folder, 'run_metrics.json')) as report_file:
+            report = json.load(report_file)
+        self.assertEqual(('run', 'cfg', 'failed', 1.5), (report['run_id'], report['config_id'], report['status'],
+                                                          report['duration_seconds']))
+        self.assertEqual(2, report['rows_loaded'])
+        self.assertEqual('SOME_TABLE', report['phases'][0]['table_name'])
+        create_table.assert_not_called()
+
+    def test_report_is_appended_to_output_table(self):
+        create_table = self._write_report(metrics_output_table=True)
+
+        self.assertTrue(create_table.call_args.kwargs['incremental'])
+        with open(os.path.join(self._folder, 'run_metrics.csv'), newline='') as table_file:
+            rows = list(csv.reader(table_file))
+        self.assertEqual([['run', 'cfg', 'SOME_TABLE', 'load', '2', '20', 'success']],
+                         [row[:4] + row[6:] for row in rows])
+
+    def test_failed_report_keeps_the_load_error(self):
+        component = TestMultipleTables._build_component()
+        component._metrics = RunMetrics()
+        with mock.patch.multiple(component, _init_loggers=mock.DEFAULT, _init_configuration=mock.DEFAULT,
+                                 _validate_host_names=mock.DEFAULT, _get_table_loads=mock.DEFAULT,
+                                 get_state_file=mock.DEFAULT, write_state_file=mock.DEFAULT,
+                                 _init_writer_client=mock.Mock(side_effect=UserException('ORA-01017')),
+                                 _write_run_metrics=mock.Mock(side_effect=OSError('No space left on device'))):
+            with self.assertRaisesRegex(UserException, 'ORA-01017'):
+                component.run()
+
+
+class TestClientChangeDetection(unittest.TestCase):
+    """Covers the incremental load of the changed rows only in Component._load_table."""
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._input_path = os.path.join(self._folder, 'in.csv')
+        with open(self._input_path, 'w') as input_file:
+            input_file.write('ID,NAME\n1,a\n2,b\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _run(self, previous_files, load_error=None, fingerprint=(2, '2024-01-01T00:00:00'), rejected_rows=(),
+             columns=('ID', 'NAME'), primary_key=('ID',)):
+        component = TestMultipleTables._build_component(
+            loading_options={"load_type": "incremental", "client_change_detection": True})
+        component._metrics = RunMetrics()
+        table_load = TableLoad(TableDefinition('in.csv', full_path=self._input_path, columns=['ID', 'NAME'],
+                                               primary_key=['ID']), 'S', 'T', list(columns),
+                               primary_key=list(primary_key))
+        writer = mock.Mock(rejected_rows=list(rejected_rows))
+        writer.get_table_fingerprint.return_value = fingerprint
+        loaded = []
+        writer.upload_incremental.side_effect = lambda path, **kwargs: loaded.append(open(path).read())
+        if load_error:
+            writer.upload_incremental.side_effect = load_error
+        out_file = FileDefinition(os.path.join(self._folder, 'out', 'change_index_cfg_S_T.bin'))
+        with mock.patch.object(component, 'get_input_files_definitions', return_value=previous_files) as get_files, \
+                mock.patch.object(component, 'create_out_file_definition', return_value=out_file) as create_file, \
+                mock.patch.object(component, 'write_manifest'):
+            try:
+                component._load_table(writer, table_load)
+            finally:
+                get_files.assert_called_once_with(tags=['oracle_writer_change_index'], only_latest_files=True)
+                self.assertEqual(load_error is None, create_file.called)
+        return loaded, out_file.full_path
+
+    def _keep_index(self, index_path: str) -> FileDefinition:
+        previous = FileDefinition(os.path.join(self._folder, 'prev', 'change_index_cfg_S_T.bin'))
+        os.makedirs(os.path.dirname(previous.full_path), exist_ok=True)
+        shutil.move(index_path, previous.full_path)
+        return previous
+
+    def test_unchanged_rows_are_not_loaded(self):
+        loaded, index_path = self._run([])
+        self.assertEqual(['ID,NAME\n1,a\n2,b\n'], loaded)
+        previous = self._keep_index(index_path)
+        with open(self._input_path, 'w') as input_file:
+            input_file.write('ID,NAME\n1,a\n2,c\n')
+
+        loaded, _ = self._run([previous])
+
+        self.assertEqual(['ID,NAME\n2,c\n'], loaded)
+
+    def test_rejected_rows_are_sent_again(self):
+        _, index_path = self._run([], rejected_rows=[RejectedRow(2, ['2', 'b'], 'ORA-01400')])
+
+        loaded, _ = self._run([self._keep_index(index_path)])
+
+        self.assertEqual(['ID,NAME\n2,b\n'], loaded)
+
+    def test_index_of_changed_table_is_not_used(self):
+        _, index_path = self._run([])
+
+        loaded, _ = self._run([self._keep_index(index_path)], fingerprint=(0, '2024-01-02T00:00:00'))
+
+        self.assertEqual(['ID,NAME\n1,a\n2,b\n'], loaded)
+
+    def test_renamed_primary_key_is_compared(self):
+        # the input column ID is mapped to the destination column KEY
+        _, index_path = self._run([], columns=('KEY', 'NAME'), primary_key=('KEY',))
+        with open(self._input_path, 'w') as input_file:
+            input_file.write('ID,NAME\n1,a\n2,c\n')
+
+        loaded, _ = self._run([self._keep_index(index_path)], columns=('KEY', 'NAME'), primary_key=('KEY',))
+
+        # the filtered input gets the mapped column names
+        self.assertEqual(['KEY,NAME\n2,c\n'], loaded)
+
+    def test_failed_load_keeps_previous_index(self):
+        with self.assertRaises(WriterUserException):
+            self._run([], load_error=WriterUserException('failed'))
+
+
+class TestConnectionMode(unittest.TestCase):
+    """Covers the choice of the python-oracledb mode in Component._get_oracle_credentials."""
+
+    @staticmethod
+    def _thick_mode(connection_mode: str = None, sql_loader_needed: bool = None, **loading_options) -> bool:
+        component = Component.__new__(Component)
+        db = {"host_port": "localhost:1521", "database": "ORCL", "user": "u", "#password": "p"}
+        if connection_mode:
+            db['connection_mode'] = connection_mode
+        config = mock.Mock(parameters={"db": db, "loading_options": loading_options})
+        with mock.patch.object(Component, 'configuration', new_callable=mock.PropertyMock, return_value=config):
+            return component._get_oracle_credentials(sql_loader_needed).thick_mode
+
+    def test_thick_mode_is_default(self):
+        self.assertTrue(self._thick_mode(load_type='incremental', incremental_load_mode='query'))
+        self.assertTrue(self._thick_mode(load_type='full_load', sql_loader_needed=False))
+
+    def test_auto_mode_uses_thin_mode_without_sql_loader(self):
+        self.assertTrue(self._thick_mode('auto', load_type='full_load'))
+        self.assertTrue(self._thick_mode('auto', load_type='incremental'))
+        self.assertFalse(self._thick_mode('auto', load_type='incremental', incremental_load_mode='query'))
+        self.assertFalse(self._thick_mode('auto', load_type='incremental', incremental_load_mode='direct_path'))
+        self.assertFalse(self._thick_mode('auto', load_type='full_load', sql_loader_needed=False))
+
+    def test_explicit_mode_is_kept(self):
+        self.assertTrue(self._thick_mode('thick', load_type='incremental', incremental_load_mode='query'))
+        self.assertFalse(self._thick_mode('thin', load_type='full_load'))
+        with self.assertRaises(UserException):
+            self._thick_mode('other')
+
+    def test_import_does_not_load_database_driver(self):
+        src = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'src')
+        result = subprocess.run([sys.executable, '-c', "import sys, component; "
+                                                       "print(sorted({'oracledb', 'dateparser'} & set(sys.modules)))"],
+                                cwd=src, capture_output=True, text=True, check=True)
+        self.assertEqual('[]', result.stdout.strip())
+
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+import mock
+import oracledb
+
+from db_writer.concurrent_loader import ConcurrentQueryLoader, PartialCommitException
+
+
+class FakePool:
+    """Hands out mock connections and remembers them for the assertions."""
+
+    def __init__(self, fail_on_value: int = None):
+        self.connections = []
+        self.released = []
+        self._fail_on_value = fail_on_value
+
+    def acquire(self):
+        connection = mock.Mock()
+        connection.cursor.return_value.executemany.side_effect = self._execute
+        self.connections.append(connection)
+        return connection
+
+    def release(self, connection):
+        self.released.append(connection)
+
+    def _execute(self, query, rows):
+        if any(int(row[0]) == self._fail_on_value for row in rows):
+            raise ValueError('ORA-12899: value too large')
+
+
+def insert_batch(cursor, batch, first_row_number):
+    cursor.executemany('INSERT', batch)
+    return len(batch)
+
+
+class TestConcurrentQueryLoader(unittest.TestCase):
+
+    @staticmethod
+    def _batches(count: int):
+        return ((start + 1, [[str(i)] for i in range(start, start + 10)]) for start in range(0, count * 10, 10))
+
+    def test_all_sessions_commit_at_the_end(self):
+        pool = FakePool()
+        loader = ConcurrentQueryLoader(pool, insert_batch, [None], sessions=3)
+
+        inserted = loader.load(self._batches(20))
+
+        self.assertEqual(200, inserted)
+        self.assertEqual(3, len(pool.released))
+        for connection in pool.connections:
+            connection.commit.assert_called_once()
+            connection.rollback.assert_not_called()
+
+    def test_worker_failure_rolls_back_all_sessions(self):
+        pool = FakePool(fail_on_value=55)
+        loader = ConcurrentQueryLoader(pool, insert_batch, [None], sessions=3)
+
+        with self.assertRaises(ValueError):
+            loader.load(self._batches(20))
+
+        self.assertEqual(3, len(pool.released))
+        for connection in pool.connections:
+            connection.commit.assert_not_called()
+            connection.rollback.assert_called_once()
+
+    def test_reader_failure_rolls_back_all_sessions(self):
+        def failing_batches():
+            yield 1, [['1']]
+            raise UnicodeDecodeError('utf-8', b'', 0, 1, 'invalid start byte')
+
+        pool = FakePool()
+        loader = ConcurrentQueryLoader(pool, insert_batch, [None], sessions=2)
+
+        with self.assertRaises(UnicodeDecodeError):
+            loader.load(failing_batches())
+
+        for connection in pool.connections:
+            connection.rollback.assert_called_once()
+
+    def test_failed_commit_rolls_back_the_remaining_sessions(self):
+        commits = []
+
+        def commit():
+            commits.append(len(commits))
+            if len(commits) > 1:
+                raise oracledb.DatabaseError('ORA-03113: end-of-file on communication channel')
+
+        pool = FakePool()
+        loader = ConcurrentQueryLoader(pool, insert_batch, [None], sessions=3)
+        original_acquire = pool.acquire
+
+        def acquire():
+            connection = original_acquire()
+            connection.commit.side_effect = commit
+            return connection
+
+        pool.acquire = acquire
+
+        with self.assertRaises(PartialCommitException) as context:
+            loader.load(self._batches(20))
+
+        self.assertIn('after 1 of 3 sessions were committed', str(context.exception))
+        committed = [c for c in pool.connections if not c.rollback.called]
+        self.assertEqual(1, len(committed))
+        self.assertEqual(2, len([c for c in pool.connections if c.rollback.called]))
+        self.assertLessEqual(context.exception.rows_committed, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
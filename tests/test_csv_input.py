@@ -0,0 +1,94 @@
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from db_writer.csv_input import CSVInput
+
+
+class TestCSVInput(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self._folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt') as out:
+            out.write(content)
+        return path
+
+    def _read(self, csv_input: CSVInput) -> str:
+        with csv_input.open_text() as stream:
+            return stream.read()
+
+    def test_plain_file_is_read_directly(self):
+        path = self._write('data.csv', 'ID\n1\n')
+        csv_input = CSVInput(path)
+
+        self.assertTrue(csv_input.is_plain_file)
+        self.assertTrue(csv_input.has_header)
+        with csv_input.file_path() as data_path:
+            self.assertEqual(path, data_path)
+
+    def test_gzip_file_is_decompressed(self):
+        csv_input = CSVInput(self._write('data.csv.gz', 'ID\n1\n2\n'))
+
+        self.assertFalse(csv_input.is_plain_file)
+        self.assertEqual('ID\n1\n2\n', self._read(csv_input))
+
+    def test_slices_are_concatenated_in_order(self):
+        self._write('sliced/part_2.gz', '3\n')
+        self._write('sliced/part_1', '1\n2')
+        self._write('sliced/sliced.manifest', '{}')
+        csv_input = CSVInput(os.path.join(self._folder, 'sliced'))
+
+        self.assertFalse(csv_input.has_header)
+        self.assertEqual('1\n2\n3\n', self._read(csv_input))
+
+    def test_only_first_slice_header_is_kept(self):
+        self._write('sliced/part_1', 'ID\n1\n')
+        self._write('sliced/part_2', 'ID\n2\n')
+        csv_input = CSVInput(os.path.join(self._folder, 'sliced'), slice_header=True)
+
+        self.assertTrue(csv_input.has_header)
+        self.assertEqual('ID\n1\n2\n', self._read(csv_input))
+
+    def test_fifo_streams_the_input(self):
+        csv_input = CSVInput(self._write('data.csv.gz', 'ID\n' + '1\n' * 100000))
+
+        with csv_input.file_path() as data_path:
+            with open(data_path, 'r') as pipe:
+                content = pipe.read()
+
+        self.assertEqual(100001, content.count('\n'))
+        self.assertFalse(os.path.exists(data_path))
+
+    def test_fifo_never_opened_does_not_block(self):
+        csv_input = CSVInput(self._write('data.csv.gz', 'ID\n1\n'))
+
+        with csv_input.file_path():
+            pass
+
+        self.assertFalse([t for t in threading.enumerate() if t.name == 'csv-input-fifo'])
+
+    def test_stream_error_is_raised_after_reader(self):
+        path = self._write('data.csv.gz', 'ID\n1\n')
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - 4)
+        csv_input = CSVInput(path)
+
+        with self.assertRaises(EOFError):
+            with csv_input.file_path() as data_path:
+                with open(data_path, 'rb') as pipe:
+                    pipe.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import unittest
+
+from db_writer.metadata_cache import TableMetadataCache
+from db_writer.table_schema import ColumnSchema, TableSchema
+from db_writer.writer import OracleMetadataProvider, TableNotFoundError
+
+
+class FakeConnection:
+
+    def __init__(self, last_ddl_time='2024-01-01T10:00:00', table_exists=True):
+        self.last_ddl_time = last_ddl_time
+        self.table_exists = table_exists
+        self.queries = []
+
+    def perform_query(self, query, bind_parameters=None):
+        self.queries.append(query)
+        if 'ALL_OBJECTS' in query:
+            return iter([('S', self.last_ddl_time)] if self.last_ddl_time else [])
+        if not self.table_exists:
+            return iter([])
+        return iter([('ID', 'NUMBER', 22, 10, 'N', 0), ('NAME', 'VARCHAR2', 100, None, 'Y', None)])
+
+    def column_queries(self) -> int:
+        return len([q for q in self.queries if 'ALL_TAB_COLS' in q])
+
+
+class TestTableMetadataCache(unittest.TestCase):
+
+    def test_repeated_lookups_query_columns_once(self):
+        connection = FakeConnection()
+        provider = OracleMetadataProvider(connection, cache=TableMetadataCache())
+
+        first = provider.get_table_metadata('s', 'orders')
+        second = provider.get_table_metadata('S', 'ORDERS')
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, connection.column_queries())
+        self.assertEqual(['ID', 'NAME'], first.field_names)
+
+    def test_cache_survives_serialization(self):
+        connection = FakeConnection()
+        cache = TableMetadataCache()
+        expected = OracleMetadataProvider(connection, cache=cache).get_table_metadata('S', 'ORDERS')
+
+        restored = TableMetadataCache(json.loads(json.dumps(cache.to_dict())))
+        cached = OracleMetadataProvider(connection, cache=restored).get_table_metadata('S', 'ORDERS')
+
+        self.assertEqual(1, connection.column_queries())
+        self.assertEqual([(c.name, c.source_type_signature, c.precision, c.scale, c.nullable)
+                          for c in expected.columns],
+                         [(c.name, c.source_type_signature, c.precision, c.scale, c.nullable)
+                          for c in cached.columns])
+
+    def test_changed_ddl_time_invalidates_entry(self):
+        connection = FakeConnection()
+        cache = TableMetadataCache()
+        OracleMetadataProvider(connection, cache=cache).get_table_metadata('S', 'ORDERS')
+
+        connection.last_ddl_time = '2024-02-01T10:00:00'
+        restored = TableMetadataCache(cache.to_dict())
+        OracleMetadataProvider(connection, cache=restored).get_table_metadata('S', 'ORDERS')
+
+        self.assertEqual(2, connection.column_queries())
+
+    def test_nullable_flag_is_boolean(self):
+        metadata = OracleMetadataProvider(FakeConnection(), cache=TableMetadataCache()).get_table_metadata('S', 'T')
+
+        self.assertEqual([False, True], [c.nullable for c in metadata.columns])
+        self.assertEqual(['NUMBER(22,10) NOT NULL', 'VARCHAR2(100) NULL'],
+                         [c.source_type_signature for c in metadata.columns])
+
+    def test_entry_of_older_format_is_queried_again(self):
+        connection = FakeConnection()
+        columns = [{'name': 'ID', 'source_type': 'NUMBER', 'nullable': 'N'}]
+        cache = TableMetadataCache({'S.ORDERS': {'last_ddl_time': connection.last_ddl_time, 'columns': columns}})
+
+        metadata = OracleMetadataProvider(connection, cache=cache).get_table_metadata('S', 'ORDERS')
+
+        self.assertEqual(1, connection.column_queries())
+        self.assertIs(False, metadata.columns[0].nullable)
+
+    def test_cached_schema_is_a_copy(self):
+        provider = OracleMetadataProvider(FakeConnection(), cache=TableMetadataCache())
+
+        first = provider.get_table_metadata('S', 'ORDERS')
+        first.add_column(ColumnSchema('EXTRA'))
+        second = provider.get_table_metadata('S', 'ORDERS')
+
+        self.assertIsNot(first, second)
+        self.assertEqual(['ID', 'NAME'], second.field_names)
+
+    def test_view_is_not_cached(self):
+        # views and synonyms are not in ALL_OBJECTS as a TABLE, their columns are always queried
+        connection = FakeConnection(last_ddl_time=None)
+        cache = TableMetadataCache()
+        provider = OracleMetadataProvider(connection, cache=cache)
+
+        provider.get_table_metadata('S', 'ORDERS_VIEW')
+        metadata = provider.get_table_metadata('S', 'ORDERS_VIEW')
+
+        self.assertEqual(['ID', 'NAME'], metadata.field_names)
+        self.assertEqual(2, connection.column_queries())
+        self.assertEqual({}, cache.to_dict())
+
+    def test_missing_table(self):
+        provider = OracleMetadataProvider(FakeConnection(last_ddl_time=None, table_exists=False),
+                                          cache=TableMetadataCache())
+
+        with self.assertRaises(TableNotFoundError):
+            provider.get_table_metadata('S', 'MISSING')
+
+    def test_only_used_entries_are_kept(self):
+        cache = TableMetadataCache({'S.DROPPED': {'last_ddl_time': 'x', 'columns': []}})
+        cache.put('S', 'ORDERS', 'y', TableSchema('ORDERS', [ColumnSchema('ID')]))
+
+        self.assertEqual(['S.ORDERS'], list(cache.to_dict()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from configuration import DefaultFormatOptions
+from db_writer.preflight import PreflightValidator, RowValidator
+from db_writer.table_schema import ColumnSchema
+
+COLUMNS = [ColumnSchema('ID', source_type='NUMBER', precision=5, scale=2),
+           ColumnSchema('NAME', source_type='VARCHAR2', length=5, nullable=True),
+           ColumnSchema('CREATED', source_type='DATE', nullable=True)]
+
+
+class TestRowValidator(unittest.TestCase):
+
+    def setUp(self):
+        self._validator = RowValidator(COLUMNS, DefaultFormatOptions())
+
+    def _errors(self, *rows):
+        return [(violation.row_number, violation.error) for violation in self._validator.validate(list(rows), 1)]
+
+    def test_valid_rows_pass(self):
+        self.assertEqual([], self._errors(['999.994', 'abcde', '2024-01-31'], ['-1', '', ''], ['0', 'ř' * 5, '']))
+
+    def test_not_null_column_requires_value(self):
+        self.assertEqual([(1, "Column ID is NOT NULL, the value is empty.")], self._errors(['', 'a', '']))
+
+    def test_value_longer_than_column(self):
+        self.assertEqual([(2, "Value of column NAME has 6 characters, the column allows at most 5.")],
+                         self._errors(['1', 'a', ''], ['1', 'abcdef', '']))
+
+    def test_number_exceeding_precision_after_rounding(self):
+        errors = self._errors(['1000', '', ''], ['999.995', '', ''], ['1e400', '', ''])
+
+        self.assertEqual([1, 2, 3], [row_number for row_number, _ in errors])
+        self.assertIn("exceeds the precision of NUMBER(5,2)", errors[0][1])
+
+    def test_unparsable_values(self):
+        errors = self._errors(['x', '', ''], ['1', '', '2024-13-01'], ['1', 'a'])
+
+        self.assertEqual([1, 2, 3], [row_number for row_number, _ in errors])
+        self.assertIn("column ID cannot be converted", errors[0][1])
+        self.assertIn("column CREATED cannot be converted", errors[1][1])
+        self.assertEqual("Row has 2 values, 3 columns are expected.", errors[2][1])
+
+    def test_all_violations_of_row_are_listed(self):
+        self.assertEqual([(1, "Column ID is NOT NULL, the value is empty.; "
+                              "Value of column NAME has 6 characters, the column allows at most 5.")],
+                         self._errors(['', 'abcdef', '']))
+
+    def test_time_zone_values_are_left_to_oracle(self):
+        validator = RowValidator([ColumnSchema('TZ', source_type='TIMESTAMP(6) WITH TIME ZONE')],
+                                 DefaultFormatOptions())
+
+        self.assertEqual([], validator.validate([['2024-01-01 10:00:00.000000 Europe/Prague']], 1))
+
+    def test_skipped_columns_are_not_validated(self):
+        validator = RowValidator([COLUMNS[0], None, COLUMNS[1]], DefaultFormatOptions())
+
+        violations = validator.validate([['1', 'not loaded', 'abc'], ['1', 'x', 'abcdef'], ['1', 'abc']], 1)
+
+        self.assertEqual([(2, "Value of column NAME has 6 characters, the column allows at most 5."),
+                          (3, "Row has 2 values, 3 columns are expected.")],
+                         [(violation.row_number, violation.error) for violation in violations])
+        # the reported values are the source rows
+        self.assertEqual(['1', 'x', 'abcdef'], violations[0].values)
+
+
+class TestPreflightValidator(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write(self, rows, name='data.csv') -> str:
+        path = os.path.join(self._folder, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt', newline='') as out:
+            out.write('ID,NAME,CREATED\n' + ''.join(f'{row}\n' for row in rows))
+        return path
+
+    def test_stream_stops_at_max_violations(self):
+        rows = ['1,a,'] * 1500 + [',a,'] * 3 + ['1,a,'] * 1500
+        validator = PreflightValidator(COLUMNS, DefaultFormatOptions(), max_violations=2, workers=1)
+
+        result = validator.validate(self._write(rows, 'data.csv.gz'))
+
+        self.assertEqual([1501, 1502], [violation.row_number for violation in result.violations])
+        self.assertTrue(result.stopped)
+        self.assertEqual(2000, result.rows_checked)
+
+    def test_chunks_report_first_violations_with_row_numbers(self):
+        rows = ['1,a,'] * 3000
+        rows[10] = '1,"a\nb",'
+        for row_number in (2500, 2700, 2900):
+            rows[row_number - 1] = '1,abcdef,'
+        validator = PreflightValidator(COLUMNS, DefaultFormatOptions(), max_violations=2, workers=2,
+                                       chunk_size=4096)
+
+        result = validator.validate(self._write(rows))
+
+        self.assertEqual([2500, 2700], [violation.row_number for violation in result.violations])
+        self.assertEqual(['1', 'abcdef', ''], result.violations[0].values)
+        self.assertTrue(result.stopped)
+
+    def test_chunks_of_valid_input_are_all_checked(self):
+        validator = PreflightValidator(COLUMNS, DefaultFormatOptions(), workers=3, chunk_size=1024)
+
+        result = validator.validate(self._write(['1,"a\nb",'] * 2000))
+
+        self.assertEqual((2000, [], False), (result.rows_checked, result.violations, result.stopped))
+
+
+if __name__ == "__main__":
+    unittest.main()
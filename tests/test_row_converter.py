@@ -0,0 +1,83 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+import oracledb
+
+from configuration import DefaultFormatOptions
+from db_writer.row_converter import RowConverter, ValueConversionError, oracle_to_python_format
+from db_writer.table_schema import ColumnSchema
+
+
+class TestRowConverter(unittest.TestCase):
+    COLUMNS = [ColumnSchema(name='ID', source_type='NUMBER', precision=10, scale=0),
+               ColumnSchema(name='AMOUNT', source_type='NUMBER', precision=10, scale=2),
+               ColumnSchema(name='NAME', source_type='VARCHAR2', length='100'),
+               ColumnSchema(name='CREATED', source_type='DATE'),
+               ColumnSchema(name='UPDATED', source_type='TIMESTAMP(6)')]
+
+    def test_converts_to_native_values(self):
+        converter = RowConverter(self.COLUMNS, DefaultFormatOptions())
+
+        rows = converter.convert_rows([['1', '10.25', 'abc', '2020-01-31', '2020-01-31 10:11:12.123456'],
+                                       ['', '', '', '', '']])
+
+        self.assertEqual([[1, Decimal('10.25'), 'abc', datetime(2020, 1, 31),
+                           datetime(2020, 1, 31, 10, 11, 12, 123456)],
+                          [None, None, '', None, None]], rows)
+
+    def test_input_sizes_follow_metadata(self):
+        converter = RowConverter(self.COLUMNS, DefaultFormatOptions())
+
+        self.assertEqual([oracledb.DB_TYPE_NUMBER, oracledb.DB_TYPE_NUMBER, 100, oracledb.DB_TYPE_DATE,
+                          oracledb.DB_TYPE_TIMESTAMP], converter.input_sizes)
+
+    def test_custom_date_format(self):
+        converter = RowConverter([ColumnSchema(name='D', source_type='DATE')],
+                                 DefaultFormatOptions(date_format='DD.MM.YYYY'))
+
+        self.assertEqual([[datetime(2021, 12, 24)]], converter.convert_rows([['24.12.2021']]))
+
+    def test_unsupported_format_is_left_to_oracle(self):
+        converter = RowConverter([ColumnSchema(name='D', source_type='DATE')],
+                                 DefaultFormatOptions(date_format='DD-MON-RR'))
+
+        self.assertEqual([None], converter.input_sizes)
+        self.assertEqual([['24-DEC-21']], converter.convert_rows([['24-DEC-21']]))
+
+    def test_invalid_value_reports_column(self):
+        converter = RowConverter(self.COLUMNS, DefaultFormatOptions())
+
+        with self.assertRaises(ValueConversionError) as context:
+            converter.convert_rows([['1', 'x', 'abc', '2020-01-31', '']])
+
+        self.assertIn("Value 'x' of column AMOUNT", str(context.exception))
+
+    def test_time_zone_values_are_bound_as_strings(self):
+        columns = [ColumnSchema(name='TZ', source_type='TIMESTAMP(6) WITH TIME ZONE'),
+                   ColumnSchema(name='LTZ', source_type='TIMESTAMP(6) WITH LOCAL TIME ZONE')]
+        converter = RowConverter(columns, DefaultFormatOptions())
+        row = ['2024-01-01 10:00:00.000000 Europe/Prague', '2024-01-01 10:00:00.000000 +01:00']
+
+        self.assertEqual([None, None], converter.input_sizes)
+        self.assertEqual([list(row)], converter.convert_rows([list(row)]))
+
+    def test_iso_values_must_match_format_exactly(self):
+        converter = RowConverter(self.COLUMNS[3:], DefaultFormatOptions())
+
+        for row in (['2020-01-31 10:11:12', ''], ['', '2020-01-31 10:11:12.1234567'],
+                    ['', '2020-01-31 10:11:12.123+01:00']):
+            with self.subTest(row=row), self.assertRaises(ValueConversionError):
+                converter.convert_rows([row])
+        self.assertEqual([[None, datetime(2020, 1, 31, 10, 11, 12, 100000)]],
+                         converter.convert_rows([['', '2020-01-31 10:11:12.1']]))
+
+    def test_oracle_format_translation(self):
+        self.assertEqual('%Y-%m-%d %H:%M:%S.%f', oracle_to_python_format('YYYY-MM-DD HH24:MI:SS.FF6'))
+        self.assertEqual('%Y-%m-%dT%H', oracle_to_python_format('YYYY-MM-DD"T"HH24'))
+        self.assertIsNone(oracle_to_python_format('DD-MON-YYYY'))
+        self.assertIsNone(oracle_to_python_format('YYYY-MM-DD HH24:MI:SS.FF'))
+
+
+if __name__ == "__main__":
+    unittest.main()
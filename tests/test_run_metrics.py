@@ -0,0 +1,56 @@
+import unittest
+
+from db_writer.run_metrics import RunMetrics
+
+
+class TestRunMetrics(unittest.TestCase):
+
+    def test_phase_records_duration_and_counts(self):
+        metrics = RunMetrics()
+
+        with metrics.phase('load', 'SOME_TABLE', bytes=100) as metric:
+            metric.rows = 10
+
+        self.assertEqual([('load', 'SOME_TABLE', 10, 100, 'success')],
+                         [(m.phase, m.table_name, m.rows, m.bytes, m.status) for m in metrics.phases])
+        self.assertGreaterEqual(metrics.phases[0].duration_seconds, 0)
+        self.assertTrue(metrics.phases[0].started_at)
+
+    def test_failed_phase_is_recorded(self):
+        metrics = RunMetrics()
+
+        with self.assertRaises(ValueError):
+            with metrics.phase('merge', 'SOME_TABLE'):
+                raise ValueError('failed')
+
+        self.assertEqual('failed', metrics.phases[0].status)
+
+    def test_recorded_phase_is_added(self):
+        metrics = RunMetrics()
+
+        metrics.record('startup', 0.12345)
+
+        self.assertEqual([('startup', '', 0.123, 'success')],
+                         [(m.phase, m.table_name, m.duration_seconds, m.status) for m in metrics.phases])
+
+    def test_report_sums_phases_and_successful_loads(self):
+        metrics = RunMetrics()
+        for rows in (10, 5):
+            with metrics.phase('load', 'SOME_TABLE', bytes=rows * 10) as metric:
+                metric.rows = rows
+        with self.assertRaises(ValueError):
+            with metrics.phase('load', 'OTHER_TABLE', rows=7):
+                raise ValueError('failed')
+        with metrics.phase('connect'):
+            pass
+
+        report = metrics.to_dict()
+
+        self.assertEqual(4, len(report['phases']))
+        self.assertEqual({'load', 'connect'}, set(report['totals']))
+        self.assertEqual(15, report['rows_loaded'])
+        self.assertEqual(150, report['bytes_loaded'])
+
+
+if __name__ == "__main__":
+    unittest.main()
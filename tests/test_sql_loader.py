@@ -0,0 +1,361 @@
+import csv
+import io
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+import mock
+
+from db_writer.csv_splitter import CSVSplitter
+from db_writer.rejected_rows import RejectedRow, parse_sqlldr_rejected_rows
+from db_writer.sql_loader import (AUTO_MAX_BINDSIZE, SQLLoaderExecutor, SQLLoaderException, SQLLoaderProgress,
+                                  SQLLoaderResult, tune_buffer_sizes)
+
+SAMPLE_LOG = """
+Table "SCHEMA"."TABLE":
+  {loaded} Rows successfully loaded.
+  {rejected} Rows not loaded due to data errors.
+  0 Rows not loaded because all WHEN clauses were failed.
+  0 Rows not loaded because all fields were null.
+"""
+
+
+class TestCSVSplitter(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _write_csv(self, rows) -> str:
+        path = os.path.join(self._folder, 'data.csv')
+        with open(path, 'w', newline='') as out:
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerow(['ID', 'TEXT'])
+            writer.writerows(rows)
+        return path
+
+    def test_chunks_respect_embedded_newlines(self):
+        rows = [[str(i), f'multi\n"line"\nvalue {i}' if i % 3 == 0 else f'plain {i}'] for i in range(500)]
+        path = self._write_csv(rows)
+        # a small read block forces boundaries to be searched across block edges
+        splitter = CSVSplitter(read_block_size=64)
+
+        ranges = splitter.find_chunk_ranges(path, 7)
+
+        self.assertEqual(7, len(ranges))
+        loaded = []
+        for start, end in ranges:
+            chunk = b''.join(splitter.iter_range(path, start, end)).decode('utf-8')
+            loaded.extend(csv.reader(io.StringIO(chunk, newline='')))
+        self.assertEqual(rows, loaded)
+        self.assertEqual([500], [sum(splitter.count_records(path, start, end) for start, end in ranges)])
+
+    def test_header_only_file_has_no_chunks(self):
+        path = self._write_csv([])
+
+        self.assertEqual([], CSVSplitter().find_chunk_ranges(path, 4))
+
+    def test_small_file_returns_fewer_chunks(self):
+        path = self._write_csv([['1', 'a']])
+
+        ranges = CSVSplitter().find_chunk_ranges(path, 4)
+
+        self.assertEqual([(len('ID,TEXT\n'), os.path.getsize(path))], ranges)
+
+
+class TestSQLLoaderParallel(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._data_path = os.path.join(self._folder, 'data.csv')
+        with open(self._data_path, 'w') as out:
+            out.write('ID\n' + ''.join(f'{i}\n' for i in range(100)))
+        self._executor = SQLLoaderExecutor('localhost:1521/xe', 'user', 'pass', log_folder=self._folder)
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def _fake_sqlldr(self, fail_chunk: int = None):
+        self._pipes = []
+
+        def execute(parameters: dict):
+            self._pipes.append(stat.S_ISFIFO(os.stat(parameters['data']).st_mode))
+            rows = Path(parameters['data']).read_text().count('\n')
+            Path(parameters['log']).write_text(SAMPLE_LOG.format(loaded=rows, rejected=0))
+            if parameters['log'].endswith(f'log_{fail_chunk}.log'):
+                raise SQLLoaderException('Failed to execute the SQL*Loader script.', 'chunk log')
+
+        return execute
+
+    def test_parallel_load_merges_counts(self):
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=self._fake_sqlldr()) as sqlldr:
+            result = self._executor.load_data(self._data_path, 'T', [('ID', '')], mode='INSERT',
+                                              parallel_workers=4)
+
+        self.assertEqual(SQLLoaderResult(rows_loaded=100, rows_rejected=0), result)
+        self.assertEqual(4, sqlldr.call_count)
+        self.assertTrue(all(call.args[0]['skip'] == 0 for call in sqlldr.call_args_list))
+        # the chunks are streamed from the input, not copied to files
+        self.assertEqual([True] * 4, self._pipes)
+
+    def test_parallel_load_failure_is_merged(self):
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=self._fake_sqlldr(fail_chunk=1)):
+            with self.assertRaises(SQLLoaderException) as context:
+                self._executor.load_data(self._data_path, 'T', [('ID', '')], parallel_workers=4)
+
+        self.assertIn('1 of 4 parallel SQL*Loader processes failed', context.exception.args[0])
+        self.assertEqual('chunk log', context.exception.args[1])
+
+    def test_parallel_direct_load_skips_index_maintenance(self):
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=self._fake_sqlldr()) as sqlldr:
+            self._executor.load_data(self._data_path, 'T', [('ID', '')], parallel_workers=2, direct=True)
+
+        parameters = sqlldr.call_args_list[0].args[0]
+        self.assertTrue(parameters['parallel'])
+        self.assertTrue(parameters['skip_index_maintenance'])
+
+    def test_parallel_processes_get_the_whole_error_budget(self):
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=self._fake_sqlldr()) as sqlldr:
+            self._executor.load_data(self._data_path, 'T', [('ID', '')], errors=2, parallel_workers=4)
+
+        # rejected rows clustered in one chunk must not fail it, the sum is checked after the load
+        self.assertEqual([2, 2, 2, 2], [call.args[0]['errors'] for call in sqlldr.call_args_list])
+
+    def test_parallel_rejected_rows_are_numbered_in_the_input(self):
+        rejected_values = []
+
+        def execute(parameters: dict):
+            lines = Path(parameters['data']).read_text().splitlines()
+            rejected = 1 if parameters['log'].endswith('log_2.log') else 0
+            Path(parameters['log']).write_text(SAMPLE_LOG.format(loaded=len(lines) - rejected, rejected=rejected)
+                                               + ('Record 3: Rejected - Error on table T.\nORA-01722: invalid number\n'
+                                                  if rejected else ''))
+            if rejected:
+                rejected_values.append(lines[2])
+                Path(parameters['bad']).write_text(lines[2] + '\n')
+
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=execute):
+            result = self._executor.load_data(self._data_path, 'T', [('ID', '')], parallel_workers=4)
+
+        # row 1 holds the value 0
+        self.assertEqual([(int(rejected_values[0]) + 1, rejected_values)],
+                         [(row.row_number, row.values) for row in result.rejected_rows])
+
+    def test_arguments_render_booleans_and_skip_unset(self):
+        args = SQLLoaderExecutor._build_args_from_dict({'direct': True, 'parallel': False, 'streamsize': None,
+                                                        'rows': 10})
+
+        self.assertEqual(['direct=TRUE', 'parallel=FALSE', 'rows=10'], args)
+
+    def test_skipped_records_follow_the_header(self):
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=self._fake_sqlldr()) as sqlldr:
+            self._executor.load_data(self._data_path, 'T', [('ID', '')], mode='APPEND', skip_records=40)
+
+        self.assertEqual(41, sqlldr.call_args.args[0]['skip'])
+
+    def test_failed_load_carries_statistics(self):
+        def execute(parameters: dict):
+            Path(parameters['log']).write_text(SAMPLE_LOG.format(loaded=30, rejected=1))
+            raise SQLLoaderException('Failed to execute the SQL*Loader script.', 'log')
+
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=execute):
+            with self.assertRaises(SQLLoaderException) as context:
+                self._executor.load_data(self._data_path, 'T', [('ID', '')], commit_discontinued=True)
+
+        self.assertEqual(30, context.exception.result.rows_loaded)
+        self.assertEqual(1, context.exception.result.rows_rejected)
+
+    def test_crashed_load_reports_last_commit_point(self):
+        def execute(parameters: dict):
+            # killed before writing the statistics
+            raise SQLLoaderException('Failed to execute the SQL*Loader script.', '', commit_point=65)
+
+        with mock.patch.object(self._executor, '_execute_sqlloader', side_effect=execute):
+            with self.assertRaises(SQLLoaderException) as context:
+                self._executor.load_data(self._data_path, 'T', [('ID', '')], skip_records=40)
+
+        # the record count includes the header and the skipped records
+        self.assertEqual(24, context.exception.result.rows_committed)
+
+    def test_parallel_replace_is_refused(self):
+        with self.assertRaises(SQLLoaderException):
+            self._executor.load_data(self._data_path, 'T', [('ID', '')], mode='REPLACE', parallel_workers=2)
+
+
+class TestSQLLoaderRejectedRows(unittest.TestCase):
+    LOG = """
+Record 3: Rejected - Error on table "S"."T", column "ID".
+ORA-01722: invalid number
+
+Record 5: Rejected - Error on table "S"."T".
+ORA-00001: unique constraint (S.PK_T) violated
+
+Table "S"."T":
+  3 Rows successfully loaded.
+  2 Rows not loaded due to data errors.
+"""
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._bad_path = os.path.join(self._folder, 'bad.log')
+        Path(self._bad_path).write_text('x,"multi\nline"\n1,b\n')
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def test_bad_records_are_paired_with_log_errors(self):
+        rows = parse_sqlldr_rejected_rows(self.LOG, self._bad_path, skipped_records=1)
+
+        self.assertEqual([RejectedRow(2, ['x', 'multi\nline'],
+                                      'Error on table "S"."T", column "ID". ORA-01722: invalid number'),
+                          RejectedRow(4, ['1', 'b'],
+                                      'Error on table "S"."T". ORA-00001: unique constraint (S.PK_T) violated')],
+                         rows)
+
+    def test_warning_exit_code_within_budget(self):
+        log_path = os.path.join(self._folder, 'log.log')
+        Path(log_path).write_text(self.LOG)
+        executor = SQLLoaderExecutor('localhost:1521/xe', 'user', 'pass', log_folder=self._folder)
+
+        self.assertTrue(executor._within_error_budget({'log': log_path, 'errors': 2}))
+        self.assertFalse(executor._within_error_budget({'log': log_path, 'errors': 1}))
+
+
+class TestSQLLoaderStatistics(unittest.TestCase):
+    LOG = """
+Record 2: Rejected - Error on table "S"."T", column "AMOUNT".
+ORA-01722: invalid number
+
+Record 4: Rejected - Error on table "S"."T", column "AMOUNT".
+ORA-01722: invalid number
+
+Record 5: Rejected - Error on table "S"."T".
+ORA-00001: unique constraint (S.PK_T) violated
+
+Table "S"."T":
+  95 Rows successfully loaded.
+  3 Rows not loaded due to data errors.
+  0 Rows not loaded because all WHEN clauses were failed.
+  2 Rows not loaded because all fields were null.
+
+
+Space allocated for bind array:                 255936 bytes(64 rows)
+Read   buffer bytes: 1048576
+
+Total logical records skipped:          1
+Total logical records read:           100
+Total logical records rejected:         3
+Total logical records discarded:        2
+
+Run began on Mon Jan 01 10:00:00 2024
+Run ended on Mon Jan 01 10:01:02 2024
+
+Elapsed time was:     00:01:02.35
+CPU time was:         00:00:01.50
+"""
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._folder, ignore_errors=True)
+
+    def test_log_statistics_are_parsed(self):
+        result = SQLLoaderResult.from_log(self.LOG)
+
+        self.assertEqual(SQLLoaderResult(rows_loaded=95, rows_rejected=3, rows_discarded=2, rows_read=100,
+                                         bind_array_rows=64, bind_array_bytes=255936, elapsed_seconds=62.35,
+                                         cpu_seconds=1.5, column_errors={'AMOUNT': 2}), result)
+        self.assertIn('Rejected rows per column: AMOUNT: 2', result.summary())
+
+    def test_merge_keeps_longest_elapsed_time(self):
+        first = SQLLoaderResult.from_log(self.LOG)
+        second = SQLLoaderResult(rows_loaded=5, elapsed_seconds=3.0, cpu_seconds=0.5, column_errors={'ID': 1})
+
+        merged = SQLLoaderResult.merge([second, first])
+
+        self.assertEqual((100, 62.35, 2.0, 64), (merged.rows_loaded, merged.elapsed_seconds, merged.cpu_seconds,
+                                                 merged.bind_array_rows))
+        self.assertEqual({'AMOUNT': 2, 'ID': 1}, merged.column_errors)
+
+    def test_progress_is_logged_with_rate_and_remaining_time(self):
+        now = [0.0]
+        progress = SQLLoaderProgress('log', expected_records=1000, interval=10, clock=lambda: now[0])
+
+        with self.assertLogs(level='INFO') as logs:
+            now[0] = 5
+            progress.feed('Commit point reached - logical record count 100\n')
+            now[0] = 10
+            progress.feed('Commit point reached - logical record count 200\n')
+            progress.feed('some other output\n')
+
+        self.assertEqual(['INFO:root:SQL*Loader log: 200 records processed, 20 rows/s, estimated 40 s remaining'],
+                         logs.output)
+        self.assertEqual(200, progress.records)
+
+    def _run_script(self, script: str) -> SQLLoaderExecutor:
+        path = os.path.join(self._folder, 'sqlldr')
+        Path(path).write_text('#!/bin/sh\n' + script)
+        os.chmod(path, 0o755)
+        executor = SQLLoaderExecutor('localhost:1521/xe', 'user', 'pass', log_folder=self._folder,
+                                     sql_loader_path=path)
+        log_path = os.path.join(self._folder, 'log.log')
+        Path(log_path).write_text(self.LOG)
+        executor._execute_sqlloader({'data': os.path.join(self._folder, 'missing.csv'), 'log': log_path,
+                                     'bad': os.path.join(self._folder, 'bad.log'), 'errors': 10})
+        return executor
+
+    def test_output_is_streamed_from_the_process(self):
+        with mock.patch.object(SQLLoaderProgress, 'feed') as feed:
+            self._run_script('echo "Commit point reached - logical record count 64"\necho done\n')
+
+        self.assertEqual(['Commit point reached - logical record count 64\n', 'done\n'],
+                         [c.args[0] for c in feed.call_args_list])
+
+    def test_failure_message_contains_statistics(self):
+        with self.assertRaises(SQLLoaderException) as context:
+            self._run_script('echo "SQL*Loader-951: Error calling once/load initialization" >&2\nexit 1\n')
+
+        self.assertIn('95 rows loaded, 3 rejected, 2 discarded', context.exception.args[0])
+        self.assertIn('SQL*Loader-951', context.exception.args[0])
+        self.assertEqual(self.LOG, context.exception.args[1])
+
+
+class TestBufferAutoTuning(unittest.TestCase):
+
+    def test_wide_rows_fit_the_bind_array(self):
+        # 20 VARCHAR2(4000) columns do not fit 5000 rows into the default 8 MB bind array
+        tuned = tune_buffer_sizes([4000] * 20, data_size=10 ** 9)
+
+        self.assertEqual(AUTO_MAX_BINDSIZE // (4004 * 20), tuned['rows'])
+        self.assertEqual(tuned['rows'] * 4004 * 20, tuned['bindsize'])
+        self.assertLessEqual(tuned['bindsize'], AUTO_MAX_BINDSIZE)
+        self.assertGreaterEqual(tuned['readsize'], tuned['bindsize'])
+
+    def test_narrow_rows_are_capped(self):
+        tuned = tune_buffer_sizes([10, 22], data_size=10 ** 9)
+
+        self.assertEqual(50000, tuned['rows'])
+
+    def test_small_file_limits_buffers(self):
+        tuned = tune_buffer_sizes([100] * 4, data_size=4000)
+
+        self.assertEqual(1000, tuned['rows'])
+        self.assertEqual(416000, tuned['bindsize'])
+        self.assertEqual(tuned['bindsize'], tuned['readsize'])
+
+    def test_direct_path_sizes_column_array(self):
+        tuned = tune_buffer_sizes([4000] * 20, data_size=None, direct=True)
+
+        self.assertNotIn('rows', tuned)
+        self.assertNotIn('bindsize', tuned)
+        self.assertGreaterEqual(tuned['streamsize'], tuned['columnarrayrows'] * 4004 * 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+
+from db_writer.table_swap import ShadowTableSwap, SwapPlan, TableSwapError
+
+
+class FakeConnection:
+    """Answers the dictionary queries by a matching fragment and records all statements."""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.statements = []
+
+    def perform_query(self, query, bind_parameters=None):
+        self.statements.append(query)
+        for fragment, response in self.responses.items():
+            if fragment in query:
+                if isinstance(response, Exception):
+                    raise response
+                return iter(response)
+        return iter([])
+
+    def executed(self, prefix: str) -> list:
+        return [s for s in self.statements if s.startswith(prefix)]
+
+
+class TestShadowTableSwap(unittest.TestCase):
+    TABLE_DDL = ('CREATE TABLE "S"."ORDERS" ("ID" NUMBER NOT NULL ENABLE, "NAME" VARCHAR2(10) DEFAULT \'x\');\n'
+                 'ALTER TABLE "S"."ORDERS" ADD CONSTRAINT "PK_ORDERS" PRIMARY KEY ("ID") USING INDEX ENABLE;\n')
+    INDEX_DDL = ('CREATE UNIQUE INDEX "S"."PK_ORDERS" ON "S"."ORDERS" ("ID");\n'
+                 'CREATE INDEX "S"."IX_NAME" ON "S"."ORDERS" ("NAME");\n')
+    GRANT_DDL = 'GRANT SELECT ON "S"."ORDERS" TO "READER";\n'
+    COMMENT_DDL = 'COMMENT ON COLUMN "S"."ORDERS"."ID" IS \'Order\';\n'
+
+    def _rename_responses(self) -> dict:
+        return {
+            'ALL_TAB_PARTITIONS': [],
+            'FROM ALL_CONSTRAINTS c': [],
+            'ALL_TRIGGERS': [],
+            'FROM ALL_CONSTRAINTS WHERE': [('PK_ORDERS', 'P', 'USER NAME', 'PK_ORDERS'),
+                                           ('SYS_C001', 'C', 'GENERATED NAME', None)],
+            'ALL_INDEXES': [('PK_ORDERS',), ('IX_NAME',)],
+            "DBMS_METADATA.GET_DDL(": [(self.TABLE_DDL,)],
+        }
+
+    def test_rename_swap_rebuilds_structure_and_restores_names(self):
+        connection = FakeConnection(self._rename_responses())
+        ddl_by_type = {'INDEX': self.INDEX_DDL, 'OBJECT_GRANT': self.GRANT_DDL, 'COMMENT': self.COMMENT_DDL}
+        original_query = connection.perform_query
+
+        def perform_query(query, bind_parameters=None):
+            if 'GET_DEPENDENT_DDL' in query:
+                connection.statements.append(query)
+                return iter([(ddl_by_type[bind_parameters['object_type']],)])
+            return original_query(query, bind_parameters)
+
+        connection.perform_query = perform_query
+        table_swap = ShadowTableSwap(connection)
+
+        plan = table_swap.prepare('s', 'orders')
+
+        self.assertFalse(plan.exchange)
+        self.assertEqual(['CREATE TABLE "S"."KBC_SHADOW_ORDERS" ("ID" NUMBER NOT NULL ENABLE, '
+                          '"NAME" VARCHAR2(10) DEFAULT \'x\')'], plan.create_statements)
+        self.assertEqual(['CREATE INDEX "S"."KBC_SI0_ORDERS" ON "S"."KBC_SHADOW_ORDERS" ("NAME")',
+                          'ALTER TABLE "S"."KBC_SHADOW_ORDERS" ADD CONSTRAINT "KBC_SC0_ORDERS" PRIMARY KEY ("ID") '
+                          'USING INDEX ENABLE',
+                          'COMMENT ON COLUMN "S"."KBC_SHADOW_ORDERS"."ID" IS \'Order\'',
+                          'GRANT SELECT ON "S"."KBC_SHADOW_ORDERS" TO "READER"'], plan.post_load_statements)
+        self.assertEqual(plan.create_statements, connection.executed('CREATE TABLE'))
+
+        # the renamed shadow table has the temporary names
+        connection.responses['SELECT CONSTRAINT_NAME FROM ALL_CONSTRAINTS'] = [('KBC_SC0_ORDERS',)]
+        connection.responses['ALL_INDEXES'] = [('KBC_SC0_ORDERS',), ('KBC_SI0_ORDERS',)]
+        connection.statements.clear()
+        table_swap.finish(plan)
+
+        self.assertEqual(['ALTER TABLE "S"."ORDERS" RENAME TO "KBC_OLD_ORDERS"',
+                          'ALTER TABLE "S"."KBC_SHADOW_ORDERS" RENAME TO "ORDERS"',
+                          'ALTER TABLE "S"."ORDERS" RENAME CONSTRAINT "KBC_SC0_ORDERS" TO "PK_ORDERS"'],
+                         [s for s in connection.executed('ALTER TABLE') if ' RENAME ' in s])
+        # comments and grants are copied to the shadow table before the swap
+        self.assertEqual(plan.post_load_statements, connection.statements[:4])
+        self.assertTrue(plan.swapped)
+        self.assertIn('DROP TABLE "S"."KBC_OLD_ORDERS" PURGE', connection.statements)
+        self.assertEqual(['ALTER INDEX "S"."KBC_SC0_ORDERS" RENAME TO "PK_ORDERS"',
+                          'ALTER INDEX "S"."KBC_SI0_ORDERS" RENAME TO "IX_NAME"'],
+                         connection.executed('ALTER INDEX'))
+
+    def test_single_partition_table_is_exchanged(self):
+        connection = FakeConnection({'ALL_TAB_PARTITIONS': [('P_ALL',)]})
+        table_swap = ShadowTableSwap(connection)
+
+        plan = table_swap.prepare('S', 'ORDERS')
+        table_swap.finish(plan)
+
+        self.assertTrue(plan.exchange)
+        self.assertEqual(['CREATE TABLE "S"."KBC_SHADOW_ORDERS" FOR EXCHANGE WITH TABLE "S"."ORDERS"'],
+                         connection.executed('CREATE TABLE'))
+        self.assertEqual(['ALTER TABLE "S"."ORDERS" EXCHANGE PARTITION "P_ALL" WITH TABLE "S"."KBC_SHADOW_ORDERS" '
+                          'EXCLUDING INDEXES UPDATE GLOBAL INDEXES'], connection.executed('ALTER TABLE'))
+        self.assertEqual(['DROP TABLE "S"."KBC_SHADOW_ORDERS" PURGE'], connection.executed('DROP TABLE'))
+
+    def test_partition_with_primary_key_is_swapped_by_renaming(self):
+        responses = self._rename_responses()
+        responses['ALL_TAB_PARTITIONS'] = [('P_ALL',)]
+        responses['SELECT CONSTRAINT_NAME FROM ALL_CONSTRAINTS'] = [('PK_ORDERS',)]
+        connection = FakeConnection(responses)
+        table_swap = ShadowTableSwap(connection)
+
+        plan = table_swap.prepare('S', 'ORDERS')
+
+        self.assertFalse(plan.exchange)
+        self.assertFalse(any('FOR EXCHANGE' in s for s in connection.statements))
+
+    def test_abort_after_swap_completes_it(self):
+        connection = FakeConnection({'FROM ALL_TABLES': [(1,)],
+                                     'SELECT CONSTRAINT_NAME FROM ALL_CONSTRAINTS': [('KBC_SC0_ORDERS',)],
+                                     'ALL_INDEXES': [('KBC_SC0_ORDERS',)]})
+        plan = SwapPlan('S', 'ORDERS', 'KBC_SHADOW_ORDERS', constraint_names={'KBC_SC0_ORDERS': 'PK_ORDERS'},
+                        index_names={'KBC_SC0_ORDERS': 'PK_ORDERS'}, swapped=True)
+
+        ShadowTableSwap(connection).abort(plan)
+
+        self.assertEqual(['DROP TABLE "S"."KBC_OLD_ORDERS" PURGE', 'DROP TABLE "S"."KBC_SHADOW_ORDERS" PURGE'],
+                         connection.executed('DROP TABLE'))
+        self.assertEqual(['ALTER TABLE "S"."ORDERS" RENAME CONSTRAINT "KBC_SC0_ORDERS" TO "PK_ORDERS"'],
+                         connection.executed('ALTER TABLE'))
+        self.assertEqual(['ALTER INDEX "S"."KBC_SC0_ORDERS" RENAME TO "PK_ORDERS"'], connection.executed('ALTER INDEX'))
+
+    def test_abort_restores_renamed_target(self):
+        connection = FakeConnection({})
+        original_query = connection.perform_query
+
+        def perform_query(query, bind_parameters=None):
+            if 'FROM ALL_TABLES' in query:
+                connection.statements.append(query)
+                return iter([(1,)] if bind_parameters['table_name'] == 'KBC_OLD_ORDERS' else [])
+            return original_query(query, bind_parameters)
+
+        connection.perform_query = perform_query
+
+        ShadowTableSwap(connection).abort(SwapPlan('S', 'ORDERS', 'KBC_SHADOW_ORDERS'))
+
+        self.assertEqual(['ALTER TABLE "S"."KBC_OLD_ORDERS" RENAME TO "ORDERS"'], connection.executed('ALTER TABLE'))
+        self.assertEqual([], connection.executed('DROP TABLE'))
+
+    def test_referenced_table_is_refused(self):
+        responses = self._rename_responses()
+        responses['FROM ALL_CONSTRAINTS c'] = [('S.ITEMS.FK_ORDER',)]
+        table_swap = ShadowTableSwap(FakeConnection(responses))
+
+        with self.assertRaises(TableSwapError) as context:
+            table_swap.prepare('S', 'ORDERS')
+
+        self.assertIn('S.ITEMS.FK_ORDER', str(context.exception))
+
+    def test_failed_rename_restores_original_table(self):
+        connection = FakeConnection({'"KBC_SHADOW_ORDERS" RENAME TO': Exception('ORA-00054')})
+        table_swap = ShadowTableSwap(connection)
+
+        with self.assertRaises(Exception):
+            table_swap.finish(SwapPlan('S', 'ORDERS', 'KBC_SHADOW_ORDERS'))
+
+        self.assertEqual(['ALTER TABLE "S"."ORDERS" RENAME TO "KBC_OLD_ORDERS"',
+                          'ALTER TABLE "S"."KBC_SHADOW_ORDERS" RENAME TO "ORDERS"',
+                          'ALTER TABLE "S"."KBC_OLD_ORDERS" RENAME TO "ORDERS"'],
+                         connection.executed('ALTER TABLE'))
+
+    def test_long_names_are_shortened(self):
+        name = ShadowTableSwap._short_name('KBC_SHADOW_', 'S', 'A' * 40)
+
+        self.assertTrue(name.startswith('KBC_SHADOW_'))
+        self.assertLessEqual(len(name), 30)
+
+    def test_split_statements(self):
+        self.assertEqual(['CREATE TABLE "S"."T" ("A" VARCHAR2(1) DEFAULT \';\')', 'GRANT SELECT ON "S"."T" TO "X"'],
+                         ShadowTableSwap.split_statements('CREATE TABLE "S"."T" ("A" VARCHAR2(1) DEFAULT \';\');\n'
+                                                          '  GRANT SELECT ON "S"."T" TO "X";'))
+
+
+if __name__ == "__main__":
+    unittest.main()
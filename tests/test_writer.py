@@ -1,14 +1,24 @@
+import gzip
 import logging
+import os
 import shutil
 import tempfile
 import unittest
+from decimal import Decimal
+from pathlib import Path
 
 import mock
 import oracledb
 
-from configuration import DefaultFormatOptions, SQLLoaderOptions
-from db_writer.table_schema import ColumnSchema
-from db_writer.writer import OracleCredentials, OracleWriter, WriterUserException
+from configuration import DefaultFormatOptions, MergeOptions, PreflightOptions, QueryLoadOptions, SQLLoaderOptions
+from db_writer.arrow_input import ArrowInput
+from db_writer.checkpoint import CheckpointStore, file_fingerprint
+from db_writer.rejected_rows import RejectedRow, RejectedRowsCollector, RejectedRowsLimitExceeded
+from db_writer.sql_loader import FILLER_FIELD, SQLLoaderException, SQLLoaderResult
+from db_writer.row_converter import RowConverter, RowProjection
+from db_writer.table_schema import ColumnSchema, IndexSchema, TableSchema
+from db_writer.table_swap import SwapPlan
+from db_writer.writer import OracleConnection, OracleCredentials, OracleWriter, WriterUserException
 
 
 class FakeOracleError:
@@ -19,6 +29,32 @@ class FakeOracleError:
         self.full_code = full_code
 
 
+class TestClientInitialization(unittest.TestCase):
+    """Covers the loading of the Instant Client libraries in OracleConnection."""
+
+    @staticmethod
+    def _connection(thick_mode: bool) -> OracleConnection:
+        return OracleConnection('user', 'pass', 'localhost', 1521, 'xe', insta_client_path='/tmp/instantclient',
+                                thick_mode=thick_mode)
+
+    def test_thin_mode_loads_no_client_libraries(self):
+        with mock.patch('oracledb.init_oracle_client') as init_client, \
+                mock.patch('oracledb.connect') as connect:
+            self._connection(thick_mode=False).connect()
+
+        init_client.assert_not_called()
+        connect.assert_called_once()
+
+    def test_thick_mode_loads_client_libraries_once(self):
+        with mock.patch('oracledb.init_oracle_client') as init_client, \
+                mock.patch('oracledb.is_thin_mode', side_effect=[True, False]):
+            connection = self._connection(thick_mode=True)
+            connection.init_client()
+            connection.init_client()
+
+        init_client.assert_called_once_with(lib_dir='/tmp/instantclient')
+
+
 class TestQueryLoadErrorHandling(unittest.TestCase):
     """Covers the 'query' (INSERT) load method error handling in OracleWriter._load_data_into_table."""
 
@@ -85,6 +121,16 @@ class TestQueryLoadErrorHandling(unittest.TestCase):
 
         self.assertIs(original, context.exception)
 
+    def test_unknown_commit_policy_fails(self):
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        with self.assertRaises(WriterUserException):
+            OracleWriter(credentials,
+                         log_folder=self._log_folder,
+                         sql_loader_options=SQLLoaderOptions(),
+                         default_format=DefaultFormatOptions(),
+                         query_load_options=QueryLoadOptions(commit_policy='never'))
+
     def test_successful_query_load_is_untouched(self):
         """The happy path must not be affected by the error handling."""
         writer = self._build_writer()
@@ -93,7 +139,1126 @@ class TestQueryLoadErrorHandling(unittest.TestCase):
             writer._load_data_into_table('/dev/null', 'SOME_SCHEMA', 'SOME_TABLE', ['ID'],
                                          self.DESTINATION_SCHEMA, method='query')
 
-        insert_records_query.assert_called_once_with('/dev/null', 'SOME_SCHEMA', 'SOME_TABLE', ['ID'])
+        insert_records_query.assert_called_once_with('/dev/null', 'SOME_SCHEMA', 'SOME_TABLE', ['ID'],
+                                                     self.DESTINATION_SCHEMA, direct_path=False,
+                                                     single_session=False, checkpoint=None, projection=None)
+
+
+class FakeBatchError:
+    """Stand-in for the error objects returned by cursor.getbatcherrors()."""
+
+    def __init__(self, offset: int, message: str):
+        self.offset = offset
+        self.message = message
+
+
+class TestRejectedRowsCollection(unittest.TestCase):
+    """Covers the row level error collection in OracleWriter._insert_batch."""
+
+    CONVERTER = RowConverter([ColumnSchema(name='ID', source_type='NUMBER', precision=10, scale=0)],
+                             DefaultFormatOptions())
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self, max_rejected_rows: int) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        return OracleWriter(credentials,
+                            log_folder=self._log_folder,
+                            sql_loader_options=SQLLoaderOptions(),
+                            default_format=DefaultFormatOptions(),
+                            max_rejected_rows=max_rejected_rows)
+
+    def test_conversion_and_batch_errors_are_collected(self):
+        writer = self._build_writer(max_rejected_rows=5)
+        cursor = mock.Mock()
+        cursor.getbatcherrors.return_value = [FakeBatchError(1, 'ORA-00001: unique constraint violated')]
+
+        inserted = writer._insert_batch(cursor, 'INSERT', self.CONVERTER, [['1'], ['x'], ['1'], ['2']],
+                                        first_row_number=11)
+
+        cursor.executemany.assert_called_once_with('INSERT', [[1], [1], [2]], batcherrors=True)
+        # the rejected rows are not counted as loaded
+        self.assertEqual(2, inserted)
+        self.assertEqual([RejectedRow(12, ['x'], "Value 'x' of column ID cannot be converted to the "
+                                                 "destination type NUMBER."),
+                          RejectedRow(13, ['1'], 'ORA-00001: unique constraint violated')],
+                         writer.rejected_rows)
+
+    def test_exceeding_the_budget_fails(self):
+        writer = self._build_writer(max_rejected_rows=1)
+        cursor = mock.Mock()
+        cursor.getbatcherrors.return_value = [FakeBatchError(0, 'ORA-01400'), FakeBatchError(1, 'ORA-01400')]
+
+        with self.assertRaises(RejectedRowsLimitExceeded):
+            writer._insert_batch(cursor, 'INSERT', self.CONVERTER, [['1'], ['2']], first_row_number=1)
+
+    def test_no_budget_keeps_plain_executemany(self):
+        writer = self._build_writer(max_rejected_rows=0)
+        cursor = mock.Mock()
+
+        writer._insert_batch(cursor, 'INSERT', self.CONVERTER, [['1']], first_row_number=1)
+
+        cursor.executemany.assert_called_once_with('INSERT', [[1]])
+
+
+class TestDirectPathFullLoad(unittest.TestCase):
+    """Covers the index handling around direct path full loads in OracleWriter.upload_full."""
+
+    TABLE_METADATA = TableSchema('SOME_TABLE', [ColumnSchema(name='ID', source_type='NUMBER')])
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self, **sql_loader_options) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(**sql_loader_options),
+                              default_format=DefaultFormatOptions())
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        return writer
+
+    def test_direct_load_disables_and_rebuilds_non_unique_indexes(self):
+        writer = self._build_writer(direct=True, index_rebuild_parallel_degree=8)
+        writer._metadata_provider.get_table_indexes.side_effect = [
+            [IndexSchema('S', 'PK_IDX', unique=True, status='VALID'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='VALID')],
+            [IndexSchema('S', 'PK_IDX', unique=True, status='VALID'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='UNUSABLE')],
+            [IndexSchema('S', 'PK_IDX', unique=True, status='VALID'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='VALID')]
+        ]
+
+        with mock.patch.object(writer, 'execute_script') as execute_script, \
+                mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+        load_data_into_table.assert_called_once()
+        self.assertEqual([mock.call('ALTER INDEX "S"."NU_IDX" UNUSABLE'),
+                          mock.call('ALTER INDEX "S"."NU_IDX" REBUILD PARALLEL 8'),
+                          mock.call('ALTER INDEX "S"."NU_IDX" NOPARALLEL')],
+                         execute_script.call_args_list)
+
+    def test_direct_load_keeps_previously_unusable_indexes(self):
+        writer = self._build_writer(direct=True, index_rebuild_parallel_degree=8)
+        writer._metadata_provider.get_table_indexes.side_effect = [
+            [IndexSchema('S', 'OFF_IDX', unique=False, status='UNUSABLE'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='VALID')],
+            [IndexSchema('S', 'OFF_IDX', unique=False, status='UNUSABLE'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='UNUSABLE')],
+            [IndexSchema('S', 'OFF_IDX', unique=False, status='UNUSABLE'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='VALID')]
+        ]
+
+        with mock.patch.object(writer, 'execute_script') as execute_script, \
+                mock.patch.object(writer, '_load_data_into_table'):
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertEqual([mock.call('ALTER INDEX "S"."NU_IDX" UNUSABLE'),
+                          mock.call('ALTER INDEX "S"."NU_IDX" REBUILD PARALLEL 8'),
+                          mock.call('ALTER INDEX "S"."NU_IDX" NOPARALLEL')],
+                         execute_script.call_args_list)
+
+    def test_failed_load_rebuilds_only_the_marked_indexes(self):
+        writer = self._build_writer(direct=True, index_rebuild_parallel_degree=8)
+        writer._metadata_provider.get_table_indexes.side_effect = [
+            [IndexSchema('S', 'OFF_IDX', unique=False, status='UNUSABLE'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='VALID')],
+            [IndexSchema('S', 'OFF_IDX', unique=False, status='UNUSABLE'),
+             IndexSchema('S', 'NU_IDX', unique=False, status='UNUSABLE')]
+        ]
+
+        with mock.patch.object(writer, 'execute_script') as execute_script, \
+                mock.patch.object(writer, '_load_data_into_table', side_effect=WriterUserException('load failed')):
+            with self.assertRaisesRegex(WriterUserException, 'load failed'):
+                writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertNotIn('OFF_IDX', ' '.join(c.args[0] for c in execute_script.call_args_list))
+
+    def test_rebuild_restores_index_degree(self):
+        writer = self._build_writer(direct=True, index_rebuild_parallel_degree=8)
+        writer._metadata_provider.get_table_indexes.return_value = [
+            IndexSchema('S', 'A_IDX', status='UNUSABLE', degree='4'),
+            IndexSchema('S', 'B_IDX', status='UNUSABLE', degree='DEFAULT'),
+            IndexSchema('S', 'C_IDX', status='UNUSABLE', degree='1')
+        ]
+
+        with mock.patch.object(writer, 'execute_script') as execute_script:
+            writer._rebuild_unusable_indexes('S', 'SOME_TABLE')
+
+        self.assertEqual(['ALTER INDEX "S"."A_IDX" PARALLEL 4', 'ALTER INDEX "S"."B_IDX" PARALLEL',
+                          'ALTER INDEX "S"."C_IDX" NOPARALLEL'],
+                         [c.args[0] for c in execute_script.call_args_list[3:]])
+
+    def test_failed_rebuild_keeps_load_error(self):
+        writer = self._build_writer(direct=True)
+        writer._metadata_provider.get_table_indexes.return_value = []
+
+        with mock.patch.object(writer, '_load_data_into_table', side_effect=WriterUserException('load failed')), \
+                mock.patch.object(writer, '_rebuild_unusable_indexes', side_effect=WriterUserException('ORA-00054')):
+            with self.assertRaisesRegex(WriterUserException, 'load failed'):
+                writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+    def test_direct_load_skips_only_the_disabled_indexes(self):
+        writer = self._build_writer(direct=True)
+        writer._metadata_provider.get_table_indexes.return_value = []
+
+        with mock.patch.object(writer, 'execute_script'), \
+                mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertTrue(load_data_into_table.call_args.kwargs['skip_unusable_indexes'])
+
+    def test_direct_load_fails_on_unusable_index(self):
+        writer = self._build_writer(direct=True)
+        unusable = [IndexSchema('S', 'PK_IDX', unique=True, status='UNUSABLE')]
+        writer._metadata_provider.get_table_indexes.side_effect = [[], unusable, unusable]
+
+        with mock.patch.object(writer, 'execute_script'), mock.patch.object(writer, '_load_data_into_table'):
+            with self.assertRaises(WriterUserException) as context:
+                writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertIn('S.PK_IDX', str(context.exception))
+
+    def test_conventional_load_does_not_touch_indexes(self):
+        writer = self._build_writer()
+
+        with mock.patch.object(writer, '_load_data_into_table'):
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'])
+
+        writer._metadata_provider.get_table_indexes.assert_not_called()
+
+    def test_truncate_mode_truncates_and_inserts(self):
+        writer = self._build_writer()
+        writer._connection = mock.Mock()
+        writer._connection.escape = OracleConnection.escape
+        writer._connection.perform_query.return_value = []
+
+        with mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], full_load_mode='truncate',
+                               truncate_storage='reuse')
+
+        writer._connection.perform_query.assert_called_once_with('TRUNCATE TABLE "S"."SOME_TABLE" REUSE STORAGE')
+        self.assertEqual('INSERT', load_data_into_table.call_args.kwargs['mode'])
+
+    def test_delete_mode_replaces(self):
+        writer = self._build_writer()
+        writer._connection = mock.Mock()
+
+        with mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], full_load_mode='delete')
+
+        writer._connection.perform_query.assert_not_called()
+        self.assertEqual('REPLACE', load_data_into_table.call_args.kwargs['mode'])
+
+    def test_shadow_swap_loads_shadow_table_and_swaps(self):
+        writer = self._build_writer()
+        plan = SwapPlan('S', 'SOME_TABLE', 'KBC_SHADOW_SOME_TABLE')
+
+        with mock.patch('db_writer.writer.ShadowTableSwap') as swap_class, \
+                mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            swap_class.return_value.prepare.return_value = plan
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], full_load_mode='shadow_swap')
+
+        load_data_into_table.assert_called_once_with('/dev/null', 'S', 'KBC_SHADOW_SOME_TABLE', ['ID'],
+                                                     self.TABLE_METADATA.columns, method='sqlldr', mode='INSERT',
+                                                     direct_path=True, skip_columns=None)
+        swap_class.return_value.finish.assert_called_once_with(plan)
+        swap_class.return_value.abort.assert_not_called()
+
+    def test_shadow_swap_failed_load_keeps_target(self):
+        writer = self._build_writer()
+        plan = SwapPlan('S', 'SOME_TABLE', 'KBC_SHADOW_SOME_TABLE')
+
+        with mock.patch('db_writer.writer.ShadowTableSwap') as swap_class, \
+                mock.patch.object(writer, '_load_data_into_table', side_effect=WriterUserException('failed')):
+            swap_class.return_value.prepare.return_value = plan
+            with self.assertRaises(WriterUserException):
+                writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], full_load_mode='shadow_swap')
+
+        swap_class.return_value.finish.assert_not_called()
+        swap_class.return_value.abort.assert_called_once_with(plan)
+
+    def test_shadow_swap_failed_abort_keeps_load_error(self):
+        writer = self._build_writer()
+
+        with mock.patch('db_writer.writer.ShadowTableSwap') as swap_class, \
+                mock.patch.object(writer, '_load_data_into_table', side_effect=WriterUserException('failed')):
+            swap_class.return_value.prepare.return_value = SwapPlan('S', 'SOME_TABLE', 'KBC_SHADOW_SOME_TABLE')
+            swap_class.return_value.abort.side_effect = Exception('ORA-00054')
+            with self.assertRaisesRegex(WriterUserException, 'failed'):
+                writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], full_load_mode='shadow_swap')
+
+    def test_leftover_procedure_does_not_replace_truncate(self):
+        writer = self._build_writer()
+        writer._connection = mock.Mock(escape=OracleConnection.escape)
+        writer._connection.perform_query.return_value = []
+
+        with mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], pre_procedure='EMPTY_TABLE',
+                               full_load_mode='truncate')
+
+        writer._connection.run_procedure.assert_not_called()
+        self.assertEqual('TRUNCATE TABLE "S"."SOME_TABLE" DROP STORAGE',
+                         writer._connection.perform_query.call_args.args[0])
+        self.assertEqual('INSERT', load_data_into_table.call_args.kwargs['mode'])
+
+    def test_defined_procedure_runs_the_procedure(self):
+        writer = self._build_writer()
+        writer._connection = mock.Mock(escape=OracleConnection.escape)
+
+        with mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], pre_procedure='EMPTY_TABLE',
+                               pre_procedure_parameters=['S'], full_load_mode='defined_procedure')
+
+        writer._connection.run_procedure.assert_called_once_with('EMPTY_TABLE', ['S'])
+        self.assertEqual('INSERT', load_data_into_table.call_args.kwargs['mode'])
+
+    def test_defined_procedure_without_procedure_fails(self):
+        writer = self._build_writer()
+        writer._connection = mock.Mock(escape=OracleConnection.escape)
+
+        with mock.patch.object(writer, '_load_data_into_table') as load_data_into_table, \
+                self.assertRaisesRegex(WriterUserException, 'defined_procedure'):
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], full_load_mode='defined_procedure')
+
+        load_data_into_table.assert_not_called()
+
+    def test_shadow_swap_ignores_leftover_procedure(self):
+        writer = self._build_writer()
+
+        with mock.patch('db_writer.writer.ShadowTableSwap') as swap_class, \
+                mock.patch.object(writer, '_upload_full_shadow_swap') as shadow_swap:
+            writer.upload_full('/dev/null', 'S', 'SOME_TABLE', ['ID'], pre_procedure='EMPTY_TABLE',
+                               full_load_mode='shadow_swap')
+
+        shadow_swap.assert_called_once()
+        swap_class.assert_not_called()
+
+    def test_direct_sqlldr_parameters(self):
+        parameters = self._build_writer(direct=True, multithreading=True)._get_sqlldr_parameters()
+
+        self.assertTrue(parameters['direct'])
+        # the session default applies unless the indexes were marked unusable for the load
+        self.assertNotIn('skip_unusable_indexes', parameters)
+        self.assertNotIn('index_rebuild_parallel_degree', parameters)
+        self.assertTrue(self._build_writer(direct=True)._get_sqlldr_parameters(
+            skip_unusable_indexes=True)['skip_unusable_indexes'])
+
+    def test_auto_tuned_sqlldr_parameters(self):
+        columns = [ColumnSchema(name='ID', source_type='NUMBER'),
+                   ColumnSchema(name='NOTE', source_type='VARCHAR2', length=4000)]
+
+        parameters = self._build_writer(auto_tune=True)._get_sqlldr_parameters(columns_involved=columns,
+                                                                               data_size=10 ** 9)
+
+        self.assertNotIn('auto_tune', parameters)
+        self.assertEqual((255 + 4000 + 8) * parameters['rows'], parameters['bindsize'])
+        self.assertGreater(parameters['rows'], 0)
+
+    def test_auto_tune_keeps_configured_direct_path_sizes(self):
+        columns = [ColumnSchema(name='ID', source_type='NUMBER')]
+
+        parameters = self._build_writer(auto_tune=True, columnarrayrows=100)._get_sqlldr_parameters(
+            direct_path=True, columns_involved=columns, data_size=10 ** 6)
+
+        self.assertEqual(100, parameters['columnarrayrows'])
+        self.assertIsNotNone(parameters['streamsize'])
+        self.assertEqual(5000, parameters['rows'])
+
+
+class TestUpsertStagingTable(unittest.TestCase):
+    """Covers the staging table strategies of OracleWriter._perform_upsert."""
+
+    COLUMNS = [ColumnSchema(name='ID', source_type='NUMBER', source_type_signature='NUMBER(22) NULL'),
+               ColumnSchema(name='NAME', source_type='VARCHAR2', source_type_signature='VARCHAR2(10) NULL')]
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self, **merge_options) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions(),
+                              merge_options=MergeOptions(**merge_options),
+                              staging_id='123')
+        writer._connection = mock.Mock(escape=OracleConnection.escape)
+        writer._connection.perform_query.return_value = []
+        writer._metadata_provider = mock.Mock()
+        return writer
+
+    def _upsert(self, writer: OracleWriter, staging_table: str, existing: bool, method: str = 'query'):
+        def execute_script(script, continue_on_failure=False):
+            if script.startswith('CREATE') and existing:
+                raise WriterUserException('exists', db_error=FakeOracleError('ORA-00955: name is already used',
+                                                                               'ORA-00955'))
+            return []
+
+        with mock.patch.object(writer, 'execute_script', side_effect=execute_script) as script_mock, \
+                mock.patch.object(writer, '_load_data_into_table') as load_mock:
+            writer._perform_upsert('/dev/null', 's', 'some_table', '"S"."SOME_TABLE"', ['ID', 'NAME'], ['ID'],
+                                   TableSchema('SOME_TABLE', self.COLUMNS), method=method,
+                                   staging_table=staging_table)
+        return [c.args[0] for c in script_mock.call_args_list], load_mock
+
+    def test_existing_nologging_table_is_truncated_and_reused(self):
+        writer = self._build_writer()
+        writer._metadata_provider.get_table_metadata.return_value = TableSchema('KBC_STG_123_S_SOME_TABLE',
+                                                                                list(self.COLUMNS))
+
+        scripts, load_mock = self._upsert(writer, 'nologging', existing=True)
+
+        self.assertEqual('TRUNCATE TABLE KBC_STG_123_S_SOME_TABLE REUSE STORAGE', scripts[1])
+        self.assertEqual('TRUNCATE TABLE KBC_STG_123_S_SOME_TABLE REUSE STORAGE', scripts[-1])
+        self.assertFalse(any(script.startswith('DROP') for script in scripts))
+        self.assertEqual('KBC_STG_123_S_SOME_TABLE', load_mock.call_args.args[2])
+        # conventional inserts, APPEND_VALUES would be committed after every batch
+        self.assertFalse(load_mock.call_args.kwargs['direct_path'])
+        self.assertFalse(load_mock.call_args.kwargs['single_session'])
+
+    def test_nologging_table_is_filled_by_direct_path_sqlldr(self):
+        writer = self._build_writer()
+
+        _, load_mock = self._upsert(writer, 'nologging', existing=False, method='sqlldr')
+
+        self.assertTrue(load_mock.call_args.kwargs['direct_path'])
+
+    def test_staging_table_names_include_schema(self):
+        writer = self._build_writer()
+
+        self.assertEqual('KBC_STG_123_SOME_TABLE', writer._get_staging_table_name(None, 'some_table', 'nologging'))
+        self.assertNotEqual(writer._get_temp_table_name('A', 'SOME_TABLE'),
+                            writer._get_temp_table_name('B', 'SOME_TABLE'))
+
+    def test_existing_temporary_table_is_not_reused(self):
+        writer = self._build_writer()
+        writer._connection.perform_query.side_effect = WriterUserException(
+            'exists', db_error=FakeOracleError('ORA-00955: name is already used', 'ORA-00955'))
+
+        with self.assertRaisesRegex(WriterUserException, 'already exists'), \
+                mock.patch.object(writer, '_load_data_into_table') as load_mock:
+            writer._perform_upsert('/dev/null', 's', 'some_table', '"S"."SOME_TABLE"', ['ID', 'NAME'], ['ID'],
+                                   TableSchema('SOME_TABLE', self.COLUMNS), method='query')
+
+        load_mock.assert_not_called()
+        # the table of the other load is not dropped
+        self.assertEqual(1, writer._connection.perform_query.call_count)
+
+    def test_changed_nologging_table_is_recreated(self):
+        writer = self._build_writer()
+        writer._metadata_provider.get_table_metadata.return_value = TableSchema('KBC_STG_123_S_SOME_TABLE',
+                                                                                self.COLUMNS[:1])
+
+        scripts, _ = self._upsert(writer, 'nologging', existing=True)
+
+        self.assertEqual('DROP TABLE KBC_STG_123_S_SOME_TABLE', scripts[1])
+
+    def test_global_temporary_table_is_loaded_in_single_session(self):
+        writer = self._build_writer()
+
+        scripts, load_mock = self._upsert(writer, 'global_temporary', existing=False)
+
+        self.assertIn('CREATE GLOBAL TEMPORARY TABLE KBC_GTT_S_SOME_TABLE', scripts[0])
+        self.assertIn('ON COMMIT PRESERVE ROWS', scripts[0])
+        self.assertTrue(load_mock.call_args.kwargs['single_session'])
+
+    def test_upsert_phases_are_measured(self):
+        writer = self._build_writer()
+
+        self._upsert(writer, 'temporary', existing=False)
+
+        self.assertEqual(['temp_table_ddl', 'merge', 'commit', 'drop'], [m.phase for m in writer.metrics.phases])
+        self.assertEqual({'some_table'}, {m.table_name for m in writer.metrics.phases})
+        self.assertEqual({'success'}, {m.status for m in writer.metrics.phases})
+
+    def test_bucketed_merge_commits_each_bucket(self):
+        writer = self._build_writer(buckets=4, sessions=2, parallel_degree=8)
+        pool = writer._connection.create_pool.return_value
+        pool.acquire.return_value.cursor.return_value.rowcount = 3
+
+        self._upsert(writer, 'temporary', existing=False)
+
+        writer._connection.create_pool.assert_called_once_with(2, session_callback=writer._init_pooled_session)
+        cursor = pool.acquire.return_value.cursor.return_value
+        merge_query = cursor.execute.call_args.args[0]
+        self.assertIn('MERGE /*+ PARALLEL(8) */ INTO', merge_query)
+        self.assertIn('WHERE ORA_HASH("ID", 3) = :bucket', merge_query)
+        self.assertEqual([0, 1, 2, 3], sorted(c.kwargs['bucket'] for c in cursor.execute.call_args_list))
+        self.assertEqual(4, pool.acquire.return_value.commit.call_count)
+        self.assertEqual(12, next(m.rows for m in writer.metrics.phases if m.phase == 'merge'))
+        pool.close.assert_called_once_with(force=True)
+
+    def test_failed_bucket_reports_committed_buckets(self):
+        writer = self._build_writer(buckets=3, sessions=1)
+        cursor = writer._connection.create_pool.return_value.acquire.return_value.cursor.return_value
+
+        def execute(query, bucket):
+            if bucket == 1:
+                raise oracledb.DatabaseError('ORA-01555: snapshot too old')
+
+        cursor.execute.side_effect = execute
+
+        with self.assertRaisesRegex(WriterUserException, r'Committed buckets: \[0\], skipped buckets: \[2\]'):
+            self._upsert(writer, 'temporary', existing=False)
+
+    def test_failed_bucket_clears_the_staging_table(self):
+        writer = self._build_writer(buckets=2, sessions=1)
+        cursor = writer._connection.create_pool.return_value.acquire.return_value.cursor.return_value
+        cursor.execute.side_effect = oracledb.DatabaseError('ORA-01555: snapshot too old')
+
+        with self.assertRaisesRegex(WriterUserException, 'stages it again'), \
+                mock.patch.object(writer, 'execute_script') as script_mock, \
+                mock.patch.object(writer, '_load_data_into_table'):
+            writer._perform_upsert('/dev/null', 's', 'some_table', '"S"."SOME_TABLE"', ['ID', 'NAME'], ['ID'],
+                                   TableSchema('SOME_TABLE', self.COLUMNS), method='query',
+                                   staging_table='nologging')
+
+        self.assertEqual('TRUNCATE TABLE KBC_STG_123_S_SOME_TABLE REUSE STORAGE', script_mock.call_args.args[0])
+
+    def test_unknown_failure_policy_fails(self):
+        with self.assertRaises(WriterUserException):
+            self._build_writer(failure_policy='retry')
+
+    def test_global_temporary_table_is_merged_at_once(self):
+        writer = self._build_writer(buckets=4)
+
+        self._upsert(writer, 'global_temporary', existing=False)
+
+        writer._connection.create_pool.assert_not_called()
+        merge_query = writer._connection.execute_dml.call_args.args[0]
+        self.assertNotIn('ORA_HASH', merge_query)
+
+    def test_change_detection_skips_unchanged_rows(self):
+        writer = self._build_writer(change_detection='columns')
+        writer._connection.perform_query.side_effect = lambda query, *args: [(10, 2)] if 'COUNT' in query else []
+        writer._connection.execute_dml.return_value = 5
+
+        with self.assertLogs('db_writer.writer', level='INFO') as logs:
+            self._upsert(writer, 'temporary', existing=False)
+
+        merge_query = writer._connection.execute_dml.call_args.args[0]
+        self.assertIn('WHEN MATCHED THEN UPDATE SET a."NAME"=b."NAME" WHERE (DECODE(a."NAME", b."NAME", 0, 1) = 1)',
+                      merge_query)
+        self.assertIn('2 rows inserted, 3 updated, 5 unchanged', '\n'.join(logs.output))
+        self.assertIn('change_detection', [m.phase for m in writer.metrics.phases])
+
+    def test_column_subset_is_staged_into_nullable_columns(self):
+        writer = self._build_writer()
+        columns = self.COLUMNS + [ColumnSchema(name='CREATED', source_type='DATE', nullable=False,
+                                               source_type_signature='DATE NOT NULL')]
+
+        with mock.patch.object(writer, '_load_data_into_table'):
+            writer._perform_upsert('/dev/null', 's', 'some_table', '"S"."SOME_TABLE"', ['ID', 'NAME'], ['ID'],
+                                   TableSchema('SOME_TABLE', columns), method='query', staging_table='temporary')
+
+        create_query = writer._connection.perform_query.call_args_list[0].args[0]
+        self.assertIn('"CREATED" DATE NULL', create_query)
+        self.assertNotIn('NOT NULL', create_query)
+        # the DEFAULT of the target fills the column missing in the input
+        merge_query = writer._connection.execute_dml.call_args.args[0]
+        self.assertIn('INSERT (ID, NAME) VALUES (b."ID", b."NAME")', merge_query)
+
+    def test_change_detection_by_row_hash(self):
+        writer = self._build_writer()
+        columns = [ColumnSchema(name='NAME', source_type='VARCHAR2', length=100),
+                   ColumnSchema(name='CREATED', source_type='DATE'), ColumnSchema(name='DOC', source_type='CLOB')]
+
+        predicate = writer._build_change_predicate(columns, 'hash')
+
+        self.assertIn("STANDARD_HASH(CHR(1) || a.\"NAME\" || CHR(1) || "
+                      "TO_CHAR(a.\"CREATED\", 'YYYY-MM-DD HH24:MI:SS')) <> STANDARD_HASH(CHR(1) || b.\"NAME\"",
+                      predicate)
+        self.assertIn('NVL(DBMS_LOB.COMPARE(a."DOC", b."DOC"), 1) <> 0', predicate)
+
+    def test_row_hash_of_wide_columns_is_split(self):
+        writer = self._build_writer()
+        columns = [ColumnSchema(name='A', source_type='VARCHAR2', length=4000),
+                   ColumnSchema(name='B', source_type='VARCHAR2', length=2000),
+                   ColumnSchema(name='C', source_type='VARCHAR2', length=1990),
+                   ColumnSchema(name='D', source_type='TIMESTAMP(6) WITH TIME ZONE')]
+
+        predicate = writer._build_change_predicate(columns, 'hash')
+
+        self.assertEqual(2, predicate.count(' <> STANDARD_HASH'))
+        self.assertIn('STANDARD_HASH(CHR(1) || a."B" || CHR(1) || a."C") <> ', predicate)
+        self.assertIn("STANDARD_HASH(CHR(1) || TO_CHAR(a.\"D\", 'YYYY-MM-DD HH24:MI:SS.FF9 TZR')) <> ", predicate)
+        self.assertIn('DECODE(a."A", b."A", 0, 1) = 1', predicate)
+
+    def test_unknown_change_detection_fails(self):
+        with self.assertRaises(WriterUserException):
+            self._build_writer(change_detection='hashes')
+
+
+class TestIncrementalUpsertMethod(unittest.TestCase):
+    """Covers the upsert dispatch of OracleWriter.upload_incremental."""
+
+    TABLE_METADATA = TableSchema('SOME_TABLE', [ColumnSchema(name='ID', source_type='NUMBER')])
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions())
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        return writer
+
+    def test_sqlldr_with_primary_key_performs_upsert(self):
+        writer = self._build_writer()
+
+        with mock.patch.object(writer, '_perform_upsert') as perform_upsert, \
+                mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_incremental('/dev/null', 'S', 'SOME_TABLE', ['ID'], primary_key=['ID'], method='sqlldr')
+
+        perform_upsert.assert_called_once()
+        self.assertEqual('sqlldr', perform_upsert.call_args.kwargs['method'])
+        load_data_into_table.assert_not_called()
+
+    def test_sqlldr_without_primary_key_appends(self):
+        writer = self._build_writer()
+
+        with mock.patch.object(writer, '_perform_upsert') as perform_upsert, \
+                mock.patch.object(writer, '_load_data_into_table') as load_data_into_table:
+            writer.upload_incremental('/dev/null', 'S', 'SOME_TABLE', ['ID'], method='sqlldr')
+
+        perform_upsert.assert_not_called()
+        self.assertEqual('APPEND', load_data_into_table.call_args.kwargs['mode'])
+
+    def test_sqlldr_into_global_temporary_table_is_refused(self):
+        writer = self._build_writer()
+
+        with self.assertRaises(WriterUserException):
+            writer.upload_incremental('/dev/null', 'S', 'SOME_TABLE', ['ID'], primary_key=['ID'], method='sqlldr',
+                                      staging_table='global_temporary')
+
+    def test_staging_direct_path_enables_direct_sqlldr(self):
+        writer = self._build_writer()
+
+        self.assertFalse(writer._get_sqlldr_parameters()['direct'])
+        self.assertTrue(writer._get_sqlldr_parameters(direct_path=True)['direct'])
+
+
+class TestResumableLoad(unittest.TestCase):
+    """Covers the checkpoints of the loads into the destination table."""
+
+    TABLE_METADATA = TableSchema('SOME_TABLE', [ColumnSchema(name='ID', source_type='NUMBER')])
+    KEY = '"S"."SOME_TABLE"'
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+        self._data_path = f'{self._log_folder}/data.csv'
+        with open(self._data_path, 'w') as out:
+            out.write('ID\n' + ''.join(f'{i}\n' for i in range(1, 8)))
+        # content of the checkpoint table and the order of the checkpoint changes and commits
+        self._checkpoints = {}
+        self._events = []
+        self._queries = []
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _perform_query(self, query, bind_parameters=None):
+        statement = query.strip()
+        self._queries.append(statement)
+        if statement.startswith('SELECT 1 FROM ALL_TABLES'):
+            return iter([(1,)])
+        if statement.startswith('SELECT FINGERPRINT'):
+            entry = self._checkpoints.get(bind_parameters['key'])
+            return iter([entry] if entry else [])
+        if statement.startswith(f'MERGE INTO {CheckpointStore.TABLE_NAME}'):
+            self._checkpoints[bind_parameters['key']] = (bind_parameters['fingerprint'], bind_parameters['rows'],
+                                                         bind_parameters['verified'])
+            self._events.append(('save' if bind_parameters['verified'] else 'unverified', bind_parameters['rows']))
+        elif statement.startswith(f'DELETE FROM {CheckpointStore.TABLE_NAME}'):
+            self._checkpoints.pop(bind_parameters['key'], None)
+            self._events.append('clear')
+        return iter([])
+
+    def _build_writer(self, resumable: bool = True) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions(),
+                              query_load_options=QueryLoadOptions(batch_size=2, checkpoint_batches=1),
+                              resumable=resumable)
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        writer._connection = mock.Mock()
+        writer._connection.escape = OracleConnection.escape
+        writer._connection.perform_query.side_effect = self._perform_query
+        writer._connection.connection.commit.side_effect = lambda: self._events.append('commit')
+        return writer
+
+    def test_query_load_continues_after_committed_rows(self):
+        writer = self._build_writer()
+        inserted = []
+
+        def fail_on_third_batch(cursor, query, converter, batch, first_row_number):
+            if first_row_number == 5:
+                raise oracledb.DatabaseError('DPY-4011: the database or network closed the connection')
+            inserted.append(first_row_number)
+            return len(batch)
+
+        def insert_batch(cursor, query, converter, batch, first_row_number):
+            inserted.append(first_row_number)
+            return len(batch)
+
+        with mock.patch.object(writer, '_insert_batch', side_effect=fail_on_third_batch):
+            with self.assertRaises(oracledb.DatabaseError):
+                writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'], method='query')
+        self.assertEqual(4, self._checkpoints[self.KEY][1])
+        # the checkpoint is committed in the transaction of the rows
+        self.assertEqual([('save', 2), 'commit', ('save', 4), 'commit'], self._events)
+
+        self._events.clear()
+        resumed = self._build_writer()
+        with mock.patch.object(resumed, '_insert_batch', side_effect=insert_batch):
+            resumed.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'], method='query')
+
+        self.assertEqual([1, 3, 5, 7], inserted)
+        self.assertEqual({}, self._checkpoints)
+        self.assertEqual(['clear', 'commit'], self._events[-2:])
+
+    def test_failed_sqlldr_load_saves_committed_rows(self):
+        writer = self._build_writer()
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.side_effect = SQLLoaderException(
+            'failed', result=SQLLoaderResult(rows_loaded=3, rows_rejected=1, rows_read=4))
+
+        with self.assertRaises(SQLLoaderException):
+            writer.upload_full(self._data_path, 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertTrue(writer._sql_loader.load_data.call_args.kwargs['commit_discontinued'])
+        # the offset is unverified while sqlldr commits on its own
+        self.assertEqual([('unverified', 0), 'commit', ('save', 4), 'commit'], self._events)
+
+    def test_crashed_sqlldr_load_saves_last_commit_point(self):
+        writer = self._build_writer()
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.side_effect = SQLLoaderException(
+            'killed', result=SQLLoaderResult(rows_committed=2))
+
+        with self.assertRaises(SQLLoaderException):
+            writer.upload_full(self._data_path, 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertEqual(2, self._checkpoints[self.KEY][1])
+
+    def test_resumed_full_load_appends_without_emptying(self):
+        writer = self._build_writer()
+        self._checkpoints[self.KEY] = (file_fingerprint(self._data_path), 4, 1)
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.return_value = SQLLoaderResult(rows_loaded=3)
+
+        writer.upload_full(self._data_path, 'S', 'SOME_TABLE', ['ID'], full_load_mode='truncate')
+
+        self.assertFalse(any('SOME_TABLE' in query for query in self._queries))
+        self.assertEqual('APPEND', writer._sql_loader.load_data.call_args.kwargs['mode'])
+        self.assertEqual(4, writer._sql_loader.load_data.call_args.kwargs['skip_records'])
+        self.assertEqual({}, self._checkpoints)
+        self.assertEqual([('unverified', 4), 'commit', 'clear', 'commit'], self._events)
+
+    def test_killed_sqlldr_full_load_starts_over(self):
+        writer = self._build_writer()
+        self._checkpoints[self.KEY] = (file_fingerprint(self._data_path), 4, 0)
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.return_value = SQLLoaderResult(rows_loaded=7)
+
+        writer.upload_full(self._data_path, 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertEqual('REPLACE', writer._sql_loader.load_data.call_args.kwargs['mode'])
+        self.assertEqual(0, writer._sql_loader.load_data.call_args.kwargs['skip_records'])
+        self.assertEqual({}, self._checkpoints)
+
+    def test_killed_sqlldr_append_is_not_continued(self):
+        writer = self._build_writer()
+        self._checkpoints[self.KEY] = (file_fingerprint(self._data_path), 4, 0)
+        writer._sql_loader = mock.Mock()
+
+        with self.assertRaisesRegex(WriterUserException, 'interrupted during the SQL\\*Loader load'):
+            writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'])
+
+        writer._sql_loader.load_data.assert_not_called()
+        self.assertEqual((4, 0), self._checkpoints[self.KEY][1:])
+
+    def test_direct_path_load_commits_each_call(self):
+        writer = self._build_writer()
+        direct_path_load = writer._connection.connection.direct_path_load
+
+        with mock.patch('oracledb.is_thin_mode', return_value=True):
+            writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'], method='direct_path')
+
+        self.assertEqual([2, 2, 2, 1], [len(c.args[3]) for c in direct_path_load.call_args_list])
+        self.assertEqual(('S', 'SOME_TABLE', ['ID']), direct_path_load.call_args.args[:3])
+        self.assertEqual(2, direct_path_load.call_args.kwargs['batch_size'])
+        self.assertEqual([('save', 2), 'commit', ('save', 4), 'commit', ('save', 6), 'commit', ('save', 7), 'commit',
+                          'clear', 'commit'], self._events)
+        self.assertEqual({}, self._checkpoints)
+        self.assertEqual(7, next(m.rows for m in writer.metrics.phases if m.phase == 'load'))
+
+    def test_direct_path_load_requires_thin_mode(self):
+        writer = self._build_writer(resumable=False)
+
+        with mock.patch('oracledb.is_thin_mode', return_value=False):
+            with self.assertRaisesRegex(WriterUserException, 'Thin mode'):
+                writer.upload_incremental(self._data_path, None, 'SOME_TABLE', ['ID'], method='direct_path')
+
+        writer._connection.connection.direct_path_load.assert_not_called()
+
+
+class TestColumnarInput(unittest.TestCase):
+    """Covers the loads of the Parquet and Arrow inputs."""
+
+    TABLE_METADATA = TestResumableLoad.TABLE_METADATA
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+        self._data_path = os.path.join(self._log_folder, 'data.parquet')
+        Path(self._data_path).write_bytes(b'PAR1')
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self, max_rejected_rows: int = 0) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions(),
+                              query_load_options=QueryLoadOptions(batch_size=2),
+                              max_rejected_rows=max_rejected_rows)
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        writer._connection = mock.Mock()
+        writer._connection.escape = OracleConnection.escape
+        writer._sql_loader = mock.Mock()
+        return writer
+
+    def test_sqlldr_load_falls_back_to_record_batches(self):
+        writer = self._build_writer()
+        arrow_input = mock.Mock()
+        arrow_input.column_names.return_value = ['ID']
+        arrow_input.iter_tables.return_value = [mock.Mock(num_rows=2), mock.Mock(num_rows=1)]
+
+        with mock.patch('db_writer.writer.ArrowInput', wraps=ArrowInput) as arrow_class:
+            arrow_class.return_value = arrow_input
+            writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'])
+
+        writer._sql_loader.load_data.assert_not_called()
+        cursor = writer._connection.connection.cursor.return_value
+        self.assertEqual(['INSERT INTO "S"."SOME_TABLE" (ID) VALUES (:0)'] * 2,
+                         [c.args[0] for c in cursor.executemany.call_args_list])
+        self.assertIs(arrow_input.iter_tables.return_value[0], cursor.executemany.call_args_list[0].args[1])
+        self.assertEqual(3, writer.metrics.phases[-1].rows)
+
+    def test_direct_path_load_warns_that_rows_are_not_rejected(self):
+        writer = self._build_writer(max_rejected_rows=10)
+        arrow_input = mock.Mock()
+        arrow_input.column_names.return_value = ['ID']
+        arrow_input.iter_tables.return_value = [mock.Mock(num_rows=2)]
+
+        with mock.patch('db_writer.writer.ArrowInput', wraps=ArrowInput) as arrow_class, \
+                mock.patch('oracledb.is_thin_mode', return_value=True), \
+                self.assertLogs('db_writer.writer', level='WARNING') as logs:
+            arrow_class.return_value = arrow_input
+            writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'], method='direct_path')
+
+        writer._connection.connection.direct_path_load.assert_called_once()
+        self.assertIn('collects no rejected rows', '\n'.join(logs.output))
+
+    def test_column_count_mismatch_is_user_error(self):
+        writer = self._build_writer()
+        arrow_input = mock.Mock()
+        arrow_input.column_names.return_value = ['ID', 'NAME']
+
+        with mock.patch('db_writer.writer.ArrowInput', wraps=ArrowInput) as arrow_class:
+            arrow_class.return_value = arrow_input
+            with self.assertRaisesRegex(WriterUserException, '2 columns'):
+                writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'], method='query')
+
+    def test_missing_pyarrow_is_user_error(self):
+        writer = self._build_writer()
+
+        with mock.patch.dict('sys.modules', {'pyarrow': None}):
+            with self.assertRaisesRegex(WriterUserException, 'pyarrow'):
+                writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'], method='query')
+
+
+class TestPreflightValidation(unittest.TestCase):
+    """Covers the pre-flight validation of the input before the load."""
+
+    TABLE_METADATA = TableSchema('SOME_TABLE', [ColumnSchema(name='ID', source_type='NUMBER', precision=3, scale=0)])
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+        self._data_path = os.path.join(self._log_folder, 'data.csv')
+        Path(self._data_path).write_text('ID\n1\n""\n1000\n')
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self, max_rejected_rows: int = 0) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions(),
+                              preflight_options=PreflightOptions(enabled=True, max_violations=5, workers=1),
+                              max_rejected_rows=max_rejected_rows)
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        writer._connection = mock.Mock()
+        writer._connection.escape = OracleConnection.escape
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.return_value = SQLLoaderResult(rows_loaded=1)
+        return writer
+
+    def test_violations_fail_before_any_data_is_written(self):
+        writer = self._build_writer()
+
+        with self.assertRaises(WriterUserException) as context:
+            writer.upload_full(self._data_path, 'S', 'SOME_TABLE', ['ID'], full_load_mode='truncate')
+
+        self.assertIn('found 2 rows', str(context.exception))
+        self.assertIn('Row 2: Column ID is NOT NULL', str(context.exception))
+        self.assertIn("Row 3: Value '1000' of column ID exceeds the precision", str(context.exception))
+        writer._connection.perform_query.assert_not_called()
+        writer._sql_loader.load_data.assert_not_called()
+        self.assertEqual(('preflight', 3), (writer.metrics.phases[-1].phase, writer.metrics.phases[-1].rows))
+
+    def test_allowed_rejected_rows_are_not_reported(self):
+        writer = self._build_writer(max_rejected_rows=2)
+
+        writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID'])
+
+        writer._sql_loader.load_data.assert_called_once()
+
+
+class TestStreamedInput(unittest.TestCase):
+    """Covers the loads of the compressed and sliced inputs."""
+
+    TABLE_METADATA = TestResumableLoad.TABLE_METADATA
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+        self._sliced_path = os.path.join(self._log_folder, 'sliced')
+        os.mkdir(self._sliced_path)
+        with open(os.path.join(self._sliced_path, 'part_1'), 'w') as out:
+            out.write('1\n2\n')
+        with gzip.open(os.path.join(self._sliced_path, 'part_2.gz'), 'wt') as out:
+            out.write('3\n')
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self, sql_loader_options: SQLLoaderOptions = None) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=sql_loader_options or SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions(),
+                              query_load_options=QueryLoadOptions(batch_size=2))
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        writer._connection = mock.Mock()
+        writer._connection.escape = OracleConnection.escape
+        return writer
+
+    def test_sqlldr_reads_sliced_input_from_pipe(self):
+        writer = self._build_writer(SQLLoaderOptions(parallel_workers=4))
+        received = {}
+
+        def read_pipe(data_path, *args, **kwargs):
+            with open(data_path, 'r') as pipe:
+                received['data'] = pipe.read()
+            received.update(kwargs)
+            return SQLLoaderResult(rows_loaded=3)
+
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.side_effect = read_pipe
+
+        writer.upload_incremental(self._sliced_path, 'S', 'SOME_TABLE', ['ID'])
+
+        self.assertEqual('1\n2\n3\n', received['data'])
+        self.assertFalse(received['skip_first_line'])
+        self.assertEqual(1, received['parallel_workers'])
+        load = writer.metrics.phases[-1]
+        self.assertEqual(('load', 'SOME_TABLE', 3), (load.phase, load.table_name, load.rows))
+        self.assertEqual(sum(f.stat().st_size for f in Path(self._sliced_path).iterdir()), load.bytes)
+
+    def test_query_reads_sliced_input(self):
+        writer = self._build_writer()
+
+        batches = list(writer._read_batches(self._sliced_path))
+
+        self.assertEqual([(1, [['1'], ['2']]), (3, [['3']])], batches)
+
+
+
+class TestSkippedColumns(unittest.TestCase):
+    """Covers the loads of a subset of the input columns."""
+
+    TABLE_METADATA = TableSchema('SOME_TABLE', [ColumnSchema(name='ID', source_type='NUMBER'),
+                                                ColumnSchema(name='NAME', source_type='VARCHAR2', length=10)])
+
+    def setUp(self):
+        self._log_folder = tempfile.mkdtemp()
+        self._logger = logging.getLogger('db_writer.writer')
+        self._original_handlers = list(self._logger.handlers)
+        self._data_path = os.path.join(self._log_folder, 'data.csv')
+        Path(self._data_path).write_text('ID,NOTE,NAME\n1,skipped,a\n2,skipped,b\n3,skipped,c\n')
+
+    def tearDown(self):
+        for handler in list(self._logger.handlers):
+            if handler not in self._original_handlers:
+                handler.close()
+                self._logger.removeHandler(handler)
+        shutil.rmtree(self._log_folder, ignore_errors=True)
+
+    def _build_writer(self) -> OracleWriter:
+        credentials = OracleCredentials(username='user', password='pass', host='localhost', port=1521,
+                                        service_name='xe', insta_client_path='/tmp/instantclient')
+        writer = OracleWriter(credentials,
+                              log_folder=self._log_folder,
+                              sql_loader_options=SQLLoaderOptions(),
+                              default_format=DefaultFormatOptions(),
+                              query_load_options=QueryLoadOptions(batch_size=2))
+        writer._metadata_provider = mock.Mock()
+        writer._metadata_provider.get_table_metadata.return_value = self.TABLE_METADATA
+        writer._connection = mock.Mock()
+        writer._connection.escape = OracleConnection.escape
+        writer._sql_loader = mock.Mock()
+        writer._sql_loader.load_data.return_value = SQLLoaderResult(rows_loaded=3)
+        return writer
+
+    def test_sqlldr_reads_skipped_columns_as_filler(self):
+        writer = self._build_writer()
+
+        writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID', 'NOTE', 'NAME'],
+                                  skip_columns=['NOTE'])
+
+        columns_types = writer._sql_loader.load_data.call_args[0][2]
+        self.assertEqual([('ID', ''), ('KBC_FILLER_2', FILLER_FIELD), ('NAME', 'CHAR(10)')], columns_types)
+
+    def test_column_missing_in_destination_fails_unless_skipped(self):
+        writer = self._build_writer()
+
+        with self.assertRaises(WriterUserException):
+            writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID', 'NOTE', 'NAME'])
+        writer._sql_loader.load_data.assert_not_called()
+
+    def test_query_load_projects_rows(self):
+        writer = self._build_writer()
+
+        writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID', 'NOTE', 'NAME'],
+                                  method='query', skip_columns=['NOTE'])
+
+        executemany = writer._connection.connection.cursor.return_value.executemany
+        self.assertEqual([[[Decimal(1), 'a'], [Decimal(2), 'b']], [[Decimal(3), 'c']]],
+                         [call.args[1] for call in executemany.call_args_list])
+        self.assertIn('(ID, NAME) VALUES', executemany.call_args.args[0])
+
+    def test_row_of_other_width_fails_the_projection(self):
+        writer = self._build_writer()
+        # the skipped column is the last one, a missing value must not go unnoticed
+        Path(self._data_path).write_text('ID,NAME,NOTE\n1,a,skipped\n2,b\n')
+
+        with self.assertRaises(WriterUserException) as context:
+            writer.upload_incremental(self._data_path, 'S', 'SOME_TABLE', ['ID', 'NAME', 'NOTE'],
+                                      method='query', skip_columns=['NOTE'])
+
+        self.assertIn("Row ['2', 'b'] has 2 values, the input has 3 columns", str(context.exception))
+
+    def test_rejected_rows_keep_the_source_values(self):
+        writer = self._build_writer()
+        writer._rejected_rows = RejectedRowsCollector(5)
+        converter = RowConverter(self.TABLE_METADATA.columns, DefaultFormatOptions(), RowProjection([0, 2], 3))
+        cursor = mock.Mock()
+        cursor.getbatcherrors.return_value = []
+
+        inserted = writer._insert_batch(cursor, 'INSERT', converter, [['1', 'skipped', 'a'], ['x', 'skipped', 'b'],
+                                                                      ['3', 'skipped']], first_row_number=1)
+
+        cursor.executemany.assert_called_once_with('INSERT', [[Decimal(1), 'a']], batcherrors=True)
+        self.assertEqual(1, inserted)
+        self.assertEqual([(2, ['x', 'skipped', 'b']), (3, ['3', 'skipped'])],
+                         [(row.row_number, row.values) for row in writer.rejected_rows])
 
 
 if __name__ == "__main__":